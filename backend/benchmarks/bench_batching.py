@@ -0,0 +1,152 @@
+"""
+Бенчмарк: пакетная обработка кадров разных сессий против вызова на кадр.
+
+Запускает заданное число имитированных сессий, каждая присылает кадры
+с заданной частотой, и прогоняет их через исполнитель "thread" (каждый
+кадр - отдельная задача пула) и "batch" (кадры собираются в пакеты).
+Для каждого исполнителя выводится отчет в том же формате, что и
+GET /inference/stats, плюс сквозная задержка кадра.
+
+По умолчанию вместо модели выполняется сопоставимая по стоимости работа
+OpenCV на кадре 256x256; с флагом --with-model каждая сессия получает
+собственный PoseProcessor (нужен файл модели).
+
+Запуск (из директории backend/):
+    PYTHONPATH=src python -m benchmarks.bench_batching --sessions 32
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import time
+from typing import Callable, Dict, List
+
+import cv2
+import numpy as np
+from app.analysis.pose_processor import PoseProcessor
+from app.inference.batching import BatchingInferenceExecutor
+from app.inference.executor import InferenceExecutor, InferenceQueueFullError
+
+FRAME_SIZE = 256
+
+
+def make_workloads(count: int, with_model: bool) -> List[Callable[[], object]]:
+    """Создает по одной функции обработки кадра на сессию."""
+    frame = np.random.default_rng(0).integers(
+        0, 256, size=(FRAME_SIZE, FRAME_SIZE, 3), dtype=np.uint8
+    )
+    if with_model:
+        processors = [PoseProcessor() for _ in range(count)]
+        for processor in processors:
+            processor.warmup()
+        return [
+            functools.partial(processor.get_landmarks, frame)
+            for processor in processors
+        ]
+    return [
+        lambda: cv2.GaussianBlur(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), (15, 15), 0)
+    ] * count
+
+
+async def run_session(
+    executor: InferenceExecutor,
+    work: Callable[[], object],
+    frames: int,
+    fps: float,
+    latencies_ms: List[float],
+) -> int:
+    """Имитирует клиента: присылает кадр, ждет ответ, выдерживает частоту."""
+    interval = 1.0 / fps
+    rejected = 0
+    for _ in range(frames):
+        started = time.perf_counter()
+        try:
+            await executor.run(work)
+        except InferenceQueueFullError:
+            rejected += 1
+        elapsed = time.perf_counter() - started
+        latencies_ms.append(elapsed * 1000.0)
+        await asyncio.sleep(max(interval - elapsed, 0.0))
+    return rejected
+
+
+async def bench_executor(
+    executor: InferenceExecutor,
+    workloads: List[Callable[[], object]],
+    args: argparse.Namespace,
+) -> Dict[str, float]:
+    """Прогоняет все сессии через исполнитель и собирает отчет."""
+    latencies_ms: List[float] = []
+    started = time.perf_counter()
+    rejected = await asyncio.gather(
+        *(
+            run_session(executor, work, args.frames, args.fps, latencies_ms)
+            for work in workloads
+        )
+    )
+    wall_s = time.perf_counter() - started
+    report = executor.report()
+    await executor.shutdown()
+    p50, p95 = np.percentile(latencies_ms, [50, 95])
+    report.update(
+        {
+            "sessions": float(len(workloads)),
+            "rejected": float(sum(rejected)),
+            "throughput_fps": report["frames"] / wall_s,
+            "latency_ms_p50": float(p50),
+            "latency_ms_p95": float(p95),
+        }
+    )
+    return report
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    workloads = make_workloads(args.sessions, args.with_model)
+    thread = InferenceExecutor(
+        max_workers=args.workers,
+        max_concurrency=args.workers,
+        queue_limit=args.queue_limit,
+    )
+    batch = BatchingInferenceExecutor(
+        max_workers=args.workers,
+        queue_limit=args.queue_limit,
+        max_batch_size=args.batch_size,
+        max_wait_ms=args.batch_wait_ms,
+    )
+    return {
+        "thread": await bench_executor(thread, workloads, args),
+        "batch": await bench_executor(batch, workloads, args),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--frames", type=int, default=100, help="Кадров на сессию")
+    parser.add_argument("--fps", type=float, default=15.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue-limit", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--batch-wait-ms", type=float, default=10.0)
+    parser.add_argument("--with-model", action="store_true")
+    parser.add_argument("--json", action="store_true", help="Вывести отчет в JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    keys = sorted(set(results["thread"]) | set(results["batch"]))
+    print(f"{'метрика':<22}{'thread':>12}{'batch':>12}")
+    for key in keys:
+        thread, batch = results["thread"].get(key), results["batch"].get(key)
+        print(
+            f"{key:<22}"
+            f"{'-' if thread is None else f'{thread:.2f}':>12}"
+            f"{'-' if batch is None else f'{batch:.2f}':>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
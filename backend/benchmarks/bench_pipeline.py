@@ -0,0 +1,297 @@
+"""
+Бенчмарк: сквозной конвейер обработки кадра по стадиям.
+
+Замеряет каждую стадию пути JSON-кадра через сервер отдельно:
+1. parse_message - разбор текста POSE_DATA (`parse_client_message`: orjson
+   и проверка только конверта сообщения);
+2. parse_json_validate - прежний разбор для сравнения: json.loads и полная
+   валидация ClientMessage;
+3. decode_frame - base64 и декодирование JPEG (`PoseAnalyzer._decode_frame`);
+4. cvt_color - перевод BGR -> RGB перед моделью;
+5. detect - PoseLandmarker.detect (только с флагом --with-model);
+6. analyze_pose - конечный автомат (`PoseAnalyzer._analyze_pose`);
+7. serialize - сериализация ответа FEEDBACK с точками, как в send_json;
+8. metrics - обновление метрик Prometheus за кадр (app.metrics).
+
+Кадры: синтетические (фон с силуэтом) и, с флагом --video, кадры записанного
+ролика, приведенные к каждому разрешению из --resolutions. Точки для
+конечного автомата - синтетические приседания или запись сессии (--recording,
+файл .kcrec). Для каждой стадии выводятся p50/p95/p99, для всего конвейера -
+кадров в секунду на одно ядро (все стадии выполняются в одном потоке).
+
+Результат сохраняется в JSON (--output) вместе с коммитом и версиями
+библиотек; флаг --compare выводит изменение p50 относительно другого
+такого файла, например сохраненного на предыдущем коммите.
+
+Запуск (из директории backend/):
+    PYTHONPATH=src python -m benchmarks.bench_pipeline --output bench.json
+"""
+
+import argparse
+import base64
+import functools
+import json
+import math
+import os
+import platform
+import subprocess
+import time
+from typing import Any, Callable, Dict, List, cast
+
+import cv2
+import mediapipe as mp
+import numpy as np
+from app import metrics
+from app.analysis.pose_analyzer import PackedLandmark, PoseAnalyzer
+from app.analysis.pose_processor import NDArrayU8, PoseProcessor
+from app.recording import open_recording
+from app.schemas import ClientMessage, parse_client_message
+
+from benchmarks.bench_preprocess import make_jpeg
+
+Stats = Dict[str, float]
+DEFAULT_RESOLUTIONS = ["320x240", "640x480", "1280x720"]
+JPEG_QUALITY = 80
+# Стадии для сравнения с прежней реализацией: в сумму конвейера не входят.
+REFERENCE_STAGES = {"parse_json_validate"}
+
+
+def measure(func: Callable[[int], object], iterations: int, warmup: int) -> Stats:
+    """Вызывает func(i) и возвращает перцентили времени вызова в мс."""
+    for i in range(warmup):
+        func(i)
+    samples = np.empty(iterations)
+    for i in range(iterations):
+        started = time.perf_counter()
+        func(i)
+        samples[i] = (time.perf_counter() - started) * 1000.0
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "mean_ms": float(samples.mean()),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+    }
+
+
+def squat_landmarks(frames: int = 30) -> List[List[PackedLandmark]]:
+    """Синтетическое приседание: угол в колене 175 -> 90 -> 175 градусов."""
+    sequence = []
+    for knee_angle in np.concatenate(
+        [np.linspace(175, 90, frames // 2), np.linspace(90, 175, frames - frames // 2)]
+    ):
+        points = np.zeros((33, 4))
+        points[:, 3] = 1.0
+        knee, ankle = np.array([0.5, 0.6]), np.array([0.5, 0.8])
+        theta = math.radians(knee_angle)
+        hip = knee + 0.2 * np.array([math.sin(theta), math.cos(theta)])
+        points[[25, 27, 23], :2] = [knee, ankle, hip]
+        points[[11, 12], :2] = [hip + [0.0, -0.25], hip + [0.1, -0.25]]
+        points[31, :2] = ankle + [0.05, 0.0]
+        sequence.append([PackedLandmark(*row) for row in points.tolist()])
+    return sequence
+
+
+def recorded_landmarks(path: str) -> List[List[PackedLandmark]]:
+    """Кадры записи сессии, в которых найдена поза."""
+    recording = open_recording(path)
+    return [
+        [PackedLandmark(*row) for row in frame.tolist()]
+        for frame in recording.landmarks[recording.has_pose]
+    ]
+
+
+def video_jpegs(path: str, width: int, height: int, count: int) -> List[bytes]:
+    """Первые `count` кадров ролика, приведенные к разрешению и сжатые в JPEG."""
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise SystemExit(f"Не удалось открыть видео: {path}")
+    jpegs: List[bytes] = []
+    while len(jpegs) < count:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        resized = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        _, buffer = cv2.imencode(
+            ".jpg", resized, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY]
+        )
+        jpegs.append(buffer.tobytes())
+    capture.release()
+    if not jpegs:
+        raise SystemExit(f"В ролике нет кадров: {path}")
+    return jpegs
+
+
+def bench_frames(
+    jpegs: List[bytes], processor: PoseProcessor | None, args: argparse.Namespace
+) -> Dict[str, Stats]:
+    """Замеряет стадии, зависящие от кадра."""
+    analyzer = PoseAnalyzer(load_model=False)
+    b64 = [
+        "data:image/jpeg;base64," + base64.b64encode(jpeg).decode() for jpeg in jpegs
+    ]
+    texts = [
+        json.dumps({"type": "POSE_DATA", "payload": {"frame": frame}}) for frame in b64
+    ]
+    frames = [cast(NDArrayU8, analyzer._decode_frame(frame)) for frame in b64]
+    rgb = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames]
+    n = len(jpegs)
+
+    stages: Dict[str, Callable[[int], object]] = {
+        "parse_message": lambda i: parse_client_message(texts[i % n]),
+        "parse_json_validate": lambda i: ClientMessage.model_validate(
+            json.loads(texts[i % n])
+        ),
+        "decode_frame": lambda i: analyzer._decode_frame(b64[i % n]),
+        "cvt_color": lambda i: cv2.cvtColor(frames[i % n], cv2.COLOR_BGR2RGB),
+    }
+    if processor is not None:
+        images = [mp.Image(image_format=mp.ImageFormat.SRGB, data=x) for x in rgb]
+        stages["detect"] = lambda i: processor.landmarker.detect(images[i % n])
+    return {
+        name: measure(func, args.iterations, args.warmup)
+        for name, func in stages.items()
+    }
+
+
+def bench_landmarks(
+    sequence: List[List[PackedLandmark]], args: argparse.Namespace
+) -> Dict[str, Stats]:
+    """Замеряет конечный автомат и сериализацию ответа."""
+    analyzer = PoseAnalyzer(load_model=False)
+    n = len(sequence)
+    message = analyzer._build_feedback(sequence[0], echo_landmarks=True)
+    serialize = functools.partial(json.dumps, ensure_ascii=False, separators=(",", ":"))
+    stages: Dict[str, Callable[[int], object]] = {
+        "analyze_pose": lambda i: analyzer._analyze_pose(sequence[i % n]),
+        "serialize": lambda i: serialize(message.model_dump()),
+        "metrics": lambda i: frame_metrics_overhead(),
+    }
+    return {
+        name: measure(func, args.iterations, args.warmup)
+        for name, func in stages.items()
+    }
+
+
+def frame_metrics_overhead() -> None:
+    """Обновления метрик на один кадр-изображение (см. app.metrics)."""
+    metrics.IMAGE_FRAMES_RECEIVED.inc()
+    for stage in (
+        metrics.DECODE_SECONDS,
+        metrics.INFERENCE_SECONDS,
+        metrics.ANALYSIS_SECONDS,
+        metrics.SERIALIZATION_SECONDS,
+    ):
+        started = time.perf_counter()
+        stage.observe(time.perf_counter() - started)
+    metrics.FRAMES_ANSWERED.inc()
+
+
+def summarize(stages: Dict[str, Stats]) -> Dict[str, Any]:
+    """Добавляет сумму стадий и кадры в секунду на одно ядро."""
+    total_ms = sum(
+        stats["mean_ms"]
+        for name, stats in stages.items()
+        if name not in REFERENCE_STAGES
+    )
+    return {
+        "stages": stages,
+        "total_mean_ms": total_ms,
+        "fps_per_core": 1000.0 / total_ms if total_ms > 0 else None,
+        "with_model": "detect" in stages,
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Коммит и версии, чтобы сравнивать только сопоставимые результаты."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "mediapipe": mp.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    processor = PoseProcessor() if args.with_model else None
+    if args.recording:
+        sequence = recorded_landmarks(args.recording)
+    else:
+        sequence = squat_landmarks()
+    landmark_stages = bench_landmarks(sequence, args)
+
+    results: Dict[str, Any] = {}
+    for resolution in args.resolutions:
+        width, height = map(int, resolution.split("x"))
+        sources = {"synthetic": [make_jpeg(width, height, JPEG_QUALITY)]}
+        if args.video:
+            sources["video"] = video_jpegs(args.video, width, height, args.frames)
+        for source, jpegs in sources.items():
+            stages = bench_frames(jpegs, processor, args) | landmark_stages
+            results[f"{source}@{resolution}"] = summarize(stages)
+    if processor is not None:
+        processor.close()
+    return {"environment": environment(), "results": results}
+
+
+def print_report(report: Dict[str, Any], baseline: Dict[str, Any] | None) -> None:
+    """Печатает перцентили стадий и, если есть, изменение p50 к базовому."""
+    for name, result in report["results"].items():
+        fps = result["fps_per_core"]
+        print(f"\n{name}: {fps:.1f} кадров/с на ядро")
+        print(f"{'стадия':<20}{'p50':>10}{'p95':>10}{'p99':>10}{'к базе':>10}")
+        base = (baseline or {}).get("results", {}).get(name, {}).get("stages", {})
+        for stage, stats in result["stages"].items():
+            delta = "-"
+            if stage in base and base[stage]["p50_ms"] > 0:
+                change = stats["p50_ms"] / base[stage]["p50_ms"] - 1.0
+                delta = f"{change:+.0%}"
+            print(
+                f"{stage:<20}{stats['p50_ms']:>8.3f}ms{stats['p95_ms']:>8.3f}ms"
+                f"{stats['p99_ms']:>8.3f}ms{delta:>10}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--resolutions", nargs="+", default=DEFAULT_RESOLUTIONS, help="WxH"
+    )
+    parser.add_argument("--video", help="Ролик с приседаниями (записанные кадры)")
+    parser.add_argument("--frames", type=int, default=60, help="Кадров из ролика")
+    parser.add_argument("--recording", help="Запись сессии .kcrec для автомата")
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--with-model", action="store_true")
+    parser.add_argument("--output", help="Сохранить результат в JSON")
+    parser.add_argument("--compare", help="JSON предыдущего запуска для сравнения")
+    args = parser.parse_args()
+
+    report = run(args)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        report["baseline"] = baseline["environment"]
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        print(f"\nРезультат сохранен в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
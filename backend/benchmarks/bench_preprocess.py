@@ -0,0 +1,150 @@
+"""
+Бенчмарк: подготовка кадра с уменьшенным декодированием и обрезкой по позе.
+
+Для типичных разрешений веб-камеры сравнивает исходный путь (полное
+декодирование JPEG и перевод в RGB всего кадра) с адаптивным
+(IMREAD_REDUCED_* и обрезка по области позы предыдущего кадра). С флагом
+--with-model замеряется и инференс PoseLandmarker на полном и обрезанном
+кадре (нужен файл модели).
+
+Запуск (из директории backend/):
+    PYTHONPATH=src python -m benchmarks.bench_preprocess
+"""
+
+import argparse
+import functools
+import time
+from typing import Callable, Dict, List, cast
+
+import cv2
+import numpy as np
+from app.analysis.pose_processor import NDArrayU8, PoseProcessor
+from app.analysis.preprocess import FramePreprocessor
+
+RESOLUTIONS = ((640, 480), (1280, 720), (1920, 1080))
+# Область человека в кадре (x0, y0, x1, y1), как на типичной записи
+# приседаний: человек занимает треть ширины и почти всю высоту.
+PERSON_BOX = (0.35, 0.05, 0.65, 0.95)
+
+
+def make_jpeg(width: int, height: int, quality: int) -> bytes:
+    """Создает кадр с текстурой фона и силуэтом человека и кодирует его в JPEG."""
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 256, size=(height // 8, width // 8, 3), dtype=np.uint8)
+    frame = cv2.resize(noise, (width, height), interpolation=cv2.INTER_CUBIC)
+    x0, y0, x1, y1 = PERSON_BOX
+    cv2.rectangle(
+        frame,
+        (int(x0 * width), int(y0 * height)),
+        (int(x1 * width), int(y1 * height)),
+        (40, 40, 200),
+        thickness=-1,
+    )
+    _, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buffer.tobytes()
+
+
+def person_landmarks() -> np.ndarray:
+    """Точки позы, заполняющие PERSON_BOX (результат предыдущего кадра)."""
+    x0, y0, x1, y1 = PERSON_BOX
+    xs = np.linspace(x0, x1, 33, dtype=np.float32)
+    ys = np.linspace(y0, y1, 33, dtype=np.float32)
+    return np.stack([xs, ys, np.zeros(33), np.ones(33)], axis=1).astype(np.float32)
+
+
+def measure(func: Callable[[], object], repeats: int) -> float:
+    """Возвращает медианное время вызова в миллисекундах."""
+    samples: List[float] = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return float(np.median(samples))
+
+
+def bench_resolution(
+    width: int,
+    height: int,
+    args: argparse.Namespace,
+    processor: PoseProcessor | None,
+) -> Dict[str, Dict[str, float]]:
+    """Замеряет стадии исходного и адаптивного пути для одного разрешения."""
+    jpeg = make_jpeg(width, height, args.quality)
+    preprocessor = FramePreprocessor(args.min_long_side, args.roi_padding)
+    # Первый кадр подбирает коэффициент уменьшения, второй задает область.
+    preprocessor.decode(jpeg)
+    preprocessor.update(person_landmarks())
+
+    full = cast(
+        NDArrayU8, cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+    )
+    reduced = preprocessor.decode(jpeg)
+    assert reduced is not None
+    crop, _ = preprocessor.crop(reduced)
+    frames: Dict[str, NDArrayU8] = {"baseline": full, "adaptive": crop}
+
+    results: Dict[str, Dict[str, float]] = {
+        "baseline": {
+            "decode": measure(
+                lambda: cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR),
+                args.repeats,
+            ),
+        },
+        "adaptive": {
+            "decode": measure(lambda: preprocessor.decode(jpeg), args.repeats)
+        },
+    }
+    for path, frame in frames.items():
+        results[path]["cvtColor"] = measure(
+            functools.partial(cv2.cvtColor, frame, cv2.COLOR_BGR2RGB), args.repeats
+        )
+        if processor is not None:
+            results[path]["inference"] = measure(
+                functools.partial(processor.get_landmarks, frame), args.repeats
+            )
+        results[path]["total"] = sum(results[path].values())
+        results[path]["pixels"] = float(frame.shape[0] * frame.shape[1])
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--quality", type=int, default=70, help="Качество JPEG")
+    parser.add_argument("--min-long-side", type=int, default=512)
+    parser.add_argument("--roi-padding", type=float, default=0.25)
+    parser.add_argument(
+        "--with-model", action="store_true", help="Замерить и инференс модели"
+    )
+    args = parser.parse_args()
+
+    processor = PoseProcessor() if args.with_model else None
+    if processor is not None:
+        processor.warmup()
+    try:
+        print(
+            f"{'разрешение':<12}{'путь':<10}{'пикселей':>10}{'decode':>10}"
+            f"{'cvtColor':>10}{'инференс':>10}{'итого':>10}"
+        )
+        for width, height in RESOLUTIONS:
+            results = bench_resolution(width, height, args, processor)
+            for path, stats in results.items():
+                inference = (
+                    f"{stats['inference']:>8.2f}ms"
+                    if "inference" in stats
+                    else " " * 10
+                )
+                print(
+                    f"{f'{width}x{height}':<12}{path:<10}{stats['pixels']:>10.0f}"
+                    f"{stats['decode']:>8.2f}ms{stats['cvtColor']:>8.2f}ms"
+                    f"{inference}{stats['total']:>8.2f}ms"
+                )
+            speedup = results["baseline"]["total"] / results["adaptive"]["total"]
+            print(f"{'':<12}ускорение: {speedup:.2f}x")
+    finally:
+        if processor is not None:
+            processor.close()
+
+
+if __name__ == "__main__":
+    main()
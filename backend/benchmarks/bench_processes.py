@@ -0,0 +1,147 @@
+"""
+Бенчмарк: модель в потоках сервера против процессов-воркеров.
+
+Имитированные сессии (по потоку на сессию, как потоки исполнителя
+инференса) обрабатывают кадры каждая своим экземпляром модели:
+1. threads - экземпляры в процессе бенчмарка (inference_processes=0);
+2. processes - экземпляры в процессах-воркерах, закрепленных за ядрами,
+   кадры передаются через разделяемую память (app.inference.processes).
+
+По умолчанию вместо модели выполняется синтетическая работа: OpenCV
+(отпускает GIL) и расчет на Python (держит GIL), как подготовка
+изображения и разбор результата MediaPipe. С флагом --with-model
+используется PoseProcessor (нужен файл модели).
+
+Для каждого варианта выводятся кадры в секунду и задержка кадра.
+
+Запуск (из директории backend/):
+    PYTHONPATH=src python -m benchmarks.bench_processes --sessions 8
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import cv2
+import numpy as np
+from app.analysis.pose_analyzer import PackedLandmark
+from app.analysis.pose_processor import NDArrayU8, PoseProcessor, RunningMode
+from app.inference.processes import InferenceProcessPool
+
+from benchmarks.bench_pipeline import environment
+
+FRAME_SHAPE = (360, 640, 3)
+# Итераций расчета на Python на кадр: несколько миллисекунд под GIL.
+PYTHON_WORK = 20_000
+
+
+class SyntheticProcessor(PoseProcessor):
+    """Модель-заглушка с долей работы под GIL."""
+
+    def __init__(self, running_mode: RunningMode = "IMAGE") -> None:
+        self.running_mode = running_mode
+
+    def get_landmarks(
+        self, frame: NDArrayU8, timestamp_ms: int | None = None
+    ) -> List[PackedLandmark] | None:
+        blurred = cv2.GaussianBlur(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), (9, 9), 0)
+        total = 0.0
+        for i in range(PYTHON_WORK):
+            total += (i % 7) * 0.5
+        x = float(blurred[0, 0, 0]) / 255
+        return [PackedLandmark(x, 0.5, 0.0, 1.0)] * 33
+
+    def warmup(self) -> None:
+        self.get_landmarks(np.zeros(FRAME_SHAPE, np.uint8))
+
+    def close(self) -> None:
+        pass
+
+
+def run_sessions(processors: List[PoseProcessor], frames: int) -> Dict[str, float]:
+    """Каждая сессия в своем потоке обрабатывает `frames` кадров подряд."""
+    frame = np.random.default_rng(0).integers(0, 256, FRAME_SHAPE, dtype=np.uint8)
+    for processor in processors:
+        processor.warmup()
+
+    def session(processor: PoseProcessor) -> List[float]:
+        latencies = []
+        for _ in range(frames):
+            started = time.perf_counter()
+            processor.get_landmarks(frame)
+            latencies.append((time.perf_counter() - started) * 1000.0)
+        return latencies
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(processors)) as pool:
+        results = list(pool.map(session, processors))
+    elapsed = time.perf_counter() - started
+    latencies = np.concatenate(results)
+    p50, p95 = np.percentile(latencies, [50, 95])
+    return {
+        "fps": len(latencies) / elapsed,
+        "latency_ms_p50": float(p50),
+        "latency_ms_p95": float(p95),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    factory = PoseProcessor if args.with_model else SyntheticProcessor
+    results: Dict[str, Dict[str, float]] = {}
+
+    processors = [factory("IMAGE") for _ in range(args.sessions)]
+    results["threads"] = run_sessions(processors, args.frames)
+    for processor in processors:
+        processor.close()
+
+    pool = InferenceProcessPool(
+        processes=args.processes,
+        ring_slots=-(-args.sessions // args.processes),
+        frame_max_bytes=int(np.prod(FRAME_SHAPE)),
+        factory=factory,
+    )
+    pool.start()
+    try:
+        remote: List[PoseProcessor] = [
+            pool.create_processor("IMAGE") for _ in range(args.sessions)
+        ]
+        results["processes"] = run_sessions(remote, args.frames)
+        for processor in remote:
+            processor.close()
+    finally:
+        pool.shutdown()
+    return {
+        "environment": environment(),
+        "sessions": args.sessions,
+        "processes": args.processes,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--frames", type=int, default=100, help="Кадров на сессию")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--with-model", action="store_true")
+    parser.add_argument("--output", help="Сохранить результат в JSON")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(f"{'вариант':<12}{'кадров/с':>10}{'p50':>10}{'p95':>10}")
+    for name, stats in report["results"].items():
+        print(
+            f"{name:<12}{stats['fps']:>10.1f}{stats['latency_ms_p50']:>8.2f}ms"
+            f"{stats['latency_ms_p95']:>8.2f}ms"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        print(f"\nРезультат сохранен в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Бенчмарк: задержка обработки кадра в режимах IMAGE и VIDEO.
+
+Прогоняет записанный ролик с приседаниями через PoseProcessor в каждом
+режиме и выводит статистику задержки get_landmarks на кадр.
+
+Запуск (из директории backend/):
+    PYTHONPATH=src python -m benchmarks.bench_running_mode --video squats.mp4
+"""
+
+import argparse
+import time
+from typing import Dict, List, cast, get_args
+
+import cv2
+import numpy as np
+from app.analysis.pose_processor import NDArrayU8, PoseProcessor, RunningMode
+
+
+def read_frames(path: str, max_frames: int) -> tuple[List[NDArrayU8], float]:
+    """Читает до `max_frames` кадров ролика и возвращает их вместе с FPS."""
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise SystemExit(f"Не удалось открыть видео: {path}")
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    frames: List[NDArrayU8] = []
+    while len(frames) < max_frames:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(cast(NDArrayU8, frame))
+    capture.release()
+    return frames, fps
+
+
+def run_mode(
+    running_mode: RunningMode, frames: List[NDArrayU8], fps: float, warmup: int
+) -> Dict[str, float]:
+    """Измеряет задержку get_landmarks на каждом кадре в заданном режиме."""
+    processor = PoseProcessor(running_mode=running_mode)
+    frame_interval_ms = 1000.0 / fps
+    latencies_ms: List[float] = []
+    detected = 0
+    try:
+        for index, frame in enumerate(frames):
+            timestamp_ms = int(index * frame_interval_ms)
+            started = time.perf_counter()
+            landmarks = processor.get_landmarks(frame, timestamp_ms=timestamp_ms)
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            if index >= warmup:
+                latencies_ms.append(elapsed_ms)
+                detected += landmarks is not None
+    finally:
+        processor.close()
+
+    samples = np.asarray(latencies_ms)
+    return {
+        "frames": float(samples.size),
+        "mean_ms": float(samples.mean()),
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "max_ms": float(samples.max()),
+        "detected_ratio": detected / samples.size,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--video", required=True, help="Путь к ролику с приседаниями")
+    parser.add_argument("--max-frames", type=int, default=900)
+    parser.add_argument(
+        "--warmup", type=int, default=10, help="Сколько первых кадров не учитывать"
+    )
+    args = parser.parse_args()
+
+    frames, fps = read_frames(args.video, args.max_frames)
+    if len(frames) <= args.warmup:
+        raise SystemExit("В ролике слишком мало кадров для замера.")
+    height, width = frames[0].shape[:2]
+    print(f"Ролик: {args.video}, {len(frames)} кадров {width}x{height} @ {fps:.1f} FPS")
+
+    results = {
+        mode: run_mode(mode, frames, fps, args.warmup) for mode in get_args(RunningMode)
+    }
+
+    header = f"{'режим':<8}{'mean':>10}{'p50':>10}{'p95':>10}{'max':>10}{'поза':>8}"
+    print(header)
+    for mode, stats in results.items():
+        print(
+            f"{mode:<8}{stats['mean_ms']:>8.2f}ms{stats['p50_ms']:>8.2f}ms"
+            f"{stats['p95_ms']:>8.2f}ms{stats['max_ms']:>8.2f}ms"
+            f"{stats['detected_ratio']:>8.0%}"
+        )
+    speedup = results["IMAGE"]["mean_ms"] / results["VIDEO"]["mean_ms"]
+    print(f"VIDEO быстрее IMAGE в {speedup:.2f} раза (по среднему).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Бенчмарк: холодный старт сервиса.
+
+Замеряет в отдельных процессах (каждый запуск - холодный импорт):
+1. import_app - импорт app.main (то, что нужно, чтобы отвечать на /health);
+2. import_cv_stack - импорт OpenCV и MediaPipe (`pose_processor.preload`),
+   который выполняется в фоне после старта.
+
+Затем запускает uvicorn и замеряет от запуска процесса:
+- health_s - до первого ответа 200 на /health;
+- ready_s - до готовности /ready (модели загружены и прогреты);
+- first_frame_s - до первого FEEDBACK на кадр, отправленный сразу после
+  готовности (или после /health, если узел не стал готовым за
+  --ready-timeout секунд).
+
+Кадр - синтетический JPEG (--frame image, нужен файл модели) или
+упакованные ключевые точки (--frame landmarks, модель не нужна).
+Результат сохраняется в JSON (--output) вместе с коммитом и версиями
+библиотек, как в bench_pipeline.
+
+Запуск (из директории backend/):
+    PYTHONPATH=src python -m benchmarks.bench_startup --runs 3
+"""
+
+import argparse
+import base64
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Dict, List
+
+import numpy as np
+from app.protocol import pack_landmarks
+from websockets.sync.client import connect
+
+from benchmarks.bench_pipeline import environment, squat_landmarks
+from benchmarks.bench_preprocess import make_jpeg
+
+IMPORTS = {
+    "import_app": "import app.main",
+    "import_cv_stack": "from app.analysis.pose_processor import preload\npreload()",
+}
+POLL_INTERVAL_S = 0.01
+
+
+def _env() -> Dict[str, str]:
+    src = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+    return {**os.environ, "PYTHONPATH": src}
+
+
+def import_time(statement: str) -> float:
+    """Время выполнения `statement` в новом процессе, в секундах."""
+    code = (
+        "import time\n"
+        "started = time.perf_counter()\n"
+        f"{statement}\n"
+        "print(time.perf_counter() - started)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env=_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+def _wait_status(url: str, deadline: float) -> bool:
+    """Опрашивает url, пока он не ответит 200 или не наступит срок."""
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1.0) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(POLL_INTERVAL_S)
+    return False
+
+
+def frame_message(kind: str) -> str:
+    """Сообщение POSE_DATA с синтетическим кадром или точками."""
+    if kind == "image":
+        payload = {"frame": base64.b64encode(make_jpeg(640, 480, 80)).decode()}
+    else:
+        points = np.array(squat_landmarks()[0], dtype=np.float32)
+        payload = {"landmarks": base64.b64encode(pack_landmarks(points)).decode()}
+    return json.dumps({"type": "POSE_DATA", "payload": payload})
+
+
+def server_startup(args: argparse.Namespace) -> Dict[str, float | None]:
+    """Запускает uvicorn и замеряет время до /health, /ready и первого кадра."""
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    message = frame_message(args.frame)
+    started = time.monotonic()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        env=_env(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not _wait_status(f"{base}/health", started + args.health_timeout):
+            raise SystemExit("Сервер не ответил на /health.")
+        health_s = time.monotonic() - started
+        ready = _wait_status(f"{base}/ready", time.monotonic() + args.ready_timeout)
+        ready_s = time.monotonic() - started if ready else None
+        with connect(f"ws://127.0.0.1:{port}/ws/analysis") as websocket:
+            websocket.send(message)
+            response = json.loads(websocket.recv(timeout=args.ready_timeout))
+        first_frame_s = time.monotonic() - started
+        if response["type"] != "FEEDBACK":
+            raise SystemExit(f"Первый кадр не обработан: {response}")
+    finally:
+        server.terminate()
+        server.wait()
+    return {"health_s": health_s, "ready_s": ready_s, "first_frame_s": first_frame_s}
+
+
+def _median(values: List[float | None]) -> float | None:
+    present = [value for value in values if value is not None]
+    return statistics.median(present) if len(present) == len(values) else None
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    results: Dict[str, float | None] = {
+        name: statistics.median(import_time(code) for _ in range(args.runs))
+        for name, code in IMPORTS.items()
+    }
+    runs = [server_startup(args) for _ in range(args.runs)]
+    for key in runs[0]:
+        results[key] = _median([run[key] for run in runs])
+    return {"environment": environment(), "frame": args.frame, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--frame", choices=["image", "landmarks"], default="image")
+    parser.add_argument("--health-timeout", type=float, default=30.0)
+    parser.add_argument("--ready-timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="Сохранить результат в JSON")
+    args = parser.parse_args()
+
+    report = run(args)
+    for name, value in report["results"].items():
+        shown = f"{value:.3f} с" if value is not None else "-"
+        print(f"{name:<16}{shown:>10}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        print(f"\nРезультат сохранен в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
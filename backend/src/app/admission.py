@@ -0,0 +1,132 @@
+"""
+Допуск сессий и ограничение частоты кадров.
+
+Один клиент (или ошибка в клиентском таймере) не должен занимать
+процессор за всех: узел принимает не больше max_sessions сессий,
+каждое соединение присылает кадры не чаще лимита (token bucket), о
+превышении лимита клиент узнает не чаще раза за окно, а соединение,
+продолжающее слать кадры намного чаще лимита, закрывается; размер
+сообщения проверяется до разбора JSON и base64, а сессия без сообщений
+дольше session_idle_timeout_s закрывается и освобождает экземпляр модели.
+Загрузки видео на анализ ограничены отдельно: не больше
+offline_max_uploads одновременно.
+"""
+
+import threading
+import time
+from typing import Callable
+
+from app.config import Settings
+
+# Коды закрытия WebSocket (RFC 6455): 1013 - "Try Again Later", клиенту
+# стоит переподключиться позже (балансировщик выберет другой узел);
+# 1001 - "Going Away", сервер закрыл простаивающую сессию; 1008 - "Policy
+# Violation", клиент продолжает присылать кадры сверх лимита частоты.
+CLOSE_OVERLOADED = 1013
+CLOSE_IDLE = 1001
+CLOSE_POLICY = 1008
+
+
+class FrameFloodError(Exception):
+    """Клиент прислал за окно больше отклоненных кадров, чем допускается."""
+
+
+class SessionIdleError(Exception):
+    """Клиент не присылал сообщений дольше session_idle_timeout_s."""
+
+
+class TokenBucket:
+    """
+    Ограничение частоты: `rate` событий в секунду в среднем и до `burst`
+    событий подряд.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+
+    @classmethod
+    def for_frames(cls, settings: Settings) -> "TokenBucket | None":
+        """Лимит кадров соединения по настройкам; None - без лимита."""
+        if not settings.frame_rate_limit_fps:
+            return None
+        return cls(settings.frame_rate_limit_fps, settings.frame_rate_burst)
+
+    def take(self) -> bool:
+        """Забирает токен; False - лимит исчерпан, событие нужно отклонить."""
+        now = self._clock()
+        self._tokens = min(
+            float(self.burst), self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+
+class RejectionWindow:
+    """
+    Счетчик отклоненных событий в окне длиной `window_s` секунд.
+
+    Окно начинается с первого отклонения после истечения предыдущего.
+    """
+
+    def __init__(
+        self,
+        window_s: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.window_s = window_s
+        self.count = 0
+        self._clock = clock
+        self._started = -float("inf")
+
+    def record(self) -> bool:
+        """Учитывает отклонение; True - первое в новом окне."""
+        now = self._clock()
+        if now - self._started >= self.window_s:
+            self._started = now
+            self.count = 0
+        self.count += 1
+        return self.count == 1
+
+
+class ConcurrencyLimit:
+    """
+    Ограничение числа одновременных операций без очереди: операция сверх
+    `limit` сразу отклоняется.
+
+    Освобождение потокобезопасно и срабатывает один раз: потоковый ответ
+    может завершиться и в потоке итерации, и в фоновой задаче.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.active = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> Callable[[], None] | None:
+        """Занимает место; возвращает функцию освобождения или None."""
+        with self._lock:
+            if self.active >= self.limit:
+                return None
+            self.active += 1
+        released = threading.Event()
+
+        def release() -> None:
+            with self._lock:
+                if released.is_set():
+                    return
+                released.set()
+                self.active -= 1
+
+        return release
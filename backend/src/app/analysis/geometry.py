@@ -0,0 +1,135 @@
+"""
+Векторизованная геометрия позы.
+
+Работает с массивом ключевых точек формы (N, 33, 4) (x, y, z, visibility)
+и за один проход считает углы всех суставов и расстояния для N кадров.
+Для потоковой обработки одного кадра есть скалярная версия `angle`.
+
+Углы считаются в 2D (только x и y). Скалярная версия повторяет прежнюю
+арифметику `math_utils.calculate_angle` и совпадает с ней побитово:
+от этих углов зависят пороги конечного автомата. Векторизованная версия
+совпадает с ней с точностью до округления в последнем знаке.
+"""
+
+import math
+from typing import Dict, Mapping, Tuple, TypeAlias
+
+import numpy as np
+from numpy.typing import NDArray
+
+NDArrayF64: TypeAlias = NDArray[np.float64]
+
+# Индексы ключевых точек MediaPipe Pose.
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_HIP, RIGHT_HIP = 23, 24
+LEFT_KNEE, RIGHT_KNEE = 25, 26
+LEFT_ANKLE, RIGHT_ANKLE = 27, 28
+LEFT_FOOT_INDEX, RIGHT_FOOT_INDEX = 31, 32
+
+# Суставы: (точка, вершина угла, точка).
+JOINTS: Mapping[str, Tuple[int, int, int]] = {
+    "left_knee": (LEFT_HIP, LEFT_KNEE, LEFT_ANKLE),
+    "right_knee": (RIGHT_HIP, RIGHT_KNEE, RIGHT_ANKLE),
+    "left_hip": (LEFT_SHOULDER, LEFT_HIP, LEFT_KNEE),
+    "right_hip": (RIGHT_SHOULDER, RIGHT_HIP, RIGHT_KNEE),
+    "left_ankle": (LEFT_KNEE, LEFT_ANKLE, LEFT_FOOT_INDEX),
+    "right_ankle": (RIGHT_KNEE, RIGHT_ANKLE, RIGHT_FOOT_INDEX),
+}
+# Точки, видимость которых нужна правилам анализа приседания.
+KEY_POINTS = [
+    LEFT_SHOULDER,
+    RIGHT_SHOULDER,
+    LEFT_HIP,
+    LEFT_KNEE,
+    LEFT_ANKLE,
+    LEFT_FOOT_INDEX,
+]
+# Наклон корпуса: отрезок (бедро, плечо) относительно вертикали.
+TORSO: Mapping[str, Tuple[int, int]] = {
+    "left_torso": (LEFT_HIP, LEFT_SHOULDER),
+    "right_torso": (RIGHT_HIP, RIGHT_SHOULDER),
+}
+
+_FIRST, _VERTEX, _LAST = (
+    np.array(indices) for indices in zip(*JOINTS.values(), strict=True)
+)
+
+
+def angle(ax: float, ay: float, bx: float, by: float, cx: float, cy: float) -> float:
+    """
+    Угол ABC в градусах (от 0 до 180) для одного кадра.
+
+    Операции те же, что в прежней реализации на np.dot, np.linalg.norm
+    и np.clip (то же скалярное произведение NumPy в том же типе данных),
+    поэтому результат совпадает с ней побитово и для float32. Быстрее
+    она за счет отказа от обвязки np.linalg.norm и np.clip.
+    Если одна из точек совпадает с вершиной, возвращает 0.
+    """
+    v1 = np.array([ax - bx, ay - by])
+    v2 = np.array([cx - bx, cy - by])
+    # np.linalg.norm для вектора - это sqrt(x.dot(x)).
+    norm_product = np.sqrt(v1.dot(v1)) * np.sqrt(v2.dot(v2))
+    if norm_product == 0:
+        return 0.0
+    cosine = np.dot(v1, v2) / norm_product
+    return math.degrees(math.acos(min(max(cosine, -1.0), 1.0)))
+
+
+def _angles(v1: NDArrayF64, v2: NDArrayF64) -> NDArrayF64:
+    """Углы между векторами (..., 2) в градусах; 0 для нулевых векторов."""
+    dot = v1[..., 0] * v2[..., 0] + v1[..., 1] * v2[..., 1]
+    norm_product = np.sqrt(v1[..., 0] ** 2 + v1[..., 1] ** 2) * np.sqrt(
+        v2[..., 0] ** 2 + v2[..., 1] ** 2
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cosine = np.clip(dot / norm_product, -1.0, 1.0)
+    result: NDArrayF64 = np.where(norm_product == 0, 0.0, np.degrees(np.arccos(cosine)))
+    return result
+
+
+def joint_angles(landmarks: NDArray[np.floating]) -> NDArrayF64:
+    """
+    Углы всех суставов из JOINTS для N кадров за один проход.
+
+    Args:
+        landmarks: Массив (N, 33, 4) или (33, 4).
+
+    Returns:
+        Массив (N, len(JOINTS)) в порядке JOINTS (для одного кадра - (len(JOINTS),)).
+    """
+    xy = np.asarray(landmarks, dtype=np.float64)[..., :2]
+    vertex = xy[..., _VERTEX, :]
+    return _angles(xy[..., _FIRST, :] - vertex, xy[..., _LAST, :] - vertex)
+
+
+def frame_metrics(landmarks: NDArray[np.floating]) -> Dict[str, NDArrayF64]:
+    """
+    Все метрики позы для N кадров: углы суставов, наклон корпуса
+    и расстояния, используемые правилами анализа.
+
+    Args:
+        landmarks: Массив (N, 33, 4).
+
+    Returns:
+        Словарь "имя метрики" -> массив (N,).
+    """
+    points = np.asarray(landmarks, dtype=np.float64)
+    xy = points[..., :2]
+    angles = joint_angles(points)
+    metrics = {name: angles[..., i] for i, name in enumerate(JOINTS)}
+
+    # Вертикаль вверх: ось y MediaPipe направлена вниз.
+    up = np.array([0.0, -1.0])
+    for name, (hip, shoulder) in TORSO.items():
+        segment = xy[..., shoulder, :] - xy[..., hip, :]
+        metrics[name] = _angles(segment, np.broadcast_to(up, segment.shape))
+
+    metrics["shoulder_width"] = np.abs(
+        xy[..., LEFT_SHOULDER, 0] - xy[..., RIGHT_SHOULDER, 0]
+    )
+    metrics["left_knee_foot_diff"] = xy[..., LEFT_KNEE, 0] - xy[..., LEFT_FOOT_INDEX, 0]
+    metrics["right_knee_foot_diff"] = (
+        xy[..., RIGHT_KNEE, 0] - xy[..., RIGHT_FOOT_INDEX, 0]
+    )
+    metrics["key_visibility"] = points[..., KEY_POINTS, 3].min(axis=-1)
+    return metrics
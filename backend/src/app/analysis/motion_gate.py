@@ -0,0 +1,85 @@
+"""
+Содержит класс MotionGate - дешевый фильтр кадров перед инференсом.
+
+Большую часть сессии пользователь стоит неподвижно между подходами, и
+соседние кадры почти не отличаются. Фильтр сравнивает уменьшенную
+полутоновую миниатюру кадра с миниатюрой последнего кадра, прошедшего
+через модель, и позволяет переиспользовать уже найденные ключевые точки.
+"""
+
+from typing import TypeAlias, cast
+
+import numpy as np
+from numpy.typing import NDArray
+
+NDArrayU8: TypeAlias = NDArray[np.uint8]
+
+# Сторона квадратной миниатюры в пикселях.
+THUMBNAIL_SIZE = 32
+
+
+class MotionGate:
+    """
+    Решает, нужно ли запускать модель для очередного кадра.
+
+    Кадры сравниваются с опорной миниатюрой - последним кадром, для которого
+    выполнялся инференс, - а не с предыдущим кадром: иначе медленное
+    движение накапливалось бы незамеченным.
+    """
+
+    def __init__(self, threshold: float, max_skip: int) -> None:
+        """
+        Args:
+            threshold: Средняя абсолютная разница яркости миниатюр (0-255),
+                ниже которой кадр считается почти дубликатом. 0 отключает
+                фильтр.
+            max_skip: Максимальное число пропусков подряд; после него
+                инференс выполняется принудительно.
+        """
+        self.threshold = threshold
+        self.max_skip = max_skip
+        self.frames = 0
+        self.skipped = 0
+        self._reference: NDArrayU8 | None = None
+        self._consecutive = 0
+
+    @property
+    def skip_rate(self) -> float:
+        """Доля кадров, для которых инференс был пропущен."""
+        return self.skipped / self.frames if self.frames else 0.0
+
+    @staticmethod
+    def thumbnail(frame: NDArrayU8) -> NDArrayU8:
+        """Уменьшает кадр BGR до полутоновой миниатюры."""
+        import cv2
+
+        small = cv2.resize(
+            frame, (THUMBNAIL_SIZE, THUMBNAIL_SIZE), interpolation=cv2.INTER_AREA
+        )
+        return cast(NDArrayU8, cv2.cvtColor(small, cv2.COLOR_BGR2GRAY))
+
+    def should_skip(self, frame: NDArrayU8) -> bool:
+        """
+        Проверяет кадр и обновляет счетчики.
+
+        Returns:
+            True, если кадр почти совпадает с опорным и можно переиспользовать
+            последние ключевые точки; иначе кадр становится новым опорным.
+        """
+        self.frames += 1
+        if self.threshold <= 0:
+            return False
+        import cv2
+
+        thumb = self.thumbnail(frame)
+        if (
+            self._reference is not None
+            and self._consecutive < self.max_skip
+            and float(cv2.absdiff(thumb, self._reference).mean()) < self.threshold
+        ):
+            self._consecutive += 1
+            self.skipped += 1
+            return True
+        self._reference = thumb
+        self._consecutive = 0
+        return False
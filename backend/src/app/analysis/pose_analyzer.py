@@ -3,23 +3,43 @@
 и управление состоянием сессии анализа.
 """
 
-import base64
+import binascii
 import logging
+import time
 from collections import defaultdict
-from typing import Any, Dict, List, TypeAlias, cast
+from typing import Any, Dict, List, NamedTuple, TypeAlias, cast
 
-import cv2
 import numpy as np
+from app import metrics
 from app.analysis import rules
 from app.analysis.math_utils import calculate_angle
+from app.analysis.motion_gate import MotionGate
 from app.analysis.pose_processor import PoseProcessor
+from app.analysis.preprocess import FramePreprocessor
+from app.encoding import FeedbackEncoder, FrameResult, landmarks_to_array
+from app.protocol import NDArrayF32
+from app.recording import SessionRecorder
 from app.schemas import ServerMessage
 from numpy.typing import NDArray
 
 logger = logging.getLogger(__name__)
 
+# Префикс data URL ("data:image/jpeg;base64,") ищется только в начале строки.
+DATA_URL_PREFIX_MAX = 64
+
 NDArrayU8: TypeAlias = NDArray[np.uint8]
 Landmarks: TypeAlias = List[Any]
+# Байты сжатого изображения: bytes или представление поверх сообщения.
+Buffer: TypeAlias = bytes | memoryview
+
+
+class PackedLandmark(NamedTuple):
+    """Ключевая точка, присланная клиентом в упакованном виде."""
+
+    x: float
+    y: float
+    z: float
+    visibility: float
 
 
 class PoseAnalyzer:
@@ -28,27 +48,71 @@ class PoseAnalyzer:
     Реализует конечный автомат для отслеживания фаз приседания.
     """
 
-    def __init__(self) -> None:
-        self.processor = PoseProcessor()
+    def __init__(
+        self,
+        processor: PoseProcessor | None = None,
+        *,
+        load_model: bool = True,
+        motion_gate: MotionGate | None = None,
+        preprocessor: FramePreprocessor | None = None,
+        recorder: SessionRecorder | None = None,
+    ) -> None:
+        """
+        Args:
+            processor: Экземпляр PoseProcessor, выданный общим пулом.
+            load_model: Создать собственный PoseProcessor, если `processor`
+                не передан (тесты, скрипты). Сессии передают False и
+                подключают экземпляр из пула только при первом кадре-изображении.
+            motion_gate: Фильтр почти одинаковых кадров; для них инференс
+                пропускается и переиспользуются последние ключевые точки.
+            preprocessor: Уменьшенное декодирование и обрезка кадра по
+                области предыдущей позы.
+            recorder: Запись точек каждого кадра на диск для воспроизведения.
+        """
+        if processor is None and load_model:
+            processor = PoseProcessor()
+        self.processor: PoseProcessor | None = processor
         self.rep_counter: int = 0
         self.state: str = "UP"
         self.min_knee_angle: float = 180.0
         self.feedback: List[str] = []
         self.debug_data: Dict[str, float] = {}
         self.stats: Dict[str, int] = defaultdict(int)
+        # Формат ответов FEEDBACK; сессия заменяет его согласно START_SESSION.
+        self.encoder = FeedbackEncoder()
+        self.motion_gate = motion_gate
+        self.preprocessor = preprocessor
+        self.recorder = recorder
+        self._last_landmarks: Landmarks | None = None
         logger.info("Экземпляр PoseAnalyzer создан и инициализирован.")
 
     def _decode_frame(self, base64_str: str) -> NDArrayU8 | None:
         try:
-            if "," in base64_str:
-                base64_str = base64_str.split(",")[1]
-            img_bytes = base64.b64decode(base64_str)
-            img_arr = np.frombuffer(img_bytes, dtype=np.uint8)
-            frame = cv2.imdecode(img_arr, cv2.IMREAD_COLOR)
-            return cast(NDArrayU8, frame)
+            # a2b_base64 читает ASCII-строку напрямую, без перекодирования в
+            # bytes (base64.b64decode делает копию); строка без префикса
+            # data URL не копируется вовсе.
+            comma = base64_str.find(",", 0, DATA_URL_PREFIX_MAX)
+            if comma >= 0:
+                base64_str = base64_str[comma + 1 :]
+            img_bytes = binascii.a2b_base64(base64_str)
         except Exception as e:
             logger.error(f"Ошибка декодирования base64 кадра: {e}")
             return None
+        return self._decode_image(img_bytes)
+
+    def _decode_image(self, buffer: Buffer) -> NDArrayU8 | None:
+        """Декодирует сжатое изображение (JPEG/WebP) без копирования буфера."""
+        try:
+            if self.preprocessor is not None:
+                return self.preprocessor.decode(buffer)
+            import cv2
+
+            img_arr = np.frombuffer(buffer, dtype=np.uint8)
+            frame = cv2.imdecode(img_arr, cv2.IMREAD_COLOR)
+        except Exception as e:
+            logger.error(f"Ошибка декодирования кадра: {e}")
+            return None
+        return cast(NDArrayU8 | None, frame)
 
     def _update_stats(self) -> None:
         if not self.feedback:
@@ -60,13 +124,13 @@ class PoseAnalyzer:
                 self.stats[error] += 1
 
     def _check_errors_down_phase(
-        self, hip_angle: float, knee_x: float, foot_x: float, shoulder_width: float
+        self, hip_angle: float, knee_foot_diff: float, knee_threshold: float
     ) -> None:
         if hip_angle < rules.BODY_BEND_FORWARD_THRESHOLD:
             if "BEND_FORWARD" not in self.feedback:
                 self.feedback.append("BEND_FORWARD")
         # Сравниваем смещение колена относительно носка
-        if abs(knee_x - foot_x) > (shoulder_width * rules.KNEE_OVER_TOE_THRESHOLD):
+        if abs(knee_foot_diff) > knee_threshold:
             if "KNEE_OVER_TOE" not in self.feedback:
                 self.feedback.append("KNEE_OVER_TOE")
 
@@ -106,14 +170,29 @@ class PoseAnalyzer:
         knee_angle = calculate_angle(hip, knee, ankle)
         hip_angle = calculate_angle(shoulder_l, hip, knee)
         shoulder_width = abs(shoulder_l.x - shoulder_r.x)
+        knee_foot_diff = knee.x - foot.x
+        knee_threshold = shoulder_width * rules.KNEE_OVER_TOE_THRESHOLD
 
         self.debug_data = {
             "knee_angle": knee_angle,
             "hip_angle": hip_angle,
-            "knee_foot_diff": knee.x - foot.x,
-            "knee_threshold": shoulder_width * rules.KNEE_OVER_TOE_THRESHOLD,
+            "knee_foot_diff": knee_foot_diff,
+            "knee_threshold": knee_threshold,
         }
+        self._step(knee_angle, hip_angle, knee_foot_diff, knee_threshold)
+
+    def _step(
+        self,
+        knee_angle: float,
+        hip_angle: float,
+        knee_foot_diff: float,
+        knee_threshold: float,
+    ) -> None:
+        """
+        Один шаг конечного автомата по уже рассчитанным метрикам кадра.
 
+        Пакетный аналог для целого ряда кадров - `segmentation.segment_reps`.
+        """
         # --- Логика конечного автомата ---
 
         if self.state == "UP":
@@ -128,7 +207,7 @@ class PoseAnalyzer:
         if self.state == "DOWN":
             # ОБРАБОТКА ФАЗЫ ПРИСЕДА
             self.min_knee_angle = min(self.min_knee_angle, knee_angle)
-            self._check_errors_down_phase(hip_angle, knee.x, foot.x, shoulder_width)
+            self._check_errors_down_phase(hip_angle, knee_foot_diff, knee_threshold)
 
             if knee_angle > rules.REP_TRANSITION_ANGLE:
                 # ЗАВЕРШЕНИЕ ПОВТОРЕНИЯ: Переход DOWN -> UP
@@ -138,7 +217,9 @@ class PoseAnalyzer:
                 if not self.feedback:
                     self.feedback.append("GOOD_REP")
                 self._update_stats()
-                logger.info(f"Повторение {self.rep_counter} завершено: {self.feedback}")
+                logger.debug(
+                    "Повторение %d завершено: %s", self.rep_counter, self.feedback
+                )
 
     def generate_report(self) -> ServerMessage:
         report_payload = {
@@ -151,39 +232,134 @@ class PoseAnalyzer:
         return ServerMessage(type="REPORT", payload=report_payload)
 
     def process_frame(self, data: Dict[str, Any]) -> ServerMessage:
+        """Обрабатывает кадр из JSON-сообщения (изображение в base64)."""
         frame_b64 = data.get("frame")
         if not frame_b64 or not isinstance(frame_b64, str):
             return ServerMessage(type="ERROR", payload={"message": "Frame is missing."})
 
+        started = time.perf_counter()
         frame = self._decode_frame(frame_b64)
+        metrics.DECODE_SECONDS.observe(time.perf_counter() - started)
+        if frame is None:
+            return ServerMessage(
+                type="ERROR", payload={"message": "Frame decode error."}
+            )
+        return self._process_decoded(frame)
+
+    def process_image(
+        self, buffer: Buffer, timestamp_ms: int | None = None
+    ) -> ServerMessage:
+        """
+        Обрабатывает кадр из бинарного сообщения.
+
+        Args:
+            buffer: Байты JPEG/WebP (например, memoryview поверх сообщения).
+            timestamp_ms: Метка времени кадра от клиента.
+        """
+        started = time.perf_counter()
+        frame = self._decode_image(buffer)
+        metrics.DECODE_SECONDS.observe(time.perf_counter() - started)
         if frame is None:
             return ServerMessage(
                 type="ERROR", payload={"message": "Frame decode error."}
             )
+        return self._process_decoded(frame, timestamp_ms)
+
+    def process_landmarks(self, landmarks: NDArrayF32) -> ServerMessage:
+        """
+        Обрабатывает ключевые точки, рассчитанные на клиенте.
+
+        Декодирование и инференс пропускаются, выполняется только конечный
+        автомат. Точки не отправляются обратно: они уже есть у клиента.
+
+        Args:
+            landmarks: Массив формы (33, 4): x, y, z, visibility.
+        """
+        points = [PackedLandmark(*row) for row in landmarks.tolist()]
+        return self._build_feedback(points, echo_landmarks=False)
+
+    def process_detected(self, landmarks: Landmarks | None) -> ServerMessage:
+        """
+        Обрабатывает точки, уже найденные моделью вне анализатора
+        (например, при офлайн-анализе видео). Точки в ответ не добавляются.
+
+        Args:
+            landmarks: Точки MediaPipe или None, если поза не найдена.
+        """
+        return self._build_feedback(landmarks, echo_landmarks=False)
+
+    def _process_decoded(
+        self, frame: NDArrayU8, timestamp_ms: int | None = None
+    ) -> ServerMessage:
+        if self.processor is None:
+            return ServerMessage(
+                type="ERROR", payload={"message": "Landmarker is not attached."}
+            )
+        if self.motion_gate is not None and self.motion_gate.should_skip(frame):
+            # Кадр почти не изменился: повторный анализ тех же точек не меняет
+            # состояние конечного автомата, поэтому результат совпадает.
+            landmarks = self._last_landmarks
+            metrics.INFERENCE_SKIPPED.inc()
+        else:
+            started = time.perf_counter()
+            landmarks = self._detect(self.processor, frame, timestamp_ms)
+            metrics.INFERENCE_SECONDS.observe(time.perf_counter() - started)
+            self._last_landmarks = landmarks
+        return self._build_feedback(landmarks, echo_landmarks=True)
 
-        landmarks = self.processor.get_landmarks(frame)
-        has_landmarks = landmarks is not None
+    def _detect(
+        self, processor: PoseProcessor, frame: NDArrayU8, timestamp_ms: int | None
+    ) -> Landmarks | None:
+        """
+        Запускает модель на области вокруг предыдущей позы.
+
+        Обрезка применяется только в режиме IMAGE: в режиме VIDEO MediaPipe
+        сам отслеживает область позы между кадрами.
+        """
+        if self.preprocessor is None:
+            return processor.get_landmarks(frame, timestamp_ms)
+        crop, roi = frame, None
+        if processor.running_mode == "IMAGE":
+            crop, roi = self.preprocessor.crop(frame)
+        landmarks = processor.get_landmarks(crop, timestamp_ms)
+        if roi is not None:
+            if landmarks is None:
+                # Человек вышел за пределы области: ищем его на всем кадре.
+                landmarks = processor.get_landmarks(frame, timestamp_ms)
+            else:
+                array = self.preprocessor.to_full_frame(
+                    landmarks_to_array(landmarks), roi
+                )
+                landmarks = [PackedLandmark(*row) for row in array.tolist()]
+        self.preprocessor.update(
+            landmarks_to_array(landmarks) if landmarks is not None else None
+        )
+        return landmarks
+
+    def _build_feedback(
+        self, landmarks: Landmarks | None, echo_landmarks: bool
+    ) -> ServerMessage:
+        if self.recorder is not None:
+            self.recorder.write(landmarks)
+        started = time.perf_counter()
         feedback_to_send = []
-        serializable_landmarks = []
 
         if landmarks is not None:
             state_before = self.state
             self._analyze_pose(landmarks)
             if state_before == "DOWN" and self.state == "UP":
                 feedback_to_send = self.feedback
-            serializable_landmarks = [
-                {"x": lm.x, "y": lm.y, "z": lm.z, "visibility": lm.visibility}
-                for lm in landmarks
-            ]
         else:
             self.debug_data = {}
 
-        payload = {
-            "rep_count": self.rep_counter,
-            "has_landmarks": has_landmarks,
-            "feedback": feedback_to_send,
-            "state": self.state,
-            "debug_data": self.debug_data,
-            "landmarks": serializable_landmarks,
-        }
-        return ServerMessage(type="FEEDBACK", payload=payload)
+        result = FrameResult(
+            rep_count=self.rep_counter,
+            has_landmarks=landmarks is not None,
+            feedback=feedback_to_send,
+            state=self.state,
+            debug_data=self.debug_data,
+            landmarks=landmarks if echo_landmarks else None,
+        )
+        message = self.encoder.encode(result)
+        metrics.ANALYSIS_SECONDS.observe(time.perf_counter() - started)
+        return message
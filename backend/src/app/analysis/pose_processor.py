@@ -3,19 +3,23 @@
 
 Отвечает за обработку отдельных кадров для извлечения ключевых точек позы.
 Использует новый API MediaPipe Tasks.
+
+OpenCV и MediaPipe импортируются при создании первого экземпляра, а не при
+импорте модуля: их импорт занимает около секунды, и приложение должно
+запускаться (и отвечать на /health) без них.
 """
 
+import importlib
 import os
-from typing import List, Optional, TypeAlias
+import time
+from typing import TYPE_CHECKING, Any, List, Literal, Optional, Tuple, TypeAlias
 
-import cv2
-import mediapipe as mp
 import numpy as np
-from mediapipe.framework.formats import landmark_pb2
-from mediapipe.tasks import python
-from mediapipe.tasks.python import vision
 from numpy.typing import NDArray
 
+if TYPE_CHECKING:
+    from mediapipe.framework.formats import landmark_pb2
+
 # Определяем путь к модели относительно текущего файла.
 # Это делает код независимым от того, откуда он запускается.
 _MODEL_DIR = os.path.dirname(__file__)
@@ -25,6 +29,22 @@ MODEL_PATH = os.path.join(_MODEL_DIR, "pose_landmarker_lite.task")
 # Явно указываем, что это TypeAlias для mypy в строгом режиме.
 NDArrayU8: TypeAlias = NDArray[np.uint8]
 
+# Режим работы детектора:
+# - IMAGE: каждый кадр обрабатывается независимо, детектор человека
+#   запускается на каждом кадре;
+# - VIDEO: кадры считаются последовательными, поза отслеживается между
+#   кадрами, а детектор перезапускается только при потере трекинга.
+RunningMode: TypeAlias = Literal["IMAGE", "VIDEO"]
+
+# Размер стороны пустого кадра, которым прогревается модель.
+WARMUP_FRAME_SIZE = 256
+
+
+def preload() -> None:
+    """Импортирует OpenCV и MediaPipe, не загружая модель."""
+    for module in ("cv2", "mediapipe", "mediapipe.tasks.python.vision"):
+        importlib.import_module(module)
+
 
 class PoseProcessor:
     """
@@ -32,41 +52,121 @@ class PoseProcessor:
     и извлекает координаты ключевых точек (landmarks).
     """
 
-    def __init__(self) -> None:
-        """Инициализирует модель MediaPipe PoseLandmarker."""
+    def __init__(self, running_mode: RunningMode = "IMAGE") -> None:
+        """
+        Инициализирует модель MediaPipe PoseLandmarker.
+
+        Args:
+            running_mode: Режим работы детектора ("IMAGE" или "VIDEO").
+        """
+        self.running_mode = running_mode
+        # Последняя метка времени, переданная в детектор. В режиме VIDEO
+        # MediaPipe требует строго возрастающих меток.
+        self._last_timestamp_ms = -1
+        # Первая метка текущей сессии и метка детектора, на которую она
+        # отображается (см. `_next_timestamp_ms`).
+        self._origin: Tuple[int, int] | None = None
+        # Трекер VIDEO сопровождает позу с прошлого кадра.
+        self._tracking = False
+        # Трекер сопровождал позу прошлой сессии и пересоздается перед
+        # первым кадром новой.
+        self._stale_tracker = False
+        self.landmarker = self._create_landmarker()
+
+    def _create_landmarker(self) -> Any:
+        from mediapipe.tasks import python
+        from mediapipe.tasks.python import vision
+
         base_options = python.BaseOptions(model_asset_path=MODEL_PATH)
         # Настраиваем опции для детектора поз
         options = vision.PoseLandmarkerOptions(
             base_options=base_options,
-            # Режим обработки одиночных изображений
-            running_mode=vision.RunningMode.IMAGE,
+            running_mode=getattr(vision.RunningMode, self.running_mode),
             # Искать только одного человека
             num_poses=1,
             min_pose_detection_confidence=0.5,
             min_tracking_confidence=0.5,
         )
-        # Создаем сам детектор
-        self.landmarker = vision.PoseLandmarker.create_from_options(options)
+        return vision.PoseLandmarker.create_from_options(options)
+
+    @property
+    def alive(self) -> bool:
+        """Может ли экземпляр обрабатывать кадры; локальный может всегда."""
+        return True
+
+    def reset(self) -> None:
+        """
+        Готовит экземпляр к новой сессии; вызывается при выдаче из пула.
+
+        Метки времени новой сессии отсчитываются от ее первого кадра:
+        клиенты присылают метки в своих часах (эпоха, монотонные часы),
+        и без сдвига новая сессия продолжала бы шкалу предыдущей. Трекер
+        VIDEO, сопровождавший позу прошлой сессии, пересоздается перед
+        первым кадром новой, уже в потоке инференса.
+        """
+        self._origin = None
+        self._stale_tracker = self._tracking
+
+    def _next_timestamp_ms(self, timestamp_ms: Optional[int]) -> int:
+        """
+        Возвращает метку времени для следующего кадра в режиме VIDEO.
+
+        Если метка не передана, используются монотонные часы процесса.
+        Первый кадр сессии отображается на метку сразу после последней
+        метки детектора, следующие - со смещением от первого кадра, так
+        что интервалы между кадрами сохраняются. Метка всегда строго
+        больше предыдущей.
+        """
+        if timestamp_ms is None:
+            timestamp_ms = time.monotonic_ns() // 1_000_000
+        if self._origin is None:
+            # Первая сессия нового экземпляра сохраняет метки клиента.
+            fresh = self._last_timestamp_ms < 0
+            base = timestamp_ms if fresh else self._last_timestamp_ms + 1
+            self._origin = (timestamp_ms, base)
+        first, base = self._origin
+        rebased = max(base + timestamp_ms - first, self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = rebased
+        return rebased
+
+    def _detect_for_video(self, mp_image: Any, timestamp_ms: Optional[int]) -> Any:
+        if self._stale_tracker:
+            self.landmarker.close()
+            self.landmarker = self._create_landmarker()
+            self._stale_tracker = False
+        result = self.landmarker.detect_for_video(
+            mp_image, self._next_timestamp_ms(timestamp_ms)
+        )
+        self._tracking = bool(result.pose_landmarks)
+        return result
 
     def get_landmarks(
-        self, frame: NDArrayU8
-    ) -> Optional[List[landmark_pb2.NormalizedLandmark]]:
+        self, frame: NDArrayU8, timestamp_ms: Optional[int] = None
+    ) -> Optional[List["landmark_pb2.NormalizedLandmark"]]:
         """
         Обрабатывает один кадр и возвращает список ключевых точек.
 
         Args:
             frame: Кадр видео в формате NumPy array (BGR, uint8).
+            timestamp_ms: Метка времени кадра в миллисекундах (только для
+                режима VIDEO). По умолчанию берется текущее время.
 
         Returns:
             Список ключевых точек (landmarks) или None, если поза не обнаружена.
         """
+        import cv2
+        import mediapipe as mp
+
         # MediaPipe ожидает RGB, а OpenCV по умолчанию использует BGR
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         # Конвертируем кадр в формат, понятный MediaPipe
         mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
 
         # Обнаруживаем позу на изображении
-        detection_result = self.landmarker.detect(mp_image)
+        if self.running_mode == "VIDEO":
+            detection_result = self._detect_for_video(mp_image, timestamp_ms)
+        else:
+            detection_result = self.landmarker.detect(mp_image)
 
         if detection_result.pose_landmarks:
             # Возвращаем список точек для первого обнаруженного человека
@@ -76,6 +176,15 @@ class PoseProcessor:
 
         return None
 
+    def warmup(self) -> None:
+        """
+        Прогоняет через модель пустой кадр, чтобы первый реальный кадр сессии
+        не платил за ленивую инициализацию графа MediaPipe.
+        """
+        self.get_landmarks(
+            np.zeros((WARMUP_FRAME_SIZE, WARMUP_FRAME_SIZE, 3), np.uint8)
+        )
+
     def close(self) -> None:
         """Освобождает ресурсы модели MediaPipe."""
         if hasattr(self.landmarker, "close"):
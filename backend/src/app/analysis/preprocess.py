@@ -0,0 +1,174 @@
+"""
+Содержит класс FramePreprocessor - адаптивную подготовку кадра к инференсу.
+
+Модель работает со входом 256x256, поэтому кадр веб-камеры 1280x720 и
+выше не нужно ни декодировать, ни переводить в RGB в полном разрешении:
+- JPEG декодируется сразу в уменьшенном размере (IMREAD_REDUCED_COLOR_*),
+  если длинная сторона кадра позволяет;
+- в модель передается только область вокруг человека, найденного на
+  предыдущем кадре, а найденные точки переводятся обратно в нормированные
+  координаты полного кадра.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Tuple, TypeAlias, cast
+
+import numpy as np
+from app.protocol import NDArrayF32
+from numpy.typing import NDArray
+
+NDArrayU8: TypeAlias = NDArray[np.uint8]
+# Нормированная область (x0, y0, x1, y1) в координатах полного кадра.
+Box: TypeAlias = Tuple[float, float, float, float]
+
+# Коэффициенты уменьшения при декодировании (флаги IMREAD_REDUCED_COLOR_*),
+# от большего к меньшему.
+REDUCED_DECODE_SCALES = (8, 4, 2)
+# Точки с меньшей видимостью не учитываются при построении области.
+ROI_MIN_VISIBILITY = 0.5
+# Минимум видимых точек, по которым строится область.
+ROI_MIN_POINTS = 8
+# Если область занимает большую долю кадра, обрезка не дает выигрыша.
+ROI_MAX_AREA_FRACTION = 0.8
+
+
+@dataclass(frozen=True, slots=True)
+class Roi:
+    """Область кадра в пикселях, переданная в модель."""
+
+    x0: int
+    y0: int
+    x1: int
+    y1: int
+    # Размер полного кадра.
+    frame_width: int
+    frame_height: int
+
+
+class FramePreprocessor:
+    """
+    Декодирует и обрезает кадры одной сессии.
+
+    Хранит состояние между кадрами: коэффициент уменьшения, подобранный по
+    размеру предыдущего кадра, и область вокруг последней найденной позы.
+    """
+
+    def __init__(
+        self, min_long_side: int, roi_padding: float, roi_enabled: bool = True
+    ) -> None:
+        """
+        Args:
+            min_long_side: Минимальная длинная сторона декодированного кадра.
+                Кадр уменьшается при декодировании, только если после
+                уменьшения длинная сторона не меньше этого значения.
+                0 отключает уменьшение.
+            roi_padding: Отступ вокруг позы в долях ее большей стороны.
+            roi_enabled: Обрезать ли кадр по области предыдущей позы.
+        """
+        self.min_long_side = min_long_side
+        self.roi_padding = roi_padding
+        self.roi_enabled = roi_enabled
+        self.scale = 1
+        self._box: Box | None = None
+
+    def _choose_scale(self, width: int, height: int) -> int:
+        if self.min_long_side <= 0:
+            return 1
+        long_side = max(width, height)
+        for scale in REDUCED_DECODE_SCALES:
+            if long_side // scale >= self.min_long_side:
+                return scale
+        return 1
+
+    def decode(self, buffer: bytes | memoryview) -> NDArrayU8 | None:
+        """
+        Декодирует сжатое изображение, по возможности в уменьшенном размере.
+
+        Размер исходного кадра становится известен только после
+        декодирования, поэтому коэффициент для следующего кадра подбирается
+        по текущему: размер кадров в сессии обычно не меняется.
+        """
+        import cv2
+
+        flags = (
+            getattr(cv2, f"IMREAD_REDUCED_COLOR_{self.scale}")
+            if self.scale > 1
+            else cv2.IMREAD_COLOR
+        )
+        frame = cv2.imdecode(np.frombuffer(buffer, dtype=np.uint8), flags)
+        if frame is None:
+            return None
+        height, width = frame.shape[:2]
+        self.scale = self._choose_scale(width * self.scale, height * self.scale)
+        return cast(NDArrayU8, frame)
+
+    def crop(self, frame: NDArrayU8) -> Tuple[NDArrayU8, Roi | None]:
+        """
+        Вырезает область вокруг позы предыдущего кадра.
+
+        Returns:
+            Кадр для модели (представление без копирования) и область или
+            исходный кадр и None, если обрезка не применяется.
+        """
+        if not self.roi_enabled or self._box is None:
+            return frame, None
+        height, width = frame.shape[:2]
+        bx0, by0, bx1, by1 = self._box
+        x0, y0 = math.floor(bx0 * width), math.floor(by0 * height)
+        x1, y1 = math.ceil(bx1 * width), math.ceil(by1 * height)
+        if (x1 - x0) * (y1 - y0) > ROI_MAX_AREA_FRACTION * width * height:
+            return frame, None
+        return frame[y0:y1, x0:x1], Roi(x0, y0, x1, y1, width, height)
+
+    def update(self, landmarks: NDArrayF32 | None) -> None:
+        """
+        Запоминает область для следующего кадра по найденным точкам.
+
+        Args:
+            landmarks: Массив (33, 4) в координатах полного кадра или None,
+                если поза не найдена (следующий кадр обрабатывается целиком).
+        """
+        self._box = None
+        if landmarks is None:
+            return
+        visible = landmarks[landmarks[:, 3] >= ROI_MIN_VISIBILITY]
+        if len(visible) < ROI_MIN_POINTS:
+            return
+        x0, y0 = visible[:, :2].min(axis=0).tolist()
+        x1, y1 = visible[:, :2].max(axis=0).tolist()
+        pad = self.roi_padding * max(x1 - x0, y1 - y0)
+        box = (
+            max(x0 - pad, 0.0),
+            max(y0 - pad, 0.0),
+            min(x1 + pad, 1.0),
+            min(y1 + pad, 1.0),
+        )
+        if box[0] < box[2] and box[1] < box[3]:
+            self._box = box
+
+    @staticmethod
+    def to_full_frame(landmarks: NDArrayF32, roi: Roi) -> NDArrayF32:
+        """
+        Переводит точки из нормированных координат области в нормированные
+        координаты полного кадра.
+
+        Глубина z в MediaPipe измеряется в том же масштабе, что и x,
+        поэтому масштабируется вместе с шириной области.
+        """
+        roi_width, roi_height = roi.x1 - roi.x0, roi.y1 - roi.y0
+        scale = np.array(
+            [
+                roi_width / roi.frame_width,
+                roi_height / roi.frame_height,
+                roi_width / roi.frame_width,
+                1.0,
+            ],
+            dtype=np.float32,
+        )
+        offset = np.array(
+            [roi.x0 / roi.frame_width, roi.y0 / roi.frame_height, 0.0, 0.0],
+            dtype=np.float32,
+        )
+        result: NDArrayF32 = landmarks * scale + offset
+        return result
@@ -0,0 +1,199 @@
+"""
+Пакетная сегментация повторений по целому ряду кадров.
+
+Векторизованный аналог конечного автомата `PoseAnalyzer`: вместо шага
+на каждый кадр ряд углов обрабатывается целиком операциями NumPy.
+Результат (повторения, их ошибки и статистика) совпадает с потоковым
+анализом тех же кадров. Подходит для офлайн-анализа, когда все кадры
+уже известны.
+
+Автомат без гистерезиса: состояние DOWN наступает на кадре, где угол
+в колене строго меньше `REP_TRANSITION_ANGLE`, UP - где строго больше.
+Поэтому состояние в кадре определяется последним кадром, в котором угол
+не равен порогу, и переходы находятся сравнением соседних таких кадров.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+from app.analysis import geometry, rules
+from app.schemas import ServerMessage
+from numpy.typing import ArrayLike, NDArray
+
+NDArrayI64 = NDArray[np.int64]
+
+# Ошибки фазы приседа в порядке проверки в `_check_errors_down_phase`.
+DOWN_PHASE_ERRORS = ("BEND_FORWARD", "KNEE_OVER_TOE")
+# Ошибки в верхней точке в порядке проверки в `_check_errors_up_phase`.
+UP_PHASE_ERRORS = ("LOWER_YOUR_HIPS", "SQUAT_TOO_DEEP", "BEND_BACKWARDS")
+
+
+@dataclass(frozen=True)
+class Rep:
+    """Завершенное повторение."""
+
+    # Кадр перехода UP -> DOWN.
+    start: int
+    # Кадр перехода DOWN -> UP (на нем повторение засчитывается).
+    end: int
+    min_knee_angle: float
+    feedback: List[str]
+
+
+@dataclass
+class Segmentation:
+    """Результат пакетного анализа ряда кадров."""
+
+    reps: List[Rep]
+    # Состояние автомата после последнего кадра.
+    state: str
+    stats: Dict[str, int] = field(default_factory=dict)
+
+    def generate_report(self) -> ServerMessage:
+        """Итоговый отчет в том же формате, что `PoseAnalyzer.generate_report`."""
+        report_payload = {
+            "total_reps": len(self.reps),
+            "good_reps": self.stats.get("good_reps", 0),
+            "errors": {
+                key: value for key, value in self.stats.items() if key != "good_reps"
+            },
+        }
+        return ServerMessage(type="REPORT", payload=report_payload)
+
+
+def segment_reps(
+    knee_angle: ArrayLike,
+    hip_angle: ArrayLike,
+    knee_foot_diff: ArrayLike,
+    knee_threshold: ArrayLike,
+    valid: ArrayLike | None = None,
+) -> Segmentation:
+    """
+    Находит повторения и ошибки техники в ряду кадров.
+
+    Args:
+        knee_angle: Угол в колене по кадрам, форма (N,).
+        hip_angle: Угол в тазобедренном суставе, (N,).
+        knee_foot_diff: Смещение колена относительно носка по оси X, (N,).
+        knee_threshold: Допустимое смещение (доля ширины плеч), (N,).
+        valid: Маска кадров, в которых ключевые точки видны. Остальные
+            кадры, как и в потоковом анализе, не меняют состояние.
+
+    Returns:
+        Повторения, статистика ошибок и конечное состояние автомата.
+    """
+    series = [
+        np.asarray(values, dtype=np.float64)
+        for values in (knee_angle, hip_angle, knee_foot_diff, knee_threshold)
+    ]
+    frames = np.arange(len(series[0]))
+    if valid is not None:
+        frames = np.flatnonzero(np.asarray(valid, dtype=bool))
+        series = [values[frames] for values in series]
+    knee, hip, diff, threshold = series
+
+    starts, ends, state = _transitions(knee)
+    # Минимум на отрезке [start, end]: reduceat по парам границ, бесконечность
+    # в конце нужна для повторения, завершенного на последнем кадре.
+    bounds = np.stack([starts, ends + 1], axis=1).ravel()
+    min_knee = (
+        np.minimum.reduceat(np.append(knee, np.inf), bounds)[::2]
+        if len(starts)
+        else np.empty(0)
+    )
+
+    down_flags = {
+        "BEND_FORWARD": hip < rules.BODY_BEND_FORWARD_THRESHOLD,
+        "KNEE_OVER_TOE": np.abs(diff) > threshold,
+    }
+    first_seen = {
+        error: _first_in_segments(flags, starts, ends)
+        for error, flags in down_flags.items()
+    }
+    up_flags = {
+        "LOWER_YOUR_HIPS": min_knee > rules.SQUAT_DEPTH_GOOD_MAX,
+        "SQUAT_TOO_DEEP": min_knee < rules.SQUAT_DEPTH_GOOD_MIN,
+        "BEND_BACKWARDS": hip[ends] > rules.BODY_BEND_BACKWARDS_THRESHOLD,
+    }
+
+    errors = {error: first >= 0 for error, first in first_seen.items()} | up_flags
+    good = ~np.logical_or.reduce(list(errors.values()), initial=False)
+    stats = {"good_reps": int(good.sum())} if good.any() else {}
+    stats.update({error: int(f.sum()) for error, f in errors.items() if f.any()})
+
+    reps = [
+        Rep(
+            start=int(frames[starts[i]]),
+            end=int(frames[ends[i]]),
+            min_knee_angle=float(min_knee[i]),
+            feedback=_feedback(i, first_seen, up_flags),
+        )
+        for i in range(len(starts))
+    ]
+    return Segmentation(reps=reps, state=state, stats=stats)
+
+
+def segment_landmarks(landmarks: NDArray[np.floating]) -> Segmentation:
+    """
+    Пакетный анализ ключевых точек (N, 33, 4), например записанной сессии.
+
+    Метрики считаются так же, как в `PoseAnalyzer._analyze_pose`: по левой
+    стороне тела, кадры с плохо видимыми ключевыми точками пропускаются.
+    """
+    metrics = geometry.frame_metrics(landmarks)
+    return segment_reps(
+        metrics["left_knee"],
+        metrics["left_hip"],
+        metrics["left_knee_foot_diff"],
+        metrics["shoulder_width"] * rules.KNEE_OVER_TOE_THRESHOLD,
+        valid=metrics["key_visibility"] >= rules.MIN_VISIBILITY_THRESHOLD,
+    )
+
+
+def _transitions(knee: NDArray[np.float64]) -> tuple[NDArrayI64, NDArrayI64, str]:
+    """
+    Кадры переходов UP -> DOWN и DOWN -> UP для завершенных повторений
+    и состояние после последнего кадра.
+    """
+    below = knee < rules.REP_TRANSITION_ANGLE
+    events = np.flatnonzero(below | (knee > rules.REP_TRANSITION_ANGLE))
+    is_down = below[events]
+    # Автомат начинает в состоянии UP.
+    was_down = np.zeros_like(is_down)
+    was_down[1:] = is_down[:-1]
+    starts = events[is_down & ~was_down]
+    ends = events[~is_down & was_down]
+    state = "DOWN" if len(starts) > len(ends) else "UP"
+    return starts[: len(ends)], ends, state
+
+
+def _first_in_segments(
+    flags: NDArray[np.bool_], starts: NDArrayI64, ends: NDArrayI64
+) -> NDArrayI64:
+    """Первый кадр с флагом внутри каждого отрезка [start, end] или -1."""
+    flagged = np.flatnonzero(flags)
+    # Индекс за концом массива указывает на заведомо больший кадр.
+    padded = np.append(flagged, np.iinfo(np.int64).max)
+    first = padded[np.searchsorted(flagged, starts)]
+    return np.where(first <= ends, first, -1)
+
+
+def _feedback(
+    rep: int,
+    first_seen: Dict[str, NDArrayI64],
+    up_flags: Dict[str, NDArray[np.bool_]],
+) -> List[str]:
+    """
+    Список ошибок повторения в том порядке, в каком его собирает потоковый
+    автомат: ошибки приседа по кадру первого появления, затем ошибки
+    верхней точки.
+    """
+    down = sorted(
+        (int(first_seen[error][rep]), order, error)
+        for order, error in enumerate(DOWN_PHASE_ERRORS)
+        if first_seen[error][rep] >= 0
+    )
+    feedback = [error for _, _, error in down]
+    feedback += [error for error in UP_PHASE_ERRORS if up_flags[error][rep]]
+    return feedback or ["GOOD_REP"]
@@ -0,0 +1,187 @@
+"""
+Конфигурация приложения.
+
+Все параметры читаются из переменных окружения с префиксом `KINETICOACH_`
+(или из файла `.env`) с помощью pydantic-settings.
+"""
+
+from pathlib import Path
+from typing import Literal
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """Настройки сервиса, задаваемые через окружение."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="KINETICOACH_", env_file=".env", extra="ignore"
+    )
+
+    # --- Исполнитель инференса ---
+
+    # Тип исполнителя: "thread" - каждый кадр отдельной задачей пула потоков,
+    # "batch" - кадры разных сессий собираются в пакеты.
+    inference_executor: Literal["thread", "batch"] = "thread"
+    # Количество потоков-воркеров в пуле.
+    inference_workers: int = Field(default=4, ge=1)
+    # Максимальное число одновременно обрабатываемых кадров.
+    inference_max_concurrency: int = Field(default=4, ge=1)
+    # Сколько кадров может ожидать свободного слота, прежде чем новые
+    # кадры начнут отбрасываться.
+    inference_queue_limit: int = Field(default=16, ge=0)
+    # Максимальный размер пакета и время ожидания его заполнения
+    # (только для inference_executor="batch").
+    inference_batch_size: int = Field(default=8, ge=1)
+    inference_batch_wait_ms: float = Field(default=10.0, ge=0)
+
+    # --- Процессы инференса ---
+
+    # Число процессов-воркеров, в которых работает модель (по одному на
+    # ядро). 0 - модель работает в потоках процесса сервера. Экземпляры
+    # пула PoseLandmarker распределяются между воркерами; потоков
+    # inference_workers должно хватать на все слоты всех воркеров.
+    inference_processes: int = Field(default=0, ge=0)
+    # Закреплять ли воркеры за ядрами (только Linux).
+    inference_pin_cores: bool = True
+    # Слотов кольцевого буфера кадров на воркер: столько кадров могут
+    # одновременно ожидать воркер.
+    inference_ring_slots: int = Field(default=2, ge=1)
+    # Размер слота под декодированный кадр BGR; кадры больше уменьшаются
+    # перед передачей в воркер.
+    inference_frame_max_bytes: int = Field(default=1280 * 720 * 3, ge=1024)
+
+    # --- Пул PoseLandmarker ---
+
+    # Режим детектора для сессий, не указавших его в START_SESSION.
+    # Пул этого режима прогревается при старте, пул другого режима
+    # создается по требованию.
+    default_running_mode: Literal["IMAGE", "VIDEO"] = "IMAGE"
+    # Максимальное число экземпляров модели в процессе (для каждого режима).
+    landmarker_pool_size: int = Field(default=8, ge=1)
+    # Сколько экземпляров создается и прогревается при старте.
+    landmarker_pool_warm: int = Field(default=2, ge=0)
+    # Через сколько секунд простоя лишний экземпляр закрывается.
+    landmarker_idle_timeout_s: float = Field(default=300.0, gt=0)
+    # Сколько секунд новая сессия ждет свободный экземпляр.
+    landmarker_acquire_timeout_s: float = Field(default=5.0, gt=0)
+    # Период проверки простаивающих экземпляров.
+    landmarker_reap_interval_s: float = Field(default=30.0, gt=0)
+
+    # --- Адаптивная частота кадров ---
+
+    # Частота кадров во время движения (опускание и подъем).
+    rate_active_fps: int = Field(default=15, ge=1)
+    # Частота кадров, пока пользователь неподвижно стоит в фазе UP.
+    rate_idle_fps: int = Field(default=4, ge=1)
+    # Нижняя граница частоты при высокой загрузке узла.
+    rate_min_fps: int = Field(default=2, ge=1)
+    # Угловая скорость колена (град/с), выше которой пользователь считается
+    # движущимся.
+    rate_motion_threshold_dps: float = Field(default=25.0, gt=0)
+    # Качество JPEG в обычном режиме и в режиме экономии.
+    rate_jpeg_quality: float = Field(default=0.7, gt=0, le=1)
+    rate_jpeg_quality_low: float = Field(default=0.5, gt=0, le=1)
+
+    # --- Фильтр почти одинаковых кадров ---
+
+    # Средняя разница яркости миниатюр 32x32 (0-255), ниже которой инференс
+    # пропускается и переиспользуются последние ключевые точки. 0 отключает
+    # фильтр.
+    motion_gate_threshold: float = Field(default=2.0, ge=0)
+    # Максимальное число пропущенных кадров подряд.
+    motion_gate_max_skip: int = Field(default=30, ge=0)
+
+    # --- Подготовка кадра ---
+
+    # Минимальная длинная сторона кадра после уменьшенного декодирования
+    # JPEG (IMREAD_REDUCED_*). 0 отключает уменьшение.
+    decode_min_long_side: int = Field(default=512, ge=0)
+    # Обрезать ли кадр по области позы предыдущего кадра (режим IMAGE).
+    roi_crop: bool = True
+    # Отступ вокруг позы в долях ее большей стороны.
+    roi_padding: float = Field(default=0.25, ge=0)
+
+    # --- Офлайн-анализ видео ---
+
+    # Число воркеров инференса на один загруженный файл (режим IMAGE).
+    offline_workers: int = Field(default=4, ge=1)
+    # Максимальный размер загружаемого видео в мегабайтах.
+    offline_max_upload_mb: int = Field(default=1024, ge=1)
+    # Сколько видео узел анализирует одновременно; сверх этого - 503.
+    # Экземпляры модели загрузки берут из общего пула, оставляя сессиям
+    # не меньше ready_min_free_landmarkers свободных.
+    offline_max_uploads: int = Field(default=2, ge=1)
+
+    # --- Запись сессий ---
+
+    # Директория для записи ключевых точек каждой сессии (файлы .kcrec,
+    # см. app.recording). Не задана - сессии не записываются.
+    recording_dir: Path | None = None
+
+    # --- Логирование ---
+
+    # Уровень логов сервиса.
+    log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = "INFO"
+    # Формат записей: "text" - строка для чтения человеком, "json" - один
+    # JSON-объект на строку для сборщиков логов.
+    log_format: Literal["text", "json"] = "text"
+    # Запись о кадре сессии пишется не чаще раза в столько секунд.
+    # 0 отключает записи о кадрах (итоговая запись сессии остается).
+    log_frame_interval_s: float = Field(default=5.0, ge=0)
+    # Объем выборки задержек сессии для перцентилей в итоговой записи.
+    log_latency_samples: int = Field(default=1024, ge=1)
+
+    # --- Допуск сессий ---
+
+    # Жесткий предел WebSocket-сессий узла: сверх него соединение
+    # закрывается с кодом 1013 (Try Again Later). 0 - без предела.
+    max_sessions: int = Field(default=64, ge=0)
+    # Средняя частота кадров POSE_DATA одного соединения (token bucket) и
+    # число кадров, которые можно прислать подряд. Кадры сверх лимита
+    # отклоняются с ошибкой. 0 отключает лимит.
+    frame_rate_limit_fps: float = Field(default=30.0, ge=0)
+    frame_rate_burst: int = Field(default=10, ge=1)
+    # Об отклоненных кадрах клиент получает одну ошибку в секунду. Если за
+    # секунду отклонено больше кадров, соединение закрывается с кодом 1008
+    # (Policy Violation). 0 - не закрывать.
+    frame_rate_max_rejected: int = Field(default=120, ge=0)
+    # Максимальный размер сообщения WebSocket (JSON с кадром в base64 или
+    # бинарного кадра), проверяется до разбора сообщения.
+    max_frame_bytes: int = Field(default=2 * 1024 * 1024, ge=1)
+    # Сессия без сообщений дольше этого времени закрывается (код 1001),
+    # экземпляр модели возвращается в пул.
+    session_idle_timeout_s: float = Field(default=60.0, gt=0)
+
+    # --- Возобновление сессий ---
+
+    # Хранилище снимков сессий (см. app.session_store): "memory" - в памяти
+    # процесса, сессия возобновляется только на этом узле; или путь
+    # "пакет.модуль:Класс" к реализации SessionStore с общим хранилищем.
+    session_store: str = "memory"
+    # Максимум снимков в памяти и время жизни снимка с последнего
+    # сохранения.
+    session_store_max_entries: int = Field(default=10_000, ge=1)
+    session_store_ttl_s: float = Field(default=900.0, gt=0)
+
+    # --- Готовность узла ---
+    # При превышении любого порога /ready отвечает 503, и балансировщик
+    # направляет новые сессии на другие узлы. 0 отключает порог.
+
+    # Число активных WebSocket-сессий; 0 - порог равен max_sessions.
+    ready_max_sessions: int = Field(default=0, ge=0)
+    # Глубина очереди инференса (ср. с inference_queue_limit, после
+    # которого кадры уже отклоняются).
+    ready_max_queue_depth: int = Field(default=8, ge=0)
+    # Минимум экземпляров PoseLandmarker, которые еще можно выдать без
+    # ожидания в пуле режима по умолчанию.
+    ready_min_free_landmarkers: int = Field(default=1, ge=0)
+    # p95 задержки ответа на кадр по всем сессиям за ready_latency_window_s.
+    ready_max_latency_p95_ms: float = Field(default=1000.0, ge=0)
+    ready_latency_window_s: float = Field(default=30.0, gt=0)
+
+
+def get_settings() -> Settings:
+    """Возвращает настройки, прочитанные из текущего окружения."""
+    return Settings()
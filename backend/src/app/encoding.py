@@ -0,0 +1,110 @@
+"""
+Кодирование сообщений FEEDBACK, отправляемых клиенту.
+
+Формат согласуется в START_SESSION:
+- "full" (по умолчанию): все поля в каждом сообщении, точки - списком
+  объектов. Совместим с клиентами, не отправляющими START_SESSION.
+- "compact": только изменившиеся поля, точки и отладочные данные - только
+  по подписке, точки - упакованным массивом в base64.
+"""
+
+import base64
+from dataclasses import dataclass
+from typing import Any, Collection, Dict, List, Literal
+
+import numpy as np
+from app.protocol import NDArrayF32, pack_landmarks, quantize_landmarks
+from app.schemas import ServerMessage, SessionOptions
+
+LandmarksFormat = Literal["float32", "int16"]
+
+
+@dataclass(slots=True)
+class FrameResult:
+    """Результат анализа одного кадра до кодирования."""
+
+    rep_count: int
+    has_landmarks: bool
+    # Ошибки завершенного повторения (пусто, если повторение не завершено).
+    feedback: List[str]
+    state: str
+    debug_data: Dict[str, float]
+    # Точки для отправки клиенту (None - не отправлять).
+    landmarks: List[Any] | None
+
+
+def landmarks_to_array(landmarks: List[Any]) -> NDArrayF32:
+    """Собирает массив (33, 4) из объектов точек MediaPipe."""
+    return np.array(
+        [(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks], dtype=np.float32
+    )
+
+
+class FeedbackEncoder:
+    """Полный формат FEEDBACK: все поля в каждом сообщении."""
+
+    def encode(self, result: FrameResult) -> ServerMessage:
+        serializable_landmarks = [
+            {"x": lm.x, "y": lm.y, "z": lm.z, "visibility": lm.visibility}
+            for lm in result.landmarks or []
+        ]
+        payload = {
+            "rep_count": result.rep_count,
+            "has_landmarks": result.has_landmarks,
+            "feedback": result.feedback,
+            "state": result.state,
+            "debug_data": result.debug_data,
+            "landmarks": serializable_landmarks,
+        }
+        return ServerMessage(type="FEEDBACK", payload=payload)
+
+
+class CompactFeedbackEncoder(FeedbackEncoder):
+    """
+    Компактный формат FEEDBACK.
+
+    - `rep_count`, `state`, `has_landmarks` и `debug_data` отправляются только
+      при изменении относительно предыдущего сообщения этой сессии;
+    - `feedback` отправляется только когда не пуст;
+    - `debug_data` и `landmarks` отправляются только по подписке;
+    - `landmarks` - base64 от массива (33, 4) во float32 или в int16
+      (см. `app.protocol.quantize_landmarks`).
+    """
+
+    def __init__(
+        self, subscribe: Collection[str], landmarks_format: LandmarksFormat
+    ) -> None:
+        self.send_landmarks = "landmarks" in subscribe
+        self.send_debug_data = "debug_data" in subscribe
+        self.landmarks_format = landmarks_format
+        self._last_sent: Dict[str, Any] = {}
+
+    def _put_if_changed(self, payload: Dict[str, Any], key: str, value: Any) -> None:
+        if key not in self._last_sent or self._last_sent[key] != value:
+            payload[key] = value
+            self._last_sent[key] = value
+
+    def encode(self, result: FrameResult) -> ServerMessage:
+        payload: Dict[str, Any] = {}
+        self._put_if_changed(payload, "rep_count", result.rep_count)
+        self._put_if_changed(payload, "state", result.state)
+        self._put_if_changed(payload, "has_landmarks", result.has_landmarks)
+        if result.feedback:
+            payload["feedback"] = list(result.feedback)
+        if self.send_debug_data:
+            self._put_if_changed(payload, "debug_data", dict(result.debug_data))
+        if self.send_landmarks and result.landmarks is not None:
+            array = landmarks_to_array(result.landmarks)
+            if self.landmarks_format == "int16":
+                packed = quantize_landmarks(array)
+            else:
+                packed = pack_landmarks(array)
+            payload["landmarks"] = base64.b64encode(packed).decode("ascii")
+        return ServerMessage(type="FEEDBACK", payload=payload)
+
+
+def make_encoder(options: SessionOptions) -> FeedbackEncoder:
+    """Создает кодировщик FEEDBACK по параметрам сессии."""
+    if options.encoding == "compact":
+        return CompactFeedbackEncoder(options.subscribe, options.landmarks_format)
+    return FeedbackEncoder()
@@ -0,0 +1,12 @@
+"""Модуль для выполнения инференса вне event loop."""
+
+from app.config import Settings
+from app.inference.batching import BatchingInferenceExecutor
+from app.inference.executor import InferenceExecutor
+
+
+def create_executor(settings: Settings) -> InferenceExecutor:
+    """Создает исполнитель инференса выбранного в настройках типа."""
+    if settings.inference_executor == "batch":
+        return BatchingInferenceExecutor.from_settings(settings)
+    return InferenceExecutor.from_settings(settings)
@@ -0,0 +1,164 @@
+"""
+Содержит исполнитель инференса с пакетной обработкой кадров разных сессий.
+
+MediaPipe PoseLandmarker не умеет обрабатывать несколько изображений за
+один вызов, а каждая сессия работает со своим экземпляром модели. Поэтому
+пакет здесь - это кадры нескольких сессий, собранные за короткое окно и
+обработанные одной задачей воркера подряд. Это убирает передачу каждого
+кадра в пул потоков по отдельности (пробуждения потоков, переключения
+контекста, отдельный future на кадр) и держит число активных потоков
+равным числу воркеров при любом числе сессий.
+"""
+
+import asyncio
+import functools
+from dataclasses import dataclass
+from typing import Any, Callable, List, ParamSpec, Tuple, TypeVar, cast
+
+from app.config import Settings
+from app.inference.executor import InferenceExecutor, InferenceQueueFullError
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class _Job:
+    """Кадр, ожидающий обработки."""
+
+    call: Callable[[], Any]
+    future: "asyncio.Future[Any]"
+    enqueued_at: float
+
+
+def _run_batch(calls: List[Callable[[], Any]]) -> List[Tuple[bool, Any]]:
+    """Выполняет пакет в потоке воркера; ошибка одного кадра не влияет на другие."""
+    results: List[Tuple[bool, Any]] = []
+    for call in calls:
+        try:
+            results.append((True, call()))
+        except Exception as e:
+            results.append((False, e))
+    return results
+
+
+class BatchingInferenceExecutor(InferenceExecutor):
+    """
+    Исполнитель, собирающий кадры разных сессий в пакеты.
+
+    Фиксированное число воркеров забирает кадры из общей очереди. Воркер
+    ждет новые кадры не дольше `max_wait_ms` с момента поступления первого
+    кадра пакета и отправляет пакет, как только он набрал `max_batch_size`
+    кадров или истекло время ожидания.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        queue_limit: int,
+        max_batch_size: int,
+        max_wait_ms: float,
+    ) -> None:
+        super().__init__(
+            max_workers=max_workers,
+            max_concurrency=max_workers * max_batch_size,
+            queue_limit=queue_limit,
+        )
+        self.max_workers = max_workers
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000.0
+        self._queue: asyncio.Queue[_Job] = asyncio.Queue()
+        self._workers: List[asyncio.Task[None]] = []
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "BatchingInferenceExecutor":
+        """Создает исполнитель по настройкам приложения."""
+        return cls(
+            max_workers=settings.inference_workers,
+            queue_limit=settings.inference_queue_limit,
+            max_batch_size=settings.inference_batch_size,
+            max_wait_ms=settings.inference_batch_wait_ms,
+        )
+
+    def _ensure_workers(self) -> None:
+        # Воркеры создаются при первом кадре: им нужен работающий event loop.
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker()) for _ in range(self.max_workers)
+            ]
+
+    async def run(self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        """
+        Ставит `func` в общую очередь и возвращает ее результат.
+
+        Raises:
+            InferenceQueueFullError: Если все слоты заняты и очередь заполнена.
+        """
+        if self._pending >= self.max_concurrency + self.queue_limit:
+            raise InferenceQueueFullError("Inference queue is full.")
+        self._ensure_workers()
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Any] = loop.create_future()
+        call = functools.partial(func, *args, **kwargs)
+        self._pending += 1
+        try:
+            self._queue.put_nowait(_Job(call, future, loop.time()))
+            return cast(T, await future)
+        finally:
+            self._pending -= 1
+
+    async def _collect(self) -> List[_Job]:
+        """Собирает пакет: первый кадр и те, что успеют прийти до дедлайна."""
+        loop = asyncio.get_running_loop()
+        first = await self._queue.get()
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except TimeoutError:
+                break
+        # Кадры отмененных запросов не обрабатываем.
+        return [job for job in batch if not job.future.done()]
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            if not batch:
+                continue
+            started = loop.time()
+            self.stats.record(len(batch), [started - job.enqueued_at for job in batch])
+            self._in_flight += len(batch)
+            try:
+                results = await loop.run_in_executor(
+                    self._pool, _run_batch, [job.call for job in batch]
+                )
+            except Exception as e:
+                # Пул не принял пакет (например, уже остановлен): кадры
+                # пакета завершаются ошибкой, а не ждут ответа вечно.
+                results = [(False, e)] * len(batch)
+            finally:
+                self._in_flight -= len(batch)
+            for job, (ok, value) in zip(batch, results, strict=True):
+                if job.future.done():
+                    continue
+                if ok:
+                    job.future.set_result(value)
+                else:
+                    job.future.set_exception(value)
+
+    async def shutdown(self) -> None:
+        """Останавливает воркеры и пул потоков, отменяя необработанные кадры."""
+        for worker in self._workers:
+            worker.cancel()
+        while not self._queue.empty():
+            self._queue.get_nowait().future.cancel()
+        await super().shutdown()
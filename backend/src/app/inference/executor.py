@@ -0,0 +1,119 @@
+"""
+Содержит ограниченный исполнитель для тяжелых CPU-задач (декодирование кадра,
+инференс MediaPipe, анализ позы).
+
+Все вызовы выполняются в пуле потоков, поэтому event loop продолжает
+обслуживать остальные WebSocket-сессии, пока идет обработка кадра.
+OpenCV и MediaPipe отпускают GIL в нативном коде, так что потоки дают
+реальный параллелизм.
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, ParamSpec, TypeVar
+
+from app.config import Settings
+from app.inference.stats import InferenceStats
+
+logger = logging.getLogger(__name__)
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class InferenceQueueFullError(Exception):
+    """Очередь исполнителя переполнена, задача отклонена."""
+
+
+class InferenceExecutor:
+    """
+    Пул воркеров с ограничением числа одновременных задач и глубины очереди.
+
+    Не более `max_concurrency` задач выполняются одновременно, еще не более
+    `queue_limit` ожидают свободного слота. Задачи сверх этого лимита
+    отклоняются сразу с `InferenceQueueFullError`, а не накапливаются
+    в памяти.
+    """
+
+    def __init__(
+        self, max_workers: int, max_concurrency: int, queue_limit: int
+    ) -> None:
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="inference"
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.queue_limit = queue_limit
+        self._pending = 0
+        self._in_flight = 0
+        self.stats = InferenceStats()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "InferenceExecutor":
+        """Создает исполнитель по настройкам приложения."""
+        return cls(
+            max_workers=settings.inference_workers,
+            max_concurrency=settings.inference_max_concurrency,
+            queue_limit=settings.inference_queue_limit,
+        )
+
+    @property
+    def in_flight(self) -> int:
+        """Количество задач, выполняющихся прямо сейчас."""
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """Количество задач, ожидающих свободного слота."""
+        return self._pending - self._in_flight
+
+    @property
+    def load(self) -> float:
+        """Загрузка исполнителя от 0 (простаивает) до 1 (очередь заполнена)."""
+        return self._pending / (self.max_concurrency + self.queue_limit)
+
+    async def run(self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        """
+        Выполняет `func` в пуле воркеров и возвращает ее результат.
+
+        Raises:
+            InferenceQueueFullError: Если все слоты заняты и очередь заполнена.
+        """
+        if self._pending >= self.max_concurrency + self.queue_limit:
+            raise InferenceQueueFullError("Inference queue is full.")
+
+        self._pending += 1
+        enqueued_at = time.monotonic()
+        try:
+            async with self._semaphore:
+                # Каждый кадр - отдельный вызов, то есть пакет из одного кадра.
+                self.stats.record(1, [time.monotonic() - enqueued_at])
+                self._in_flight += 1
+                try:
+                    loop = asyncio.get_running_loop()
+                    call = functools.partial(func, *args, **kwargs)
+                    return await loop.run_in_executor(self._pool, call)
+                finally:
+                    self._in_flight -= 1
+        finally:
+            self._pending -= 1
+
+    def report(self) -> Dict[str, float]:
+        """Возвращает текущее состояние и статистику исполнителя."""
+        return {
+            "in_flight": float(self.in_flight),
+            "queue_depth": float(self.queue_depth),
+            "load": self.load,
+            **self.stats.report(),
+        }
+
+    async def shutdown(self) -> None:
+        """
+        Останавливает пул, дожидаясь завершения текущих задач. Ожидание
+        идет в отдельном потоке, чтобы не останавливать event loop.
+        """
+        await asyncio.to_thread(self._pool.shutdown, wait=True)
+        logger.info("Исполнитель инференса остановлен.")
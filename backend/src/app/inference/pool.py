@@ -0,0 +1,240 @@
+"""
+Содержит общий для процесса пул экземпляров PoseProcessor.
+
+Загрузка модели MediaPipe занимает заметное время, поэтому экземпляры
+создаются и прогреваются при старте приложения, а сессии берут их из пула
+на время соединения и возвращают при отключении.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Deque, Tuple
+
+from app.analysis.pose_processor import PoseProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class LandmarkerPoolExhaustedError(Exception):
+    """Свободный экземпляр не появился за отведенное время."""
+
+
+class LandmarkerPool:
+    """
+    Пул экземпляров PoseProcessor с ограничением размера.
+
+    - При старте создается `warm_size` прогретых экземпляров.
+    - Пул растет по требованию до `max_size` экземпляров.
+    - Экземпляры сверх `warm_size`, простаивающие дольше `idle_timeout`
+      секунд, закрываются и удаляются.
+    - Неработающие экземпляры (`alive` - False, например, в завершившемся
+      процессе-воркере) не выдаются: они закрываются и освобождают место.
+
+    Возврат экземпляра (`release`) синхронный, поэтому он выполняется
+    даже в `finally` отменяемой задачи сессии.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], PoseProcessor],
+        max_size: int,
+        warm_size: int,
+        idle_timeout: float,
+        acquire_timeout: float,
+    ) -> None:
+        self._factory = factory
+        self.max_size = max_size
+        self.warm_size = min(warm_size, max_size)
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        # Свободные экземпляры вместе со временем их возврата в пул.
+        # Берем с конца (LIFO), чтобы редко используемые экземпляры
+        # "старели" и вытеснялись.
+        self._idle: Deque[Tuple[PoseProcessor, float]] = deque()
+        # Сессии, ожидающие экземпляр. None в результате означает, что
+        # освободилось место и сессия может создать экземпляр сама.
+        self._waiters: Deque[asyncio.Future[PoseProcessor | None]] = deque()
+        self._size = 0
+
+    @property
+    def size(self) -> int:
+        """Общее количество экземпляров (свободных, занятых и создаваемых)."""
+        return self._size
+
+    @property
+    def idle_count(self) -> int:
+        """Количество свободных экземпляров."""
+        return len(self._idle)
+
+    @property
+    def in_use(self) -> int:
+        """Количество экземпляров, выданных сессиям."""
+        return self._size - len(self._idle)
+
+    @property
+    def available(self) -> int:
+        """Сколько сессий еще может получить экземпляр без ожидания."""
+        return self.max_size - self.in_use
+
+    async def _create(self) -> PoseProcessor:
+        """Создает и прогревает новый экземпляр вне event loop."""
+        try:
+            processor = await asyncio.to_thread(self._factory)
+        except BaseException:
+            self._size -= 1
+            self._wake(None)
+            raise
+        try:
+            await asyncio.to_thread(processor.warmup)
+        except BaseException:
+            processor.close()
+            self._size -= 1
+            self._wake(None)
+            raise
+        return processor
+
+    def _wake(self, processor: PoseProcessor | None) -> bool:
+        """Передает экземпляр (или свободное место) первой ожидающей сессии."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(processor)
+                return True
+        return False
+
+    async def start(self) -> None:
+        """
+        Создает и прогревает `warm_size` экземпляров. Если хотя бы один
+        не создался, остальные закрываются и ошибка пробрасывается.
+        """
+        self._size += self.warm_size
+        results = await asyncio.gather(
+            *(self._create() for _ in range(self.warm_size)), return_exceptions=True
+        )
+        processors = [r for r in results if not isinstance(r, BaseException)]
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            # Неудачные экземпляры уже вычтены из размера в _create;
+            # удачные закрываем, чтобы пул остался пустым.
+            for processor in processors:
+                processor.close()
+            self._size -= len(processors)
+            raise errors[0]
+        now = time.monotonic()
+        self._idle.extend((processor, now) for processor in processors)
+        logger.info(f"Пул PoseLandmarker прогрет: {self.warm_size} экз.")
+
+    async def acquire(self) -> PoseProcessor:
+        """
+        Выдает свободный экземпляр, при необходимости создавая новый.
+
+        Raises:
+            LandmarkerPoolExhaustedError: Если пул заполнен и ни один экземпляр
+                не освободился за `acquire_timeout` секунд.
+        """
+        while self._idle:
+            processor, _ = self._idle.pop()
+            if processor.alive:
+                return processor
+            self._discard(processor)
+        if self._size < self.max_size:
+            # Резервируем место до создания, чтобы не превысить max_size.
+            self._size += 1
+            return await self._create()
+
+        waiter: asyncio.Future[PoseProcessor | None] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._waiters.append(waiter)
+        try:
+            result = await asyncio.wait_for(waiter, timeout=self.acquire_timeout)
+        except TimeoutError as e:
+            raise LandmarkerPoolExhaustedError("No free landmarker in the pool.") from e
+        except BaseException:
+            # Экземпляр мог быть передан в момент отмены: возвращаем его.
+            if waiter.done() and not waiter.cancelled():
+                handed_over = waiter.result()
+                if handed_over is not None:
+                    self.release(handed_over)
+            raise
+
+        if result is not None:
+            return result
+        self._size += 1
+        return await self._create()
+
+    def release(self, processor: PoseProcessor) -> None:
+        """Возвращает экземпляр в пул; неработающий закрывается."""
+        if not processor.alive:
+            self._discard(processor)
+            # Освободилось место: ожидающая сессия создаст новый экземпляр.
+            self._wake(None)
+            return
+        if not self._wake(processor):
+            self._idle.append((processor, time.monotonic()))
+
+    def _discard(self, processor: PoseProcessor) -> None:
+        self._size -= 1
+        processor.close()
+        logger.warning("Неработающий экземпляр PoseLandmarker удален из пула.")
+
+    def evict_dead(self) -> int:
+        """
+        Закрывает неработающие свободные экземпляры.
+
+        Returns:
+            Количество закрытых экземпляров.
+        """
+        dead = [entry for entry in self._idle if not entry[0].alive]
+        for entry in dead:
+            self._idle.remove(entry)
+            self._discard(entry[0])
+        return len(dead)
+
+    @asynccontextmanager
+    async def checkout(self) -> AsyncIterator[PoseProcessor]:
+        """Выдает экземпляр на время блока и гарантированно возвращает его."""
+        processor = await self.acquire()
+        try:
+            yield processor
+        finally:
+            self.release(processor)
+
+    def evict_idle(self) -> int:
+        """
+        Закрывает экземпляры, простаивающие дольше `idle_timeout`,
+        не опуская размер пула ниже `warm_size`.
+
+        Returns:
+            Количество закрытых экземпляров.
+        """
+        deadline = time.monotonic() - self.idle_timeout
+        evicted = 0
+        # Самые старые экземпляры находятся в начале очереди.
+        while (
+            self._idle and self._size > self.warm_size and self._idle[0][1] < deadline
+        ):
+            processor, _ = self._idle.popleft()
+            self._size -= 1
+            processor.close()
+            evicted += 1
+        if evicted:
+            logger.info(f"Из пула PoseLandmarker вытеснено {evicted} экз.")
+        return evicted
+
+    async def run_reaper(self, interval: float) -> None:
+        """Периодически вытесняет простаивающие и неработающие экземпляры."""
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_dead()
+            self.evict_idle()
+
+    def close(self) -> None:
+        """Закрывает все свободные экземпляры."""
+        while self._idle:
+            processor, _ = self._idle.pop()
+            self._size -= 1
+            processor.close()
@@ -0,0 +1,487 @@
+"""
+Инференс в пуле процессов-воркеров.
+
+MediaPipe вызывается из Python и держит GIL на подготовке изображения и
+разборе результата, поэтому потоки одного процесса сервера не загружают
+все ядра. В этом режиме экземпляры PoseLandmarker живут в процессах-
+воркерах, каждый воркер закреплен за своим ядром. Сервер по-прежнему
+декодирует и обрезает кадр и ведет конечный автомат, а воркер выполняет
+только модель.
+
+Декодированный кадр передается не через pickle, а через кольцевой буфер
+в разделяемой памяти (`multiprocessing.shared_memory`): у каждого воркера
+свой буфер из нескольких слотов. Ключевые точки возвращаются в том же
+слоте массивом (33, 4) float32. По каналу между процессами идут только
+короткие команды с номером слота.
+
+Воркер, завершившийся аварийно (OOM killer, сбой в MediaPipe), заменяется
+новым на том же ядре (`InferenceProcessPool.restart_dead`). Экземпляры
+модели в нем потеряны: пул `LandmarkerPool` отбрасывает их по `alive`.
+"""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, cast
+
+import numpy as np
+from app.analysis.pose_analyzer import PackedLandmark
+from app.analysis.pose_processor import NDArrayU8, PoseProcessor, RunningMode
+from app.config import Settings
+from app.encoding import landmarks_to_array
+from app.protocol import (
+    LANDMARK_FIELDS,
+    LANDMARKS_DTYPE,
+    LANDMARKS_NBYTES,
+    NUM_LANDMARKS,
+    NDArrayF32,
+)
+
+if TYPE_CHECKING:
+    from mediapipe.framework.formats import landmark_pb2
+
+logger = logging.getLogger(__name__)
+
+ProcessorFactory = Callable[[RunningMode], PoseProcessor]
+FrameShape = Tuple[int, ...]
+
+
+class InferenceWorkerError(Exception):
+    """Команда завершилась ошибкой в воркере или воркер завершился."""
+
+
+class FrameRing:
+    """
+    Кольцевой буфер кадров в разделяемой памяти.
+
+    Каждый слот - место под один декодированный кадр (до `frame_max_bytes`
+    байт) и за ним массив ключевых точек (33, 4) float32.
+    """
+
+    def __init__(self, shm: SharedMemory, slots: int, frame_max_bytes: int) -> None:
+        self._shm = shm
+        self.slots = slots
+        self.frame_max_bytes = frame_max_bytes
+        self._slot_bytes = frame_max_bytes + LANDMARKS_NBYTES
+
+    @classmethod
+    def create(cls, slots: int, frame_max_bytes: int) -> "FrameRing":
+        size = slots * (frame_max_bytes + LANDMARKS_NBYTES)
+        return cls(SharedMemory(create=True, size=size), slots, frame_max_bytes)
+
+    @classmethod
+    def attach(cls, name: str, slots: int, frame_max_bytes: int) -> "FrameRing":
+        # Воркер, запущенный через spawn, использует трекер ресурсов
+        # сервера, поэтому сегмент удаляет только его владелец (create).
+        return cls(SharedMemory(name=name), slots, frame_max_bytes)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def frame(self, slot: int, shape: FrameShape) -> NDArrayU8:
+        """Кадр слота: массив uint8 поверх разделяемой памяти, без копии."""
+        return np.ndarray(
+            shape, np.uint8, buffer=self._shm.buf, offset=slot * self._slot_bytes
+        )
+
+    def landmarks(self, slot: int) -> NDArrayF32:
+        """Ключевые точки слота (33, 4) поверх разделяемой памяти."""
+        return np.ndarray(
+            (NUM_LANDMARKS, LANDMARK_FIELDS),
+            LANDMARKS_DTYPE,
+            buffer=self._shm.buf,
+            offset=slot * self._slot_bytes + self.frame_max_bytes,
+        )
+
+    def close(self, unlink: bool = False) -> None:
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+
+
+def _fit_frame(frame: NDArrayU8, max_bytes: int) -> NDArrayU8:
+    """
+    Уменьшает кадр, не помещающийся в слот. Координаты точек MediaPipe
+    нормированы на размер кадра, поэтому ответ не меняется.
+    """
+    if frame.nbytes <= max_bytes:
+        return frame
+    import cv2
+
+    scale = (max_bytes / frame.nbytes) ** 0.5
+    height, width = frame.shape[:2]
+    size = (max(1, int(width * scale)), max(1, int(height * scale)))
+    return cast(NDArrayU8, cv2.resize(frame, size, interpolation=cv2.INTER_AREA))
+
+
+def _handle_command(
+    processors: Dict[int, PoseProcessor],
+    ring: FrameRing,
+    factory: ProcessorFactory,
+    name: str,
+    args: Tuple[Any, ...],
+) -> Any:
+    """Выполняет команду сервера в процессе-воркере."""
+    if name == "detect":
+        landmarker_id, slot, shape, timestamp_ms, reset = args
+        processor = processors[landmarker_id]
+        if reset:
+            processor.reset()
+        landmarks = processor.get_landmarks(ring.frame(slot, shape), timestamp_ms)
+        if landmarks is None:
+            return False
+        ring.landmarks(slot)[:] = landmarks_to_array(landmarks)
+        return True
+    if name == "create":
+        landmarker_id, running_mode = args
+        processors[landmarker_id] = factory(running_mode)
+    elif name == "warmup":
+        processors[args[0]].warmup()
+    elif name == "close":
+        processors.pop(args[0]).close()
+    else:
+        raise ValueError(f"Unknown command: {name}")
+    return None
+
+
+def _worker_main(
+    conn: Connection,
+    ring_name: str,
+    slots: int,
+    frame_max_bytes: int,
+    core: int | None,
+    factory: ProcessorFactory,
+) -> None:
+    """Цикл процесса-воркера: команды приходят по `conn`, None - остановка."""
+    if core is not None:
+        os.sched_setaffinity(0, {core})
+    ring = FrameRing.attach(ring_name, slots, frame_max_bytes)
+    processors: Dict[int, PoseProcessor] = {}
+    try:
+        while (command := conn.recv()) is not None:
+            request_id, name, args = command
+            try:
+                result = _handle_command(processors, ring, factory, name, args)
+            except Exception as e:
+                conn.send((request_id, False, f"{type(e).__name__}: {e}"))
+            else:
+                conn.send((request_id, True, result))
+    except (EOFError, KeyboardInterrupt):
+        # Сервер завершился, не остановив воркер.
+        pass
+    finally:
+        for processor in processors.values():
+            processor.close()
+        ring.close()
+
+
+class InferenceWorker:
+    """
+    Процесс-воркер со стороны сервера.
+
+    Методы вызываются из потоков исполнителя инференса и блокируют поток
+    до ответа воркера; ответы читает отдельный поток и передает их
+    ожидающим по номеру запроса.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        core: int | None,
+        slots: int,
+        frame_max_bytes: int,
+        factory: ProcessorFactory,
+    ) -> None:
+        self.index = index
+        self.core = core
+        self.landmarkers = 0
+        self.ring = FrameRing.create(slots, frame_max_bytes)
+        self._free_slots: queue.SimpleQueue[int] = queue.SimpleQueue()
+        for slot in range(slots):
+            self._free_slots.put(slot)
+        self._requests = itertools.count()
+        self._pending: Dict[int, Future[Any]] = {}
+        self._lock = threading.Lock()
+        # Поток чтения ответов увидел конец канала: воркер завершился.
+        self._exited = threading.Event()
+        self._stopping = False
+
+        # spawn, а не fork: в сервере уже работают потоки и может быть
+        # загружен MediaPipe, которые не переживают fork.
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, self.ring.name, slots, frame_max_bytes, core, factory),
+            name=f"inference-{index}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self._reader = threading.Thread(
+            target=self._read_replies, name=f"inference-{index}-reader", daemon=True
+        )
+        self._reader.start()
+
+    @property
+    def alive(self) -> bool:
+        """Работает ли процесс и принимает ли он команды."""
+        return not self._exited.is_set() and self.process.is_alive()
+
+    def call(self, name: str, *args: Any) -> Any:
+        """
+        Выполняет команду в воркере и возвращает ее результат.
+
+        Raises:
+            InferenceWorkerError: Если команда завершилась ошибкой или
+                воркер завершился.
+        """
+        future: Future[Any] = Future()
+        with self._lock:
+            # Иначе запрос, поставленный после того, как поток чтения
+            # завершил ожидающих, ждал бы ответа вечно.
+            if self._exited.is_set():
+                raise InferenceWorkerError(f"Worker {self.index} exited.")
+            request_id = next(self._requests)
+            self._pending[request_id] = future
+            try:
+                self._conn.send((request_id, name, args))
+            except (OSError, ValueError) as e:
+                del self._pending[request_id]
+                raise InferenceWorkerError(f"Worker {self.index} is gone.") from e
+        return future.result()
+
+    def _read_replies(self) -> None:
+        while True:
+            try:
+                request_id, ok, value = self._conn.recv()
+            except (EOFError, OSError, TypeError, ValueError):
+                # EOF - процесс завершился; остальные ошибки - канал уже
+                # закрыт. В любом случае ожидающие должны получить ошибку.
+                break
+            with self._lock:
+                future = self._pending.pop(request_id, None)
+            if future is None:
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(InferenceWorkerError(value))
+        with self._lock:
+            self._exited.set()
+            pending, self._pending = self._pending, {}
+        if not self._stopping:
+            logger.warning(
+                f"Процесс инференса {self.index} завершился "
+                f"(код {self.process.exitcode})."
+            )
+        for future in pending.values():
+            future.set_exception(InferenceWorkerError(f"Worker {self.index} exited."))
+
+    def detect(
+        self,
+        landmarker_id: int,
+        frame: NDArrayU8,
+        timestamp_ms: int | None,
+        reset: bool = False,
+    ) -> NDArrayF32 | None:
+        """
+        Передает кадр через слот буфера и возвращает копию точек или None.
+        `reset` - первый кадр новой сессии (см. PoseProcessor.reset).
+        """
+        frame = _fit_frame(frame, self.ring.frame_max_bytes)
+        slot = self._free_slots.get()
+        try:
+            # Единственное копирование кадра: в слот разделяемой памяти.
+            self.ring.frame(slot, frame.shape)[...] = frame
+            found = self.call(
+                "detect", landmarker_id, slot, frame.shape, timestamp_ms, reset
+            )
+            return self.ring.landmarks(slot).copy() if found else None
+        finally:
+            self._free_slots.put(slot)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Останавливает процесс и освобождает разделяемую память."""
+        self._stopping = True
+        with self._lock:
+            try:
+                self._conn.send(None)
+            except (OSError, ValueError):
+                pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        # Процесс завершен, поэтому поток чтения получит EOF. Канал
+        # закрывается только после потока: иначе recv упадет на закрытом
+        # дескрипторе или прочитает канал нового воркера, получившего тот
+        # же номер дескриптора.
+        self._reader.join()
+        self._conn.close()
+        self.ring.close(unlink=True)
+
+
+class RemotePoseProcessor(PoseProcessor):
+    """
+    Экземпляр PoseLandmarker в процессе-воркере с интерфейсом PoseProcessor:
+    пул и анализатор работают с ним так же, как с локальным экземпляром.
+    """
+
+    def __init__(
+        self, worker: InferenceWorker, landmarker_id: int, running_mode: RunningMode
+    ) -> None:
+        # Модель создается в воркере, поэтому PoseProcessor.__init__ не
+        # вызывается.
+        self.running_mode = running_mode
+        self.worker = worker
+        self.landmarker_id = landmarker_id
+        self._reset_pending = False
+        worker.call("create", landmarker_id, running_mode)
+
+    @property
+    def alive(self) -> bool:
+        # Экземпляр живет только в своем воркере: после перезапуска
+        # воркера он не восстанавливается.
+        return self.worker.alive
+
+    def reset(self) -> None:
+        # Передается с первым кадром сессии: выдача из пула идет в event
+        # loop, и отдельный вызов ждал бы занятый воркер.
+        self._reset_pending = True
+
+    def get_landmarks(
+        self, frame: NDArrayU8, timestamp_ms: Optional[int] = None
+    ) -> Optional[List["landmark_pb2.NormalizedLandmark"]]:
+        reset, self._reset_pending = self._reset_pending, False
+        array = self.worker.detect(self.landmarker_id, frame, timestamp_ms, reset)
+        if array is None:
+            return None
+        # Точки с теми же полями x, y, z, visibility, что и у MediaPipe.
+        return [PackedLandmark(*row) for row in array.tolist()]
+
+    def warmup(self) -> None:
+        self.worker.call("warmup", self.landmarker_id)
+
+    def close(self) -> None:
+        self.worker.landmarkers -= 1
+        try:
+            self.worker.call("close", self.landmarker_id)
+        except InferenceWorkerError:
+            # Воркер уже остановлен вместе со своими экземплярами.
+            pass
+
+
+class InferenceProcessPool:
+    """
+    Процессы-воркеры, по одному на ядро, в которых создаются экземпляры
+    PoseLandmarker для `LandmarkerPool`.
+
+    Новый экземпляр создается в воркере с наименьшим числом экземпляров.
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        ring_slots: int,
+        frame_max_bytes: int,
+        pin_cores: bool = True,
+        factory: ProcessorFactory = PoseProcessor,
+    ) -> None:
+        self.processes = processes
+        self.ring_slots = ring_slots
+        self.frame_max_bytes = frame_max_bytes
+        self.pin_cores = pin_cores
+        self.factory = factory
+        self.workers: List[InferenceWorker] = []
+        self._landmarker_ids = itertools.count()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "InferenceProcessPool":
+        """Создает пул по настройкам приложения."""
+        return cls(
+            processes=settings.inference_processes,
+            ring_slots=settings.inference_ring_slots,
+            frame_max_bytes=settings.inference_frame_max_bytes,
+            pin_cores=settings.inference_pin_cores,
+        )
+
+    def _cores(self) -> List[int | None]:
+        """Ядра для воркеров по кругу из доступных процессу (только Linux)."""
+        if not self.pin_cores or not hasattr(os, "sched_getaffinity"):
+            return [None] * self.processes
+        cores = sorted(os.sched_getaffinity(0))
+        return [cores[i % len(cores)] for i in range(self.processes)]
+
+    def start(self) -> None:
+        """Запускает процессы; модели в них создаются по требованию пула."""
+        self.workers = [
+            self._spawn(index, core) for index, core in enumerate(self._cores())
+        ]
+        logger.info(f"Запущено процессов инференса: {self.processes}.")
+
+    def _spawn(self, index: int, core: int | None) -> InferenceWorker:
+        return InferenceWorker(
+            index, core, self.ring_slots, self.frame_max_bytes, self.factory
+        )
+
+    def _restart_dead(self) -> int:
+        # Вызывается под self._lock.
+        restarted = 0
+        for position, worker in enumerate(self.workers):
+            if worker.alive:
+                continue
+            worker.stop(timeout=0)
+            self.workers[position] = self._spawn(worker.index, worker.core)
+            restarted += 1
+        if restarted:
+            logger.warning(f"Перезапущено процессов инференса: {restarted}.")
+        return restarted
+
+    def restart_dead(self) -> int:
+        """
+        Заменяет завершившиеся воркеры новыми на тех же ядрах.
+
+        Returns:
+            Количество перезапущенных воркеров.
+        """
+        with self._lock:
+            return self._restart_dead()
+
+    async def run_monitor(self, interval: float) -> None:
+        """Периодически проверяет воркеры и перезапускает завершившиеся."""
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.restart_dead)
+
+    def create_processor(self, running_mode: RunningMode) -> RemotePoseProcessor:
+        """
+        Создает экземпляр модели в наименее занятом воркере, предварительно
+        перезапустив завершившиеся.
+        """
+        with self._lock:
+            self._restart_dead()
+            worker = min(self.workers, key=lambda worker: worker.landmarkers)
+            worker.landmarkers += 1
+            landmarker_id = next(self._landmarker_ids)
+        try:
+            return RemotePoseProcessor(worker, landmarker_id, running_mode)
+        except BaseException:
+            worker.landmarkers -= 1
+            raise
+
+    def shutdown(self) -> None:
+        """Останавливает воркеры вместе с их экземплярами модели."""
+        for worker in self.workers:
+            worker.stop()
+        self.workers = []
+        logger.info("Процессы инференса остановлены.")
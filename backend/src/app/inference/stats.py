@@ -0,0 +1,59 @@
+"""
+Содержит класс InferenceStats - статистику исполнителя инференса.
+
+Статистика собирается одинаково для обычного исполнителя (каждый кадр -
+отдельный вызов, пакет из одного кадра) и для исполнителя с пакетной
+обработкой, поэтому их отчеты можно сравнивать напрямую.
+"""
+
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable
+
+import numpy as np
+
+# Сколько последних пакетов и кадров учитывается в процентилях.
+STATS_WINDOW = 1024
+
+
+class InferenceStats:
+    """Размеры пакетов, задержка в очереди и пропускная способность."""
+
+    def __init__(self, window: int = STATS_WINDOW) -> None:
+        self.batches = 0
+        self.frames = 0
+        self._batch_sizes: Deque[int] = deque(maxlen=window)
+        self._queue_delays_ms: Deque[float] = deque(maxlen=window)
+        self._started_at = time.monotonic()
+
+    def record(self, batch_size: int, queue_delays_s: Iterable[float]) -> None:
+        """
+        Учитывает отправленный на выполнение пакет.
+
+        Args:
+            batch_size: Число кадров в пакете.
+            queue_delays_s: Время ожидания в очереди каждого кадра пакета.
+        """
+        self.batches += 1
+        self.frames += batch_size
+        self._batch_sizes.append(batch_size)
+        self._queue_delays_ms.extend(delay * 1000.0 for delay in queue_delays_s)
+
+    def report(self) -> Dict[str, float]:
+        """Возвращает плоский словарь метрик для дашборда."""
+        elapsed = time.monotonic() - self._started_at
+        report = {
+            "batches": float(self.batches),
+            "frames": float(self.frames),
+            "throughput_fps": self.frames / elapsed if elapsed > 0 else 0.0,
+        }
+        if self._batch_sizes:
+            sizes = np.asarray(self._batch_sizes)
+            report["batch_size_mean"] = float(sizes.mean())
+            report["batch_size_max"] = float(sizes.max())
+        if self._queue_delays_ms:
+            p50, p95, p99 = np.percentile(self._queue_delays_ms, [50, 95, 99])
+            report["queue_delay_ms_p50"] = float(p50)
+            report["queue_delay_ms_p95"] = float(p95)
+            report["queue_delay_ms_p99"] = float(p99)
+        return report
@@ -0,0 +1,139 @@
+"""
+Оценка загрузки узла для балансировщика.
+
+Эндпоинт /ready сообщает текущую загрузку (сессии, очередь инференса,
+свободные экземпляры модели, p95 задержки ответа за последние секунды) и
+перестает считать узел готовым, когда загрузка превышает пороги из
+настроек: балансировщик направляет новые сессии на другие узлы.
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+import numpy as np
+from app.config import Settings
+
+
+class LatencyWindow:
+    """Задержки ответов на кадры всех сессий за последние `window_s` секунд."""
+
+    def __init__(
+        self,
+        window_s: float,
+        maxlen: int = 4096,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.window_s = window_s
+        self._clock = clock
+        # (время ответа, задержка в мс); при переполнении вытесняются старые.
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=maxlen)
+
+    def record(self, latency_s: float) -> None:
+        self._samples.append((self._clock(), latency_s * 1000.0))
+
+    def p95_ms(self) -> float | None:
+        """p95 задержки за окно или None, если ответов не было."""
+        cutoff = self._clock() - self.window_s
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+        if not self._samples:
+            return None
+        return float(np.percentile([ms for _, ms in self._samples], 95))
+
+
+@dataclass(frozen=True, slots=True)
+class LoadThresholds:
+    """Пороги, после которых узел не принимает новые сессии (0 - без порога)."""
+
+    max_sessions: int
+    max_queue_depth: int
+    min_free_landmarkers: int
+    max_latency_p95_ms: float
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "LoadThresholds":
+        return cls(
+            # Без своего порога узел не готов, когда достигнут жесткий
+            # предел сессий: новые соединения все равно будут отклонены.
+            max_sessions=settings.ready_max_sessions or settings.max_sessions,
+            max_queue_depth=settings.ready_max_queue_depth,
+            min_free_landmarkers=settings.ready_min_free_landmarkers,
+            max_latency_p95_ms=settings.ready_max_latency_p95_ms,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class NodeLoad:
+    """Текущая загрузка узла."""
+
+    sessions: int
+    queue_depth: int
+    # Свободные экземпляры модели (включая еще не созданные) по режимам.
+    landmarkers_free: Dict[str, int]
+    landmarkers_max: Dict[str, int]
+    latency_p95_ms: float | None
+
+    def overloaded(self, thresholds: LoadThresholds, running_mode: str) -> List[str]:
+        """
+        Пороги, которые превышены.
+
+        Args:
+            thresholds: Пороги из настроек.
+            running_mode: Режим детектора по умолчанию, по пулу которого
+                проверяется число свободных экземпляров.
+
+        Returns:
+            Названия превышенных порогов; пустой список - узел готов.
+        """
+        reasons = []
+        if thresholds.max_sessions and self.sessions >= thresholds.max_sessions:
+            reasons.append("sessions")
+        if (
+            thresholds.max_queue_depth
+            and self.queue_depth >= thresholds.max_queue_depth
+        ):
+            reasons.append("queue_depth")
+        if self.landmarkers_free[running_mode] < thresholds.min_free_landmarkers:
+            reasons.append("landmarkers_free")
+        if (
+            thresholds.max_latency_p95_ms
+            and self.latency_p95_ms is not None
+            and self.latency_p95_ms >= thresholds.max_latency_p95_ms
+        ):
+            reasons.append("latency_p95_ms")
+        return reasons
+
+    def score(self, thresholds: LoadThresholds, running_mode: str) -> float:
+        """
+        Загрузка от 0 до 1 (и выше при превышении порогов): наибольшая доля
+        использованного ресурса. Балансировщик выбирает узел с меньшей.
+        """
+        free, size = (
+            self.landmarkers_free[running_mode],
+            self.landmarkers_max[running_mode],
+        )
+        ratios = [1.0 - free / size if size else 1.0]
+        if thresholds.max_sessions:
+            ratios.append(self.sessions / thresholds.max_sessions)
+        if thresholds.max_queue_depth:
+            ratios.append(self.queue_depth / thresholds.max_queue_depth)
+        if thresholds.max_latency_p95_ms and self.latency_p95_ms is not None:
+            ratios.append(self.latency_p95_ms / thresholds.max_latency_p95_ms)
+        return round(max(ratios), 3)
+
+    def report(self, thresholds: LoadThresholds, running_mode: str) -> Dict[str, Any]:
+        """Ответ /ready: статус, загрузка и превышенные пороги."""
+        reasons = self.overloaded(thresholds, running_mode)
+        return {
+            "status": "overloaded" if reasons else "ready",
+            "load": self.score(thresholds, running_mode),
+            "overloaded": reasons,
+            "sessions": self.sessions,
+            "inference_queue_depth": self.queue_depth,
+            "landmarkers_free": self.landmarkers_free,
+            "frame_latency_p95_ms": (
+                None if self.latency_p95_ms is None else round(self.latency_p95_ms, 1)
+            ),
+        }
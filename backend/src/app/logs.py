@@ -0,0 +1,222 @@
+"""
+Структурированное логирование сервиса.
+
+Записи передаются через очередь (`QueueHandler`) отдельному потоку
+(`QueueListener`), который форматирует их и пишет в поток вывода: вызов
+логгера в event loop не ждет ни форматирования, ни записи. Поля,
+переданные через `extra`, выводятся отдельно - парами key=value в
+текстовом формате или ключами объекта в формате JSON.
+
+На каждый кадр сессия не пишет ничего, кроме ограниченных по частоте
+записей `SessionLogger.frame_answered`; при отключении клиента пишется
+одна итоговая запись с числом кадров и перцентилями задержки.
+"""
+
+import json
+import logging
+import random
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import IO, Any, Callable, Dict, List
+
+import numpy as np
+from app.config import Settings
+from app.schemas import ServerMessage
+
+logger = logging.getLogger(__name__)
+
+# Атрибуты LogRecord; все остальные атрибуты записи пришли из `extra`.
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+
+
+def _extra_fields(record: logging.LogRecord) -> Dict[str, Any]:
+    return {
+        key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS
+    }
+
+
+class TextFormatter(logging.Formatter):
+    """Строка для чтения человеком; поля из `extra` - парами key=value."""
+
+    def __init__(self) -> None:
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = " ".join(f"{k}={v}" for k, v in _extra_fields(record).items())
+        return f"{text} {fields}" if fields else text
+
+
+class JsonFormatter(logging.Formatter):
+    """Один JSON-объект на строку; поля из `extra` - ключами объекта."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **_extra_fields(record),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _ServiceQueueHandler(QueueHandler):
+    """Обработчик, установленный `configure_logging` (чтобы его заменять)."""
+
+
+class LogListener(QueueListener):
+    """Поток записи логов; при остановке снимает обработчик-очередь."""
+
+    def __init__(
+        self, log_queue: "SimpleQueue[logging.LogRecord]", output: logging.Handler
+    ) -> None:
+        super().__init__(log_queue, output, respect_handler_level=True)
+        self.queue_handler = _ServiceQueueHandler(log_queue)
+
+    def stop(self) -> None:
+        """Дописывает очередь и возвращает логирование в исходное состояние."""
+        logging.getLogger().removeHandler(self.queue_handler)
+        super().stop()
+
+
+def configure_logging(settings: Settings, stream: IO[str] | None = None) -> LogListener:
+    """
+    Направляет логи сервиса через очередь в поток вывода.
+
+    Повторный вызов заменяет обработчик, установленный предыдущим вызовом;
+    остальные обработчики корневого логгера не трогаются.
+
+    Args:
+        settings: Уровень и формат логов.
+        stream: Куда писать записи (по умолчанию stderr).
+
+    Returns:
+        Запущенный поток записи; `stop()` дописывает очередь, останавливает
+        его и снимает обработчик.
+    """
+    output = logging.StreamHandler(stream if stream is not None else sys.stderr)
+    output.setFormatter(
+        JsonFormatter() if settings.log_format == "json" else TextFormatter()
+    )
+    listener = LogListener(SimpleQueue(), output)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, _ServiceQueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(listener.queue_handler)
+    root.setLevel(settings.log_level)
+    listener.start()
+    return listener
+
+
+class SessionLogger:
+    """
+    Логи одной WebSocket-сессии.
+
+    Считает кадры и хранит выборку задержек ответа (равномерная выборка
+    фиксированного размера по всей сессии), чтобы при отключении записать
+    одну итоговую запись. Запись о кадре пишется не чаще раза в
+    `frame_interval_s` секунд.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        frame_interval_s: float,
+        latency_samples: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.session_id = session_id
+        self.frame_interval_s = frame_interval_s
+        self.latency_samples = latency_samples
+        self._clock = clock
+        self._started = clock()
+        self._next_frame_log = self._started
+        self._latencies_ms: List[float] = []
+        self._max_latency_ms = 0.0
+        self._random = random.Random(session_id)
+        self.received = 0
+        self.answered = 0
+        self.errors = 0
+
+    @classmethod
+    def from_settings(cls, session_id: str, settings: Settings) -> "SessionLogger":
+        return cls(
+            session_id, settings.log_frame_interval_s, settings.log_latency_samples
+        )
+
+    def frame_received(self) -> None:
+        self.received += 1
+
+    def frame_answered(self, latency_s: float, message: ServerMessage) -> None:
+        """Учитывает ответ на кадр и, если пора, пишет запись о нем."""
+        latency_ms = latency_s * 1000.0
+        if message.type == "ERROR":
+            self.errors += 1
+        else:
+            self.answered += 1
+        self._sample(latency_ms)
+        if self.frame_interval_s <= 0:
+            return
+        now = self._clock()
+        if now < self._next_frame_log:
+            return
+        self._next_frame_log = now + self.frame_interval_s
+        logger.info(
+            "Кадр сессии обработан.",
+            extra={
+                "session": self.session_id,
+                "type": message.type,
+                "seq": message.payload.get("seq"),
+                "latency_ms": round(latency_ms, 1),
+                "frames": self.received,
+            },
+        )
+
+    def _sample(self, latency_ms: float) -> None:
+        # Равномерная выборка (алгоритм R): каждая задержка сессии попадает
+        # в выборку с одинаковой вероятностью при постоянном объеме памяти.
+        self._max_latency_ms = max(self._max_latency_ms, latency_ms)
+        seen = self.answered + self.errors
+        if len(self._latencies_ms) < self.latency_samples:
+            self._latencies_ms.append(latency_ms)
+            return
+        index = self._random.randrange(seen)
+        if index < self.latency_samples:
+            self._latencies_ms[index] = latency_ms
+
+    def latency_percentiles(self) -> Dict[str, float]:
+        if not self._latencies_ms:
+            return {}
+        p50, p95, p99 = np.percentile(self._latencies_ms, [50, 95, 99])
+        return {
+            "latency_p50_ms": round(float(p50), 1),
+            "latency_p95_ms": round(float(p95), 1),
+            "latency_p99_ms": round(float(p99), 1),
+            "latency_max_ms": round(self._max_latency_ms, 1),
+        }
+
+    def summary(self, **fields: Any) -> None:
+        """Пишет итоговую запись сессии; `fields` добавляются к ней."""
+        logger.info(
+            "Сессия завершена.",
+            extra={
+                "session": self.session_id,
+                "duration_s": round(self._clock() - self._started, 1),
+                "frames_received": self.received,
+                "frames_answered": self.answered,
+                "frame_errors": self.errors,
+                **fields,
+                **self.latency_percentiles(),
+            },
+        )
@@ -0,0 +1,71 @@
+"""
+Почтовый ящик кадров сессии по принципу "побеждает последний кадр".
+
+Приемник сообщений кладет каждый кадр-изображение в ящик, а задача анализа
+забирает из него самый свежий. Если анализ не успевает за клиентом,
+кадры, ожидающие обработки, заменяются новыми, и задержка обратной связи
+не растет.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from app import metrics
+from app.schemas import ServerMessage
+
+
+@dataclass(slots=True)
+class PendingFrame:
+    """Кадр, ожидающий анализа."""
+
+    # Обработка кадра (декодирование, инференс, анализ).
+    process: Callable[[], Awaitable[ServerMessage]]
+    # Порядковый номер и метка времени клиента, если клиент их прислал.
+    seq: Optional[int] = None
+    client_ts: Optional[int] = None
+    received_at: float = field(default_factory=time.monotonic)
+
+
+class FrameMailbox:
+    """Ящик на один кадр: новый кадр вытесняет необработанный."""
+
+    def __init__(self) -> None:
+        self._frame: Optional[PendingFrame] = None
+        self._ready = asyncio.Event()
+        self._closed = False
+        self.received = 0
+        self.dropped = 0
+
+    def put(self, frame: PendingFrame) -> None:
+        """Кладет кадр, вытесняя кадр, который еще не начали обрабатывать."""
+        if self._closed:
+            return
+        self.received += 1
+        if self._frame is not None:
+            self.dropped += 1
+            metrics.STALE_FRAMES_DROPPED.inc()
+        self._frame = frame
+        self._ready.set()
+
+    async def get(self) -> Optional[PendingFrame]:
+        """
+        Ждет и забирает самый свежий кадр.
+
+        Returns:
+            Кадр или None, если ящик закрыт.
+        """
+        await self._ready.wait()
+        frame, self._frame = self._frame, None
+        self._ready.clear()
+        return frame
+
+    def close(self) -> None:
+        """Закрывает ящик; ожидающий кадр отбрасывается."""
+        if self._frame is not None:
+            self.dropped += 1
+            metrics.STALE_FRAMES_DROPPED.inc()
+            self._frame = None
+        self._closed = True
+        self._ready.set()
@@ -3,22 +3,192 @@
 Определяет точки входа API и основную конфигурацию.
 """
 
+import asyncio
+import binascii
+import contextlib
+import functools
+import json
 import logging
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    ParamSpec,
+)
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import (
+    FastAPI,
+    HTTPException,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import ValidationError
+from starlette.background import BackgroundTask
 
-from .analysis.pose_analyzer import PoseAnalyzer
-from .schemas import ClientMessage, ServerMessage
+from . import metrics
+from .admission import (
+    CLOSE_IDLE,
+    CLOSE_OVERLOADED,
+    CLOSE_POLICY,
+    ConcurrencyLimit,
+    FrameFloodError,
+    SessionIdleError,
+)
+from .analysis.pose_processor import PoseProcessor, RunningMode, preload
+from .config import get_settings
+from .inference import create_executor
+from .inference.executor import InferenceExecutor, InferenceQueueFullError
+from .inference.pool import LandmarkerPool, LandmarkerPoolExhaustedError
+from .inference.processes import InferenceProcessPool
+from .load import LatencyWindow, LoadThresholds, NodeLoad
+from .logs import configure_logging
+from .mailbox import FrameMailbox, PendingFrame
+from .offline import EventFormat, VideoOpenError, analyze_video, format_event
+from .protocol import (
+    BinaryFrameError,
+    LandmarksFormatError,
+    MessageKind,
+    parse_binary_frame,
+    unpack_landmarks,
+)
+from .schemas import (
+    ClientMessage,
+    ResumeRequest,
+    ServerMessage,
+    SessionOptions,
+    parse_client_message,
+)
+from .session import AnalysisSession
+from .session_store import create_session_store
 
-# Настраиваем базовый логгер
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+P = ParamSpec("P")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Создает общие ресурсы при старте приложения и освобождает их при остановке.
+
+    Модели загружаются в фоне (`_load_models`): приложение сразу начинает
+    отвечать на /health, а /ready сообщает о готовности после прогрева.
+    """
+    settings = get_settings()
+    log_listener = configure_logging(settings)
+    app.state.settings = settings
+    app.state.ready = False
+    app.state.frame_latency = LatencyWindow(settings.ready_latency_window_s)
+    app.state.session_store = create_session_store(settings)
+    app.state.uploads = ConcurrencyLimit(settings.offline_max_uploads)
+    app.state.executor = create_executor(settings)
+    logger.info(f"Исполнитель инференса ({settings.inference_executor}) запущен.")
+
+    processes = None
+    if settings.inference_processes:
+        processes = InferenceProcessPool.from_settings(settings)
+        processes.start()
+
+    # Отдельный пул на каждый режим детектора: экземпляр PoseLandmarker
+    # создается под конкретный режим и не может его сменить.
+    # Прогревается только пул режима по умолчанию.
+    pools: Dict[RunningMode, LandmarkerPool] = {}
+    running_modes: tuple[RunningMode, ...] = ("IMAGE", "VIDEO")
+    for running_mode in running_modes:
+        is_default = running_mode == settings.default_running_mode
+        pools[running_mode] = LandmarkerPool(
+            factory=_landmarker_factory(processes, running_mode),
+            max_size=settings.landmarker_pool_size,
+            warm_size=settings.landmarker_pool_warm if is_default else 0,
+            idle_timeout=settings.landmarker_idle_timeout_s,
+            acquire_timeout=settings.landmarker_acquire_timeout_s,
+        )
+        _bind_pool_metrics(running_mode, pools[running_mode])
+    app.state.landmarker_pools = pools
+    metrics.INFERENCE_IN_FLIGHT.set_function(lambda: app.state.executor.in_flight)
+    metrics.INFERENCE_QUEUE_DEPTH.set_function(lambda: app.state.executor.queue_depth)
+    tasks = [
+        asyncio.create_task(pool.run_reaper(settings.landmarker_reap_interval_s))
+        for pool in pools.values()
+    ]
+    if processes is not None:
+        tasks.append(
+            asyncio.create_task(
+                processes.run_monitor(settings.landmarker_reap_interval_s)
+            )
+        )
+    tasks.append(
+        asyncio.create_task(_load_models(app, pools[settings.default_running_mode]))
+    )
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        await app.state.executor.shutdown()
+        for pool in pools.values():
+            pool.close()
+        if processes is not None:
+            processes.shutdown()
+        await app.state.session_store.close()
+        log_listener.stop()
+
+
+def _landmarker_factory(
+    processes: InferenceProcessPool | None, running_mode: RunningMode
+) -> Callable[[], PoseProcessor]:
+    """Экземпляры модели создаются в процессах-воркерах или в этом процессе."""
+    if processes is not None:
+        return functools.partial(processes.create_processor, running_mode)
+    return functools.partial(PoseProcessor, running_mode=running_mode)
+
+
+async def _load_models(app: FastAPI, pool: LandmarkerPool) -> None:
+    """
+    Импортирует OpenCV и MediaPipe и прогревает пул режима по умолчанию,
+    после чего узел считается готовым (/ready).
+    """
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(preload)
+        await pool.start()
+    except Exception:
+        logger.exception("Не удалось загрузить модель PoseLandmarker.")
+        return
+    app.state.ready = True
+    logger.info(
+        "Узел готов к приему сессий.",
+        extra={"startup_s": round(time.perf_counter() - started, 2)},
+    )
+
+
+def _bind_pool_metrics(running_mode: RunningMode, pool: LandmarkerPool) -> None:
+    """Метрики заполненности пула вычисляются при каждом чтении /metrics."""
+    metrics.LANDMARKER_POOL_SIZE.labels(running_mode).set_function(lambda: pool.size)
+    metrics.LANDMARKER_POOL_IN_USE.labels(running_mode).set_function(
+        lambda: pool.in_use
+    )
+    metrics.LANDMARKER_POOL_MAX.labels(running_mode).set(pool.max_size)
+
+
 app = FastAPI(
     title="KinetiCoach API",
     description="API для анализа техники приседаний в реальном времени.",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 
@@ -28,49 +198,650 @@ def health_check() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/ready", tags=["System"])
+def readiness(request: Request) -> JSONResponse:
+    """
+    Готов ли узел принимать новые сессии и насколько он загружен.
+
+    Возвращает 503, пока модели не загружены ("starting") и пока загрузка
+    превышает пороги из настроек ready_* ("overloaded"). Поле load (0..1)
+    позволяет балансировщику выбрать наименее загруженный из готовых узлов.
+    """
+    state = request.app.state
+    if not state.ready:
+        return JSONResponse({"status": "starting"}, status_code=503)
+    pools: Dict[RunningMode, LandmarkerPool] = state.landmarker_pools
+    load = NodeLoad(
+        # Анализ загруженного видео нагружает узел как сессия.
+        sessions=int(metrics.SESSIONS_ACTIVE.value) + state.uploads.active,
+        queue_depth=state.executor.queue_depth,
+        landmarkers_free={mode: pool.available for mode, pool in pools.items()},
+        landmarkers_max={mode: pool.max_size for mode, pool in pools.items()},
+        latency_p95_ms=state.frame_latency.p95_ms(),
+    )
+    report = load.report(
+        LoadThresholds.from_settings(state.settings),
+        state.settings.default_running_mode,
+    )
+    status_code = 200 if report["status"] == "ready" else 503
+    return JSONResponse(report, status_code=status_code)
+
+
+@app.get("/metrics", tags=["System"], response_class=PlainTextResponse)
+def prometheus_metrics() -> PlainTextResponse:
+    """Метрики сервиса в текстовом формате Prometheus."""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/inference/stats", tags=["System"])
+def inference_stats(request: Request) -> dict[str, float]:
+    """
+    Возвращает состояние исполнителя инференса: загрузку, размеры пакетов,
+    задержку в очереди и пропускную способность.
+    """
+    executor: InferenceExecutor = request.app.state.executor
+    return executor.report()
+
+
+async def _save_upload(request: Request, max_bytes: int) -> str:
+    """
+    Сохраняет тело запроса во временный файл по частям: OpenCV читает
+    видео только из файла.
+
+    Raises:
+        HTTPException: 413, если файл больше `max_bytes`; 400, если он пуст.
+    """
+    fd, path = tempfile.mkstemp(prefix="kineticoach-", suffix=".video")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as file:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(status_code=413, detail="Video is too large.")
+                await asyncio.to_thread(file.write, chunk)
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Request body is empty.")
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+async def _checkout_landmarkers(
+    pool: LandmarkerPool, count: int, reserve: int
+) -> List[PoseProcessor]:
+    """
+    Берет экземпляры модели для офлайн-анализа из общего пула: первый -
+    с ожиданием, как сессия, остальные - только пока у сессий остается
+    больше `reserve` свободных экземпляров.
+
+    Raises:
+        HTTPException: 503, если свободного экземпляра нет.
+    """
+    try:
+        processors = [await pool.acquire()]
+    except LandmarkerPoolExhaustedError as e:
+        raise HTTPException(
+            status_code=503, detail="No free landmarker, try again later."
+        ) from e
+    try:
+        while len(processors) < count and pool.available > reserve:
+            processors.append(await pool.acquire())
+    except BaseException:
+        for processor in processors:
+            pool.release(processor)
+        raise
+    for processor in processors:
+        processor.reset()
+    return processors
+
+
+@app.post("/analysis/video", tags=["Analysis"])
+async def analyze_video_upload(
+    request: Request,
+    format: EventFormat = "ndjson",
+    running_mode: RunningMode = "IMAGE",
+    stride: int = Query(default=1, ge=1),
+) -> StreamingResponse:
+    """
+    Анализирует загруженное видео (тело запроса - сам файл) и передает
+    результаты по мере обработки: событие REP на каждое повторение и
+    итоговый REPORT, в формате NDJSON или Server-Sent Events.
+
+    Узел анализирует не больше offline_max_uploads видео одновременно,
+    экземпляры модели берутся из общего с сессиями пула; если места или
+    экземпляра нет, ответ - 503.
+    """
+    state = request.app.state
+    settings = state.settings
+    release_upload = state.uploads.try_acquire()
+    if release_upload is None:
+        raise HTTPException(
+            status_code=503, detail="Too many video uploads, try again later."
+        )
+    pool: LandmarkerPool = state.landmarker_pools[running_mode]
+    loop = asyncio.get_running_loop()
+    processors: List[PoseProcessor] = []
+
+    def release_processor(processor: PoseProcessor) -> None:
+        # Конвейер освобождает экземпляры в своих потоках, а пул
+        # работает в event loop.
+        loop.call_soon_threadsafe(pool.release, processor)
+
+    def finish() -> None:
+        # Экземпляры, которые не понадобились воркерам конвейера.
+        while processors:
+            release_processor(processors.pop())
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+        release_upload()
+
+    path = ""
+    try:
+        path = await _save_upload(request, settings.offline_max_upload_mb * 1024 * 1024)
+        workers = 1 if running_mode == "VIDEO" else settings.offline_workers
+        processors += await _checkout_landmarkers(
+            pool, workers, settings.ready_min_free_landmarkers
+        )
+        # Открытие файла и импорт OpenCV не должны останавливать event loop.
+        events = await asyncio.to_thread(
+            analyze_video,
+            path,
+            running_mode=running_mode,
+            workers=len(processors),
+            stride=stride,
+            processor_factory=lambda _: processors.pop(),
+            processor_close=release_processor,
+        )
+    except VideoOpenError as e:
+        finish()
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except BaseException:
+        finish()
+        raise
+
+    def stream() -> Iterator[str]:
+        try:
+            for event in events:
+                yield format_event(event, format)
+        finally:
+            # Закрытие конвейера возвращает экземпляры в пул и при
+            # обрыве соединения клиентом.
+            events.close()
+            finish()
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        stream(), media_type=media_type, background=BackgroundTask(finish)
+    )
+
+
 @app.websocket("/ws/analysis")
 async def websocket_endpoint(websocket: WebSocket) -> None:
     """
     Обрабатывает WebSocket-соединения для анализа движений в реальном времени.
     """
     await websocket.accept()
-    # Создаем экземпляр анализатора для этой конкретной сессии
-    analyzer = PoseAnalyzer()
-    logger.info("WebSocket-соединение установлено, создан экземпляр PoseAnalyzer.")
+    settings = websocket.app.state.settings
+    if settings.max_sessions and metrics.SESSIONS_ACTIVE.value >= settings.max_sessions:
+        # Соединение принимается и сразу закрывается: так клиент получает
+        # код 1013, а не ошибку рукопожатия без кода.
+        metrics.REJECTED_SESSIONS.inc()
+        logger.warning("Достигнут предел сессий узла, соединение отклонено.")
+        await websocket.close(CLOSE_OVERLOADED, "Server is at capacity.")
+        return
+    metrics.SESSIONS_TOTAL.inc()
+    metrics.SESSIONS_ACTIVE.inc()
+    executor: InferenceExecutor = websocket.app.state.executor
+    # Создаем сессию с экземпляром анализатора для этого соединения
+    session = AnalysisSession(
+        websocket.app.state.landmarker_pools,
+        settings,
+        websocket.app.state.session_store,
+    )
+    logger.info("WebSocket-соединение установлено.", extra={"session": session.id})
+    mailbox = FrameMailbox()
+
+    try:
+        await _run_session(websocket, session, executor, mailbox)
+    finally:
+        # Снимок сохраняется при любом исходе, кроме END_SESSION: клиент
+        # сможет продолжить подход после переподключения.
+        await session.checkpoint(force=True)
+        # Экземпляр модели возвращается в пул при любом исходе сессии.
+        session.close(frames_dropped=mailbox.dropped)
+        metrics.SESSIONS_ACTIVE.dec()
+
+
+async def _start_session(
+    session: AnalysisSession, payload: dict[str, Any]
+) -> ServerMessage:
+    """
+    Применяет параметры сессии из START_SESSION и сообщает клиенту
+    итоговые (согласованные) параметры.
+    """
+    options = SessionOptions.model_validate(payload)
+    await session.configure(options)
+    response_payload = {
+        "status": "processed",
+        "original_type": "START_SESSION",
+        "session": session.options.model_dump(),
+        "resume_token": session.resume_token,
+    }
+    return ServerMessage(type="INFO", payload=response_payload)
+
+
+async def _resume_session(
+    session: AnalysisSession, payload: dict[str, Any]
+) -> ServerMessage:
+    """
+    Возобновляет сессию по токену из RESUME_SESSION. Если снимка нет
+    (истек срок или другой узел без общего хранилища), сессия
+    продолжается как новая с новым токеном: resumed = false.
+    """
+    request = ResumeRequest.model_validate(payload)
+    resumed = await session.resume(request.resume_token)
+    if resumed:
+        metrics.SESSIONS_RESUMED.inc()
+    analyzer = session.analyzer
+    response_payload = {
+        "status": "processed",
+        "original_type": "RESUME_SESSION",
+        "resumed": resumed,
+        "session": session.options.model_dump(),
+        "resume_token": session.resume_token,
+        "rep_count": analyzer.rep_counter,
+        "state": analyzer.state,
+    }
+    return ServerMessage(type="INFO", payload=response_payload)
 
+
+async def _handle_control(
+    session: AnalysisSession, client_msg: ClientMessage
+) -> ServerMessage:
+    """
+    Обрабатывает START_SESSION и RESUME_SESSION после кадра, который уже
+    анализируется: смена режима возвращает экземпляр модели в пул.
+    """
+    async with session.lock:
+        if client_msg.type == "RESUME_SESSION":
+            return await _resume_session(session, client_msg.payload)
+        return await _start_session(session, client_msg.payload)
+
+
+async def _run_inference(
+    session: AnalysisSession,
+    executor: InferenceExecutor,
+    func: Callable[P, ServerMessage],
+    *args: P.args,
+    **kwargs: P.kwargs,
+) -> ServerMessage:
+    """Выполняет обработку кадра-изображения в исполнителе инференса."""
+    try:
+        await session.ensure_processor()
+    except LandmarkerPoolExhaustedError:
+        metrics.NO_LANDMARKER_FRAMES_DROPPED.inc()
+        return ServerMessage(
+            type="ERROR", payload={"message": "No free landmarker, try again later."}
+        )
+    try:
+        # Тяжелая обработка кадра выполняется вне event loop,
+        # чтобы не блокировать остальные сессии.
+        return await executor.run(func, *args, **kwargs)
+    except InferenceQueueFullError:
+        # Сервер перегружен: отбрасываем кадр, клиент пришлет следующий.
+        metrics.BUSY_FRAMES_DROPPED.inc()
+        return ServerMessage(type="ERROR", payload={"message": "Server is busy."})
+
+
+async def _process_landmarks(
+    session: AnalysisSession, buffer: bytes | memoryview
+) -> ServerMessage:
+    """
+    Обрабатывает ключевые точки, рассчитанные на клиенте.
+
+    Выполняется прямо в event loop: работает только конечный автомат,
+    что дешевле передачи задачи в пул потоков. Если в это время
+    анализируется кадр-изображение, точки ждут его окончания.
+    """
+    try:
+        landmarks = unpack_landmarks(buffer)
+    except LandmarksFormatError as e:
+        return ServerMessage(type="ERROR", payload={"message": str(e)})
+    async with session.lock:
+        return session.analyzer.process_landmarks(landmarks)
+
+
+def _reject_frame(session: AnalysisSession) -> ServerMessage | None:
+    """
+    Отклоняет кадр сверх лимита частоты. Ошибка отправляется одна на окно:
+    клиент, который шлет кадры слишком часто, не получает ответ на каждый.
+
+    Raises:
+        FrameFloodError: Если клиент продолжает слать кадры намного чаще лимита.
+    """
+    metrics.RATE_LIMITED_FRAMES_DROPPED.inc()
+    if not session.reject_frame():
+        return None
+    return ServerMessage(
+        type="ERROR", payload={"message": "Frame rate limit exceeded."}
+    )
+
+
+def _frame_meta(payload: dict[str, Any]) -> tuple[int | None, int | None]:
+    """Извлекает порядковый номер и метку времени клиента из POSE_DATA."""
+    seq, client_ts = payload.get("seq"), payload.get("ts")
+    return (
+        seq if isinstance(seq, int) else None,
+        client_ts if isinstance(client_ts, int) else None,
+    )
+
+
+async def _handle_pose_data(
+    session: AnalysisSession,
+    executor: InferenceExecutor,
+    mailbox: FrameMailbox,
+    payload: dict[str, Any],
+) -> ServerMessage | None:
+    """
+    Обрабатывает POSE_DATA в JSON: кадр в base64 или упакованные точки.
+
+    Кадр-изображение кладется в почтовый ящик сессии (ответ отправит задача
+    анализа), для точек ответ возвращается сразу.
+    """
+    if not session.admit_frame():
+        return _reject_frame(session)
+    packed = payload.get("landmarks")
+    if packed is None:
+        metrics.IMAGE_FRAMES_RECEIVED.inc()
+        seq, client_ts = _frame_meta(payload)
+        process = functools.partial(
+            _run_inference, session, executor, session.analyzer.process_frame, payload
+        )
+        mailbox.put(PendingFrame(process, seq=seq, client_ts=client_ts))
+        return None
+    metrics.LANDMARK_FRAMES_RECEIVED.inc()
+    if not isinstance(packed, str):
+        return ServerMessage(
+            type="ERROR", payload={"message": "Landmarks must be a base64 string."}
+        )
+    try:
+        buffer = binascii.a2b_base64(packed, strict_mode=True)
+    except ValueError:
+        return ServerMessage(
+            type="ERROR", payload={"message": "Landmarks decode error."}
+        )
+    return await _process_landmarks(session, buffer)
+
+
+async def _handle_binary(
+    session: AnalysisSession,
+    executor: InferenceExecutor,
+    mailbox: FrameMailbox,
+    data: bytes,
+) -> ServerMessage | None:
+    """Обрабатывает бинарное сообщение с кадром или ключевыми точками."""
+    if session.options.frame_format != "binary":
+        return ServerMessage(
+            type="ERROR",
+            payload={"message": "Binary frames were not negotiated."},
+        )
+    if not session.admit_frame():
+        return _reject_frame(session)
+    try:
+        frame = parse_binary_frame(data)
+    except BinaryFrameError as e:
+        return ServerMessage(type="ERROR", payload={"message": str(e)})
+    if frame.kind is MessageKind.LANDMARKS:
+        metrics.LANDMARK_FRAMES_RECEIVED.inc()
+        return await _process_landmarks(session, frame.payload)
+    metrics.IMAGE_FRAMES_RECEIVED.inc()
+    process = functools.partial(
+        _run_inference,
+        session,
+        executor,
+        session.analyzer.process_image,
+        frame.payload,
+        frame.timestamp_ms,
+    )
+    mailbox.put(PendingFrame(process, seq=frame.seq, client_ts=frame.timestamp_ms))
+    return None
+
+
+async def _send_message(websocket: WebSocket, message: ServerMessage) -> None:
+    """
+    Сериализует сообщение (как `send_json`) и отправляет клиенту.
+
+    Сериализация выполняется здесь, а не внутри `send_json`, чтобы ее
+    длительность попала в метрики стадий кадра.
+    """
+    started = time.perf_counter()
+    text = json.dumps(message.model_dump(), separators=(",", ":"), ensure_ascii=False)
+    metrics.SERIALIZATION_SECONDS.observe(time.perf_counter() - started)
+    await websocket.send_text(text)
+    if message.type == "FEEDBACK":
+        metrics.FRAMES_ANSWERED.inc()
+
+
+async def _send(websocket: WebSocket, message: ServerMessage | None) -> None:
+    """Отправляет сообщение клиенту, если оно есть."""
+    if message is not None:
+        await _send_message(websocket, message)
+
+
+async def _analysis_worker(
+    websocket: WebSocket,
+    session: AnalysisSession,
+    executor: InferenceExecutor,
+    mailbox: FrameMailbox,
+) -> None:
+    """
+    Задача анализа сессии: обрабатывает самый свежий кадр из ящика и
+    отправляет результат.
+
+    Если клиент прислал порядковый номер кадра, в ответ добавляются данные
+    для самостоятельного регулирования частоты кадров: номер и метка
+    времени обработанного кадра, задержка на сервере и число отброшенных
+    кадров. Если клиент включил rate_control, после ответа при изменении
+    отправляется подсказка RATE_CONTROL.
+    """
+    while (frame := await mailbox.get()) is not None:
+        try:
+            async with session.lock:
+                response_msg = await frame.process()
+        except Exception as e:
+            logger.error(
+                f"Произошла ошибка при обработке кадра: {e}",
+                extra={"session": session.id},
+            )
+            await websocket.close(code=1011)
+            return
+        latency_s = time.monotonic() - frame.received_at
+        if frame.seq is not None:
+            response_msg.payload.update(
+                seq=frame.seq,
+                client_ts=frame.client_ts,
+                lag_ms=round(latency_s * 1000, 1),
+                dropped=mailbox.dropped,
+            )
+        await _send_message(websocket, response_msg)
+        _frame_answered(websocket, session, latency_s, response_msg)
+        await session.checkpoint()
+        await _send(websocket, session.rate_hint(executor.load))
+
+
+async def _send_frame_response(
+    websocket: WebSocket,
+    session: AnalysisSession,
+    message: ServerMessage | None,
+    received_at: float,
+) -> None:
+    """
+    Отправляет ответ, полученный сразу при приеме кадра (точки или
+    ошибка), и учитывает его в логе сессии.
+    """
+    if message is not None:
+        await _send_message(websocket, message)
+        _frame_answered(websocket, session, time.monotonic() - received_at, message)
+        await session.checkpoint()
+
+
+async def _receive(websocket: WebSocket, idle_timeout: float) -> Mapping[str, Any]:
+    """
+    Ждет следующее сообщение клиента.
+
+    Raises:
+        WebSocketDisconnect: Если клиент закрыл соединение.
+        SessionIdleError: Если сообщений не было дольше idle_timeout секунд.
+    """
+    try:
+        message = await asyncio.wait_for(websocket.receive(), idle_timeout)
+    except TimeoutError:
+        raise SessionIdleError from None
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    return message
+
+
+def _message_size(message: Mapping[str, Any]) -> int:
+    """Размер сообщения WebSocket в байтах (текст - в UTF-8)."""
+    data = message.get("bytes")
+    if data is not None:
+        return len(data)
+    text = message.get("text") or ""
+    # Кадр в base64 - ASCII: число символов равно числу байтов, и
+    # кодировать мегабайтный текст ради длины не нужно.
+    return len(text) if text.isascii() else len(text.encode())
+
+
+def _frame_answered(
+    websocket: WebSocket,
+    session: AnalysisSession,
+    latency_s: float,
+    message: ServerMessage,
+) -> None:
+    """
+    Учитывает ответ на кадр в логе сессии и, если это FEEDBACK, в окне
+    задержек узла для /ready.
+    """
+    session.log.frame_answered(latency_s, message)
+    if message.type == "FEEDBACK":
+        websocket.app.state.frame_latency.record(latency_s)
+
+
+async def _close_by_policy(
+    websocket: WebSocket,
+    session: AnalysisSession,
+    error: SessionIdleError | FrameFloodError,
+) -> None:
+    """Закрывает сессию по простою или за кадры сверх лимита частоты."""
+    if isinstance(error, SessionIdleError):
+        metrics.IDLE_SESSIONS_CLOSED.inc()
+        logger.info("Сессия закрыта по простою.", extra={"session": session.id})
+        await websocket.close(CLOSE_IDLE, "Session idle timeout.")
+        return
+    metrics.FLOOD_SESSIONS_CLOSED.inc()
+    logger.warning(
+        "Соединение закрыто: кадры сверх лимита частоты.",
+        extra={"session": session.id},
+    )
+    await websocket.close(CLOSE_POLICY, "Frame rate limit exceeded.")
+
+
+async def _run_session(
+    websocket: WebSocket,
+    session: AnalysisSession,
+    executor: InferenceExecutor,
+    mailbox: FrameMailbox,
+) -> None:
+    """
+    Цикл приема сообщений одной WebSocket-сессии.
+
+    Прием и анализ разделены: этот цикл продолжает читать сообщения, пока
+    задача анализа обрабатывает кадр, поэтому устаревшие кадры отбрасываются,
+    а не копятся в очереди.
+    """
+    analyzer = session.analyzer
+    settings = websocket.app.state.settings
+    worker = asyncio.create_task(
+        _analysis_worker(websocket, session, executor, mailbox)
+    )
     try:
         while True:
-            data = await websocket.receive_json()
+            message = await _receive(websocket, settings.session_idle_timeout_s)
+            received_at = time.monotonic()
+            # Размер проверяется до разбора JSON и декодирования base64.
+            if _message_size(message) > settings.max_frame_bytes:
+                metrics.TOO_LARGE_FRAMES_DROPPED.inc()
+                too_large = {"message": "Message is too large."}
+                await _send_message(
+                    websocket, ServerMessage(type="ERROR", payload=too_large)
+                )
+                continue
+
+            # Бинарные сообщения несут только кадры, управляющие
+            # сообщения всегда передаются в JSON.
+            if message.get("bytes") is not None:
+                session.log.frame_received()
+                response_msg = await _handle_binary(
+                    session, executor, mailbox, message["bytes"]
+                )
+                await _send_frame_response(
+                    websocket, session, response_msg, received_at
+                )
+                continue
+
             try:
-                client_msg = ClientMessage.model_validate(data)
-                logger.info(f"Получено валидное сообщение: {client_msg.type}")
+                client_msg = parse_client_message(message["text"])
 
                 if client_msg.type == "POSE_DATA":
-                    response_msg = analyzer.process_frame(client_msg.payload)
+                    session.log.frame_received()
+                    response_msg = await _handle_pose_data(
+                        session, executor, mailbox, client_msg.payload
+                    )
+                    await _send_frame_response(
+                        websocket, session, response_msg, received_at
+                    )
                 elif client_msg.type == "END_SESSION":
                     logger.info(
-                        "Получен запрос на завершение сессии. Генерация отчета."
+                        "Получен запрос на завершение сессии. Генерация отчета.",
+                        extra={"session": session.id},
                     )
+                    # Дожидаемся анализа кадра, который уже обрабатывается.
+                    mailbox.close()
+                    await worker
                     response_msg = analyzer.generate_report()
-                    await websocket.send_json(response_msg.model_dump())
+                    await _send_message(websocket, response_msg)
+                    await session.discard_snapshot()
                     break  # Выходим из цикла и закрываем соединение
                 else:
-                    response_payload = {
-                        "status": "processed",
-                        "original_type": client_msg.type,
-                    }
-                    response_msg = ServerMessage(type="INFO", payload=response_payload)
-
-                await websocket.send_json(response_msg.model_dump())
+                    response_msg = await _handle_control(session, client_msg)
+                    await _send_message(websocket, response_msg)
 
             except ValidationError as e:
-                logger.warning(f"Ошибка валидации данных от клиента: {e.errors()}")
+                logger.warning(
+                    f"Ошибка валидации данных от клиента: {e.errors()}",
+                    extra={"session": session.id},
+                )
                 error_payload = {"errors": e.errors()}
                 error_msg = ServerMessage(type="ERROR", payload=error_payload)
-                await websocket.send_json(error_msg.model_dump())
+                await _send_message(websocket, error_msg)
 
     except WebSocketDisconnect:
-        logger.info("WebSocket-соединение разорвано клиентом.")
+        logger.info(
+            "WebSocket-соединение разорвано клиентом.", extra={"session": session.id}
+        )
+    except (SessionIdleError, FrameFloodError) as e:
+        await _close_by_policy(websocket, session, e)
     except Exception as e:
-        logger.error(f"Произошла неперехваченная ошибка в WebSocket: {e}")
+        logger.error(
+            f"Произошла неперехваченная ошибка в WebSocket: {e}",
+            extra={"session": session.id},
+        )
         await websocket.close(code=1011)
+    finally:
+        # Кадр, который уже обрабатывается, использует экземпляр модели
+        # сессии, поэтому дожидаемся его перед возвратом экземпляра в пул.
+        mailbox.close()
+        await asyncio.gather(worker, return_exceptions=True)
@@ -0,0 +1,371 @@
+"""
+Метрики сервиса в формате Prometheus.
+
+Счетчики, измерители и гистограммы хранятся в памяти процесса и
+отдаются эндпоинтом /metrics в текстовом формате Prometheus (0.0.4).
+Реализация минимальная и без внешних зависимостей. На горячем пути
+(каждый кадр) обновление счетчика - сложение в ячейке текущего потока
+без блокировки, гистограммы - еще двоичный поиск корзины.
+Дочерние метрики с метками создаются заранее (например,
+`DECODE_SECONDS`), чтобы на кадре не искать их по словарю.
+
+Накладные расходы на кадр замеряются тестом `test_metrics.py` и стадией
+`metrics` бенчмарка `benchmarks.bench_pipeline`.
+"""
+
+import bisect
+import math
+import threading
+import weakref
+from abc import ABC, abstractmethod
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+# Границы корзин гистограмм длительности стадий кадра, в секундах.
+STAGE_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name,
+            value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n"),
+        )
+        for name, value in zip(names, values, strict=True)
+    )
+    return "{" + pairs + "}"
+
+
+class _Sharded:
+    """
+    Значения, разбитые по потокам: каждый поток пишет только в свою ячейку,
+    поэтому обновление не требует блокировки, а значения не теряются при
+    одновременной записи из event loop и потоков инференса. При чтении
+    ячейки всех потоков суммируются.
+
+    Ячейка завершившегося потока (потоки anyio, пулы офлайн-анализа живут
+    недолго) вливается в общую ячейку `_base`, чтобы число ячеек и
+    стоимость чтения не росли с каждым новым потоком.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._local = threading.local()
+        self._base = [0.0] * size
+        self._shards: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def _new_shard(self) -> List[float]:
+        """Ячейка текущего потока; создается при первой записи из потока."""
+        shard = self._local.shard = [0.0] * self._size
+        with self._lock:
+            self._shards.append(shard)
+        # Объект потока освобождается после его завершения: в ячейку
+        # больше никто не пишет.
+        finalizer = weakref.finalize(threading.current_thread(), self._retire, shard)
+        finalizer.atexit = False
+        return shard
+
+    def _retire(self, shard: List[float]) -> None:
+        with self._lock:
+            self._shards = [other for other in self._shards if other is not shard]
+            self._base = [
+                base + value for base, value in zip(self._base, shard, strict=True)
+            ]
+
+    def _totals(self) -> List[float]:
+        with self._lock:
+            shards = [self._base, *self._shards]
+        return [sum(column) for column in zip(*shards, strict=True)]
+
+
+class CounterChild(_Sharded):
+    """Монотонно растущее значение."""
+
+    def __init__(self) -> None:
+        super().__init__(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        try:
+            shard: List[float] = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._totals()[0]
+
+    def samples(self, name: str, labels: str) -> Iterator[str]:
+        yield f"{name}{labels} {_format_value(self.value)}"
+
+
+class GaugeChild:
+    """Текущее значение: задается явно или вычисляется при чтении."""
+
+    def __init__(self) -> None:
+        self._value = 0.0
+        self._function: Callable[[], float] | None = None
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Значение будет вычисляться при каждом чтении /metrics."""
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        return self._function() if self._function is not None else self._value
+
+    def samples(self, name: str, labels: str) -> Iterator[str]:
+        yield f"{name}{labels} {_format_value(self.value)}"
+
+
+class HistogramChild(_Sharded):
+    """Распределение наблюдений по корзинам, сумма и количество."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self._bounds = tuple(buckets)
+        # Ячейки: число наблюдений в каждой корзине (последняя - больше всех
+        # границ, +Inf), затем сумма наблюдений.
+        super().__init__(len(self._bounds) + 2)
+
+    def observe(self, value: float) -> None:
+        try:
+            shard: List[float] = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[bisect.bisect_left(self._bounds, value)] += 1
+        shard[-1] += value
+
+    @property
+    def count(self) -> int:
+        return int(sum(self._totals()[:-1]))
+
+    def samples(self, name: str, labels: str) -> Iterator[str]:
+        *counts, total = self._totals()
+        # Метка le добавляется к остальным меткам.
+        prefix = labels[:-1] + "," if labels else "{"
+        cumulative = 0
+        for bound, count in zip((*self._bounds, math.inf), counts, strict=True):
+            cumulative += int(count)
+            yield f'{name}_bucket{prefix}le="{_format_value(bound)}"}} {cumulative}'
+        yield f"{name}_sum{labels} {_format_value(total)}"
+        yield f"{name}_count{labels} {cumulative}"
+
+
+ChildT = TypeVar("ChildT", CounterChild, GaugeChild, HistogramChild)
+
+
+class _Family(ABC, Generic[ChildT]):
+    """Метрика с набором меток; дочерние метрики - по значениям меток."""
+
+    type_name = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: "Registry | None" = None,
+    ) -> None:
+        self.name: str = name
+        self.documentation: str = documentation
+        self.labelnames: Tuple[str, ...] = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], ChildT] = {}
+        self._lock: threading.Lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    @abstractmethod
+    def _new_child(self) -> ChildT:
+        """Создает дочернюю метрику для нового набора значений меток."""
+
+    def labels(self, *values: str) -> ChildT:
+        """Дочерняя метрика для значений меток (в порядке labelnames)."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}.")
+        with self._lock:
+            child = self._children.get(values)
+            if child is None:
+                child = self._children[values] = self._new_child()
+            return child
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type_name}"
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            yield from child.samples(self.name, _format_labels(self.labelnames, values))
+
+
+class Counter(_Family[CounterChild]):
+    type_name = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+
+class Gauge(_Family[GaugeChild]):
+    type_name = "gauge"
+
+    def _new_child(self) -> GaugeChild:
+        return GaugeChild()
+
+
+class Histogram(_Family[HistogramChild]):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: "Registry | None" = None,
+        buckets: Sequence[float] = STAGE_BUCKETS,
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.buckets)
+
+
+class Registry:
+    """Набор метрик, отдаваемых одним эндпоинтом."""
+
+    def __init__(self) -> None:
+        self._families: List[_Family[Any]] = []
+
+    def register(self, family: _Family[Any]) -> None:
+        self._families.append(family)
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus."""
+        lines = [line for family in self._families for line in family.render()]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# --- Метрики сервиса ---
+
+STAGE_SECONDS = Histogram(
+    "kineticoach_frame_stage_seconds",
+    "Длительность стадий обработки кадра.",
+    ["stage"],
+)
+DECODE_SECONDS = STAGE_SECONDS.labels("decode")
+INFERENCE_SECONDS = STAGE_SECONDS.labels("inference")
+ANALYSIS_SECONDS = STAGE_SECONDS.labels("analysis")
+SERIALIZATION_SECONDS = STAGE_SECONDS.labels("serialization")
+
+SESSIONS_ACTIVE = Gauge(
+    "kineticoach_sessions_active", "Открытые WebSocket-сессии."
+).labels()
+SESSIONS_TOTAL = Counter(
+    "kineticoach_sessions_total", "WebSocket-сессии с момента запуска."
+).labels()
+SESSIONS_RESUMED = Counter(
+    "kineticoach_sessions_resumed_total",
+    "Сессии, возобновленные из снимка после переподключения.",
+).labels()
+SESSIONS_CLOSED = Counter(
+    "kineticoach_sessions_closed_by_server_total",
+    "Сессии, закрытые сервером: предел сессий узла (rejected), простой (idle),"
+    " кадры сверх лимита частоты (flood).",
+    ["reason"],
+)
+REJECTED_SESSIONS = SESSIONS_CLOSED.labels("rejected")
+IDLE_SESSIONS_CLOSED = SESSIONS_CLOSED.labels("idle")
+FLOOD_SESSIONS_CLOSED = SESSIONS_CLOSED.labels("flood")
+
+FRAMES_RECEIVED = Counter(
+    "kineticoach_frames_received_total",
+    "Полученные кадры: изображения и ключевые точки.",
+    ["kind"],
+)
+IMAGE_FRAMES_RECEIVED = FRAMES_RECEIVED.labels("image")
+LANDMARK_FRAMES_RECEIVED = FRAMES_RECEIVED.labels("landmarks")
+FRAMES_ANSWERED = Counter(
+    "kineticoach_frames_answered_total", "Отправленные ответы FEEDBACK."
+).labels()
+FRAMES_DROPPED = Counter(
+    "kineticoach_frames_dropped_total",
+    "Кадры без ответа: вытеснены более свежим (stale), очередь инференса "
+    "заполнена (busy), нет свободного экземпляра модели (no_landmarker), "
+    "превышен лимит частоты (rate_limited) или размера (too_large).",
+    ["reason"],
+)
+STALE_FRAMES_DROPPED = FRAMES_DROPPED.labels("stale")
+BUSY_FRAMES_DROPPED = FRAMES_DROPPED.labels("busy")
+NO_LANDMARKER_FRAMES_DROPPED = FRAMES_DROPPED.labels("no_landmarker")
+RATE_LIMITED_FRAMES_DROPPED = FRAMES_DROPPED.labels("rate_limited")
+TOO_LARGE_FRAMES_DROPPED = FRAMES_DROPPED.labels("too_large")
+INFERENCE_SKIPPED = Counter(
+    "kineticoach_inference_skipped_total",
+    "Кадры без инференса: почти не отличаются от предыдущего.",
+).labels()
+
+LANDMARKER_POOL_SIZE = Gauge(
+    "kineticoach_landmarker_pool_size",
+    "Созданные экземпляры PoseLandmarker.",
+    ["running_mode"],
+)
+LANDMARKER_POOL_IN_USE = Gauge(
+    "kineticoach_landmarker_pool_in_use",
+    "Экземпляры PoseLandmarker, выданные сессиям.",
+    ["running_mode"],
+)
+LANDMARKER_POOL_MAX = Gauge(
+    "kineticoach_landmarker_pool_max_size",
+    "Максимальное число экземпляров PoseLandmarker.",
+    ["running_mode"],
+)
+INFERENCE_IN_FLIGHT = Gauge(
+    "kineticoach_inference_in_flight", "Кадры, обрабатываемые исполнителем."
+).labels()
+INFERENCE_QUEUE_DEPTH = Gauge(
+    "kineticoach_inference_queue_depth", "Кадры, ожидающие исполнителя."
+).labels()
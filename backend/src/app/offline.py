@@ -0,0 +1,294 @@
+"""
+Офлайн-анализ записанного видео.
+
+Видео обрабатывается конвейером из трех стадий, работающих одновременно:
+1. декодирование: отдельный поток читает кадры OpenCV в ограниченную очередь;
+2. инференс: пул воркеров, у каждого собственный PoseProcessor;
+3. анализ: конечный автомат PoseAnalyzer в вызывающем потоке, кадры
+   поступают в исходном порядке.
+
+Результат - поток событий: INFO с параметрами видео, REP на каждое
+завершенное повторение и итоговый REPORT (как `generate_report`).
+События сериализуются в NDJSON или Server-Sent Events.
+
+Запуск из командной строки (из директории backend/):
+    PYTHONPATH=src python -m app.offline squats.mp4 --workers 4
+"""
+
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    Literal,
+    Tuple,
+    cast,
+)
+
+from app.analysis.pose_analyzer import Landmarks, PoseAnalyzer
+from app.analysis.pose_processor import NDArrayU8, PoseProcessor, RunningMode
+
+if TYPE_CHECKING:
+    import cv2
+
+Event = Dict[str, Any]
+EventFormat = Literal["ndjson", "sse"]
+ProcessorFactory = Callable[[RunningMode], PoseProcessor]
+ProcessorClose = Callable[[PoseProcessor], None]
+
+# Сколько декодированных кадров на воркер может ждать инференса.
+FRAMES_PER_WORKER = 4
+
+
+class VideoOpenError(ValueError):
+    """Файл не удалось открыть как видео."""
+
+
+class _Decoder(threading.Thread):
+    """Стадия декодирования: читает кадры в ограниченную очередь."""
+
+    def __init__(self, capture: "cv2.VideoCapture", stride: int, maxsize: int) -> None:
+        super().__init__(name="offline-decode", daemon=True)
+        self.capture = capture
+        self.stride = stride
+        self.frames: queue.Queue[Tuple[int, NDArrayU8] | None] = queue.Queue(maxsize)
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        index = 0
+        try:
+            while not self.stopped.is_set():
+                # grab() без retrieve() пропускает кадр без декодирования.
+                if not self.capture.grab():
+                    break
+                if index % self.stride == 0:
+                    ok, frame = self.capture.retrieve()
+                    if not ok:
+                        break
+                    self._put((index, cast(NDArrayU8, frame)))
+                index += 1
+        finally:
+            self._put(None)
+
+    def _put(self, item: Tuple[int, NDArrayU8] | None) -> None:
+        while not self.stopped.is_set():
+            try:
+                self.frames.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+
+class _Processors:
+    """Стадия инференса: по одному PoseProcessor на поток пула."""
+
+    def __init__(
+        self,
+        factory: ProcessorFactory,
+        running_mode: RunningMode,
+        close: ProcessorClose,
+    ) -> None:
+        self._factory = factory
+        self._close = close
+        self._running_mode = running_mode
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._created: List[PoseProcessor] = []
+
+    def detect(self, frame: NDArrayU8, timestamp_ms: int) -> Landmarks | None:
+        processor = getattr(self._local, "processor", None)
+        if processor is None:
+            processor = self._factory(self._running_mode)
+            self._local.processor = processor
+            with self._lock:
+                self._created.append(processor)
+        return processor.get_landmarks(frame, timestamp_ms)
+
+    def close(self) -> None:
+        with self._lock:
+            for processor in self._created:
+                self._close(processor)
+            self._created.clear()
+
+
+def analyze_video(
+    path: str,
+    *,
+    running_mode: RunningMode = "IMAGE",
+    workers: int = 4,
+    stride: int = 1,
+    processor_factory: ProcessorFactory = PoseProcessor,
+    processor_close: ProcessorClose = PoseProcessor.close,
+) -> Generator[Event, None, None]:
+    """
+    Открывает видео и возвращает поток событий анализа.
+
+    Файл открывается сразу, а не при первой итерации, чтобы ошибку можно
+    было вернуть до начала потоковой передачи.
+
+    Args:
+        path: Путь к видеофайлу.
+        running_mode: Режим детектора. В режиме VIDEO поза отслеживается
+            между кадрами, поэтому инференс выполняет один воркер.
+        workers: Число воркеров инференса (режим IMAGE).
+        stride: Анализировать каждый stride-й кадр.
+        processor_factory: Создает PoseProcessor для воркера.
+        processor_close: Освобождает PoseProcessor воркера по окончании
+            (например, возвращает его в пул сервера).
+
+    Raises:
+        VideoOpenError: Если файл не является видео.
+    """
+    import cv2
+
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        capture.release()
+        raise VideoOpenError("Failed to open video.")
+    if running_mode == "VIDEO":
+        workers = 1
+    return _run_pipeline(
+        capture,
+        running_mode,
+        workers,
+        stride,
+        _Processors(processor_factory, running_mode, processor_close),
+    )
+
+
+def _run_pipeline(
+    capture: "cv2.VideoCapture",
+    running_mode: RunningMode,
+    workers: int,
+    stride: int,
+    processors: _Processors,
+) -> Generator[Event, None, None]:
+    import cv2
+
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    yield {
+        "type": "INFO",
+        "payload": {
+            "fps": fps,
+            "frames": int(capture.get(cv2.CAP_PROP_FRAME_COUNT)),
+            "width": int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "running_mode": running_mode,
+            "workers": workers,
+            "stride": stride,
+        },
+    }
+
+    started = time.perf_counter()
+    analyzer = PoseAnalyzer(load_model=False)
+    decoder = _Decoder(capture, stride, maxsize=workers * FRAMES_PER_WORKER)
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="offline")
+    in_flight: Deque[Tuple[int, Future[Landmarks | None]]] = deque()
+    last_index = -1
+    decoder.start()
+    try:
+        while True:
+            item = decoder.frames.get()
+            if item is None:
+                break
+            index, frame = item
+            timestamp_ms = int(index * 1000 / fps)
+            in_flight.append(
+                (index, pool.submit(processors.detect, frame, timestamp_ms))
+            )
+            # Окно кадров в обработке ограничено, результаты берутся по порядку.
+            if len(in_flight) > workers * FRAMES_PER_WORKER:
+                yield from _analyze(analyzer, *in_flight.popleft(), fps)
+        while in_flight:
+            index, future = in_flight.popleft()
+            last_index = index
+            yield from _analyze(analyzer, index, future, fps)
+        report = analyzer.generate_report().model_dump()
+        elapsed = time.perf_counter() - started
+        video_s = (last_index + 1) / fps
+        report["payload"].update(
+            {
+                "video_s": round(video_s, 3),
+                "elapsed_s": round(elapsed, 3),
+                "speed": round(video_s / elapsed, 2) if elapsed > 0 else None,
+            }
+        )
+        yield report
+    finally:
+        decoder.stop()
+        pool.shutdown(wait=True, cancel_futures=True)
+        decoder.join()
+        processors.close()
+        capture.release()
+
+
+def _analyze(
+    analyzer: PoseAnalyzer,
+    index: int,
+    future: "Future[Landmarks | None]",
+    fps: float,
+) -> Iterator[Event]:
+    """Стадия анализа: прогоняет точки через конечный автомат."""
+    reps_before = analyzer.rep_counter
+    message = analyzer.process_detected(future.result())
+    if analyzer.rep_counter > reps_before:
+        yield {
+            "type": "REP",
+            "payload": {
+                "rep": analyzer.rep_counter,
+                "frame": index,
+                "time_s": round(index / fps, 3),
+                "feedback": message.payload["feedback"],
+                "min_knee_angle": round(analyzer.min_knee_angle, 1),
+            },
+        }
+
+
+def format_event(event: Event, event_format: EventFormat) -> str:
+    """Сериализует событие в строку NDJSON или Server-Sent Events."""
+    data = json.dumps(event["payload"] if event_format == "sse" else event)
+    if event_format == "sse":
+        return f"event: {event['type']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Офлайн-анализ видео с приседаниями")
+    parser.add_argument("video", help="Путь к видеофайлу")
+    parser.add_argument("--format", choices=["ndjson", "sse"], default="ndjson")
+    parser.add_argument("--running-mode", choices=["IMAGE", "VIDEO"], default="IMAGE")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--stride", type=int, default=1)
+    args = parser.parse_args()
+
+    try:
+        events = analyze_video(
+            args.video,
+            running_mode=args.running_mode,
+            workers=args.workers,
+            stride=args.stride,
+        )
+    except VideoOpenError as e:
+        raise SystemExit(f"{args.video}: {e}") from e
+    for event in events:
+        sys.stdout.write(format_event(event, args.format))
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Бинарный протокол WebSocket для передачи кадров.
+
+Бинарное сообщение состоит из заголовка фиксированной длины и полезной
+нагрузки:
+
+    смещение  размер  поле
+    0         1       тип сообщения (MessageKind)
+    1         3       зарезервировано (нули)
+    4         4       порядковый номер кадра (uint32)
+    8         8       метка времени клиента в миллисекундах (uint64)
+    16        ...     полезная нагрузка
+
+Все числа в little-endian. Для кадра (IMAGE) полезная нагрузка -
+байты JPEG или WebP без base64, которые передаются в декодер без
+копирования. Для LANDMARKS полезная нагрузка - упакованный массив
+ключевых точек (см. `unpack_landmarks`).
+"""
+
+import struct
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import TypeAlias
+
+import numpy as np
+from numpy.typing import NDArray
+
+NDArrayF32: TypeAlias = NDArray[np.float32]
+
+
+class MessageKind(IntEnum):
+    """Типы бинарных сообщений клиента."""
+
+    # Сжатое изображение (JPEG/WebP).
+    IMAGE = 1
+    # Ключевые точки, рассчитанные на клиенте.
+    LANDMARKS = 2
+
+
+HEADER = struct.Struct("<B3xIQ")
+HEADER_SIZE = HEADER.size
+
+
+# Упакованные ключевые точки: 33 точки модели MediaPipe Pose,
+# для каждой (x, y, z, visibility) во float32 little-endian.
+NUM_LANDMARKS = 33
+LANDMARK_FIELDS = 4
+LANDMARKS_DTYPE = np.dtype("<f4")
+LANDMARKS_NBYTES = NUM_LANDMARKS * LANDMARK_FIELDS * LANDMARKS_DTYPE.itemsize
+
+# Квантованные точки (в ответах сервера): int16 little-endian,
+# значение = round(координата * LANDMARKS_QUANT_SCALE). Шаг 1e-4,
+# диапазон +-3.27 покрывает точки, вышедшие за край кадра.
+LANDMARKS_QUANT_DTYPE = np.dtype("<i2")
+LANDMARKS_QUANT_SCALE = 10_000.0
+
+
+class BinaryFrameError(ValueError):
+    """Бинарное сообщение не соответствует протоколу."""
+
+
+class LandmarksFormatError(BinaryFrameError):
+    """Упакованные ключевые точки имеют неверный формат."""
+
+
+@dataclass(frozen=True, slots=True)
+class BinaryFrame:
+    """Разобранное бинарное сообщение клиента."""
+
+    kind: MessageKind
+    seq: int
+    timestamp_ms: int
+    # Представление полезной нагрузки поверх исходного буфера (без копии).
+    payload: memoryview
+
+
+def parse_binary_frame(data: bytes) -> BinaryFrame:
+    """
+    Разбирает заголовок бинарного сообщения.
+
+    Raises:
+        BinaryFrameError: Если сообщение короче заголовка, имеет неизвестный
+            тип или пустую полезную нагрузку.
+    """
+    if len(data) <= HEADER_SIZE:
+        raise BinaryFrameError("Binary message is too short.")
+    kind, seq, timestamp_ms = HEADER.unpack_from(data)
+    try:
+        message_kind = MessageKind(kind)
+    except ValueError as e:
+        raise BinaryFrameError(f"Unknown binary message kind: {kind}.") from e
+    return BinaryFrame(
+        kind=message_kind,
+        seq=seq,
+        timestamp_ms=timestamp_ms,
+        payload=memoryview(data)[HEADER_SIZE:],
+    )
+
+
+def pack_binary_frame(
+    kind: MessageKind, seq: int, timestamp_ms: int, payload: bytes
+) -> bytes:
+    """Собирает бинарное сообщение (используется клиентами и тестами)."""
+    return HEADER.pack(kind, seq, timestamp_ms) + payload
+
+
+def unpack_landmarks(buffer: bytes | memoryview) -> NDArrayF32:
+    """
+    Превращает упакованные ключевые точки в массив формы (33, 4) без копии.
+
+    Проверка намеренно дешевая: фиксированная длина буфера и конечность
+    всех значений, без построения объекта на каждую точку.
+
+    Raises:
+        LandmarksFormatError: Если длина буфера не равна `LANDMARKS_NBYTES`
+            или среди значений есть NaN/inf.
+    """
+    if len(buffer) != LANDMARKS_NBYTES:
+        raise LandmarksFormatError(
+            f"Packed landmarks must be {LANDMARKS_NBYTES} bytes, got {len(buffer)}."
+        )
+    landmarks = np.frombuffer(buffer, dtype=LANDMARKS_DTYPE).reshape(
+        NUM_LANDMARKS, LANDMARK_FIELDS
+    )
+    if not np.isfinite(landmarks).all():
+        raise LandmarksFormatError("Packed landmarks contain NaN or infinity.")
+    return landmarks
+
+
+def pack_landmarks(landmarks: NDArrayF32) -> bytes:
+    """Упаковывает массив ключевых точек формы (33, 4) в байты."""
+    return np.ascontiguousarray(landmarks, dtype=LANDMARKS_DTYPE).tobytes()
+
+
+def quantize_landmarks(landmarks: NDArrayF32) -> bytes:
+    """Упаковывает массив ключевых точек в int16 с шагом 1/LANDMARKS_QUANT_SCALE."""
+    info = np.iinfo(LANDMARKS_QUANT_DTYPE)
+    scaled = np.rint(landmarks * LANDMARKS_QUANT_SCALE)
+    quantized: NDArray[np.int16] = np.clip(scaled, info.min, info.max).astype(
+        LANDMARKS_QUANT_DTYPE
+    )
+    return quantized.tobytes()
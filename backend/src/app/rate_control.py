@@ -0,0 +1,116 @@
+"""
+Адаптивное управление частотой кадров клиента.
+
+Сервер подсказывает клиенту, сколько кадров в секунду присылать и с каким
+качеством JPEG. Подсказка зависит от фазы приседания, угловой скорости
+колена и загрузки исполнителя инференса: пока пользователь стоит,
+кадры нужны редко, а во время опускания и подъема - с полной частотой.
+"""
+
+from dataclasses import dataclass
+
+from app.analysis import rules
+from app.config import Settings
+
+# Коэффициент сглаживания угловой скорости (экспоненциальное среднее).
+VELOCITY_SMOOTHING = 0.5
+# Запас к порогу перехода: пользователь, согнувший колени сильнее
+# REP_TRANSITION_ANGLE + запас, считается начавшим присед.
+TRANSITION_MARGIN_DEG = 5.0
+# Загрузка исполнителя, начиная с которой частота снижается.
+LOAD_THRESHOLD = 0.5
+
+
+@dataclass(frozen=True, slots=True)
+class RateHint:
+    """Подсказка клиенту: частота кадров и качество JPEG."""
+
+    fps: int
+    jpeg_quality: float
+
+
+class RateController:
+    """Вычисляет подсказку частоты кадров для одной сессии."""
+
+    def __init__(
+        self,
+        active_fps: int,
+        idle_fps: int,
+        min_fps: int,
+        motion_threshold_dps: float,
+        jpeg_quality: float,
+        jpeg_quality_low: float,
+    ) -> None:
+        self.active_fps = active_fps
+        self.idle_fps = idle_fps
+        self.min_fps = min_fps
+        self.motion_threshold_dps = motion_threshold_dps
+        self.jpeg_quality = jpeg_quality
+        self.jpeg_quality_low = jpeg_quality_low
+        self.velocity_dps = 0.0
+        self._last_angle: float | None = None
+        self._last_time: float | None = None
+        self._last_hint: RateHint | None = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "RateController":
+        """Создает контроллер по настройкам приложения."""
+        return cls(
+            active_fps=settings.rate_active_fps,
+            idle_fps=settings.rate_idle_fps,
+            min_fps=settings.rate_min_fps,
+            motion_threshold_dps=settings.rate_motion_threshold_dps,
+            jpeg_quality=settings.rate_jpeg_quality,
+            jpeg_quality_low=settings.rate_jpeg_quality_low,
+        )
+
+    def _update_velocity(self, knee_angle: float | None, now: float) -> None:
+        if knee_angle is None:
+            # Поза не найдена: скорость неизвестна, начинаем заново.
+            self._last_angle = self._last_time = None
+            self.velocity_dps = 0.0
+            return
+        if self._last_angle is not None and self._last_time is not None:
+            elapsed = now - self._last_time
+            if elapsed > 0:
+                velocity = abs(knee_angle - self._last_angle) / elapsed
+                self.velocity_dps += VELOCITY_SMOOTHING * (velocity - self.velocity_dps)
+        self._last_angle, self._last_time = knee_angle, now
+
+    def _is_moving(self, state: str, knee_angle: float | None) -> bool:
+        if state == "DOWN":
+            return True
+        if knee_angle is None:
+            return False
+        bending = knee_angle < rules.REP_TRANSITION_ANGLE + TRANSITION_MARGIN_DEG
+        return bending or self.velocity_dps > self.motion_threshold_dps
+
+    def update(
+        self, state: str, knee_angle: float | None, load: float, now: float
+    ) -> RateHint | None:
+        """
+        Учитывает результат очередного кадра.
+
+        Args:
+            state: Фаза конечного автомата ("UP" или "DOWN").
+            knee_angle: Угол в колене или None, если поза не найдена.
+            load: Загрузка исполнителя инференса от 0 до 1.
+            now: Текущее монотонное время в секундах.
+
+        Returns:
+            Новая подсказка или None, если она не изменилась.
+        """
+        self._update_velocity(knee_angle, now)
+        fps = self.active_fps if self._is_moving(state, knee_angle) else self.idle_fps
+        jpeg_quality = self.jpeg_quality
+        if load > LOAD_THRESHOLD:
+            # При загрузке выше порога частота линейно снижается,
+            # вдвое при полностью заполненной очереди.
+            fps = max(self.min_fps, round(fps * (1.5 - load)))
+            jpeg_quality = self.jpeg_quality_low
+
+        hint = RateHint(fps=fps, jpeg_quality=jpeg_quality)
+        if hint == self._last_hint:
+            return None
+        self._last_hint = hint
+        return hint
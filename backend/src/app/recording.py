@@ -0,0 +1,167 @@
+"""
+Запись ключевых точек сессий на диск в формате, отображаемом в память.
+
+Формат файла `.kcrec` (одна сессия - один файл):
+- заголовок фиксированного размера HEADER_SIZE байт: сигнатура MAGIC и
+  метаданные в JSON (версия, шаг строки, время начала, режим детектора),
+  дополненные пробелами;
+- строки фиксированного шага ROW_SIZE float32 (little-endian), по одной
+  на кадр: время от начала сессии в секундах, признак найденной позы и
+  33 точки x, y, z, visibility. Для кадров без позы точки нулевые.
+
+Число кадров вычисляется по размеру файла, поэтому запись, оборванная
+падением процесса, читается до последней целой строки. Данные читаются
+через `np.memmap` без загрузки файла в память. Воспроизведение записей -
+в модуле `app.replay`.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List
+
+import numpy as np
+from app.encoding import landmarks_to_array
+from app.protocol import LANDMARK_FIELDS, LANDMARKS_DTYPE, NUM_LANDMARKS, NDArrayF32
+from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"KCREC\x00\x01\n"
+FORMAT_VERSION = 1
+HEADER_SIZE = 256
+SUFFIX = ".kcrec"
+# Столбцы перед точками: время от начала сессии и признак найденной позы.
+COLUMNS = ("t_s", "has_pose")
+ROW_SIZE = len(COLUMNS) + NUM_LANDMARKS * LANDMARK_FIELDS
+DTYPE = LANDMARKS_DTYPE
+
+
+class RecordingFormatError(ValueError):
+    """Файл не является записью сессии или записан другой версией формата."""
+
+
+def _encode_header(metadata: Dict[str, Any]) -> bytes:
+    header = {"version": FORMAT_VERSION, "row_size": ROW_SIZE, **metadata}
+    body = json.dumps(header, ensure_ascii=False).encode()
+    free = HEADER_SIZE - len(MAGIC) - len(body) - 1
+    if free < 0:
+        raise ValueError("Recording metadata does not fit into the header.")
+    return MAGIC + body + b" " * free + b"\n"
+
+
+class SessionRecorder:
+    """
+    Пишет ключевые точки одной сессии в файл `.kcrec`.
+
+    Файл создается при первом кадре, поэтому сессии без кадров не оставляют
+    пустых файлов. Метаданные можно дополнять до первого кадра (например,
+    режим детектора из START_SESSION). Запись выполняется в потоке
+    инференса; кадры, пришедшие после `close()`, игнорируются.
+    """
+
+    def __init__(self, directory: Path, metadata: Dict[str, Any] | None = None):
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}{SUFFIX}"
+        self.path = directory / name
+        self.metadata: Dict[str, Any] = dict(metadata or {})
+        self.frames = 0
+        self._file: BinaryIO | None = None
+        self._closed = False
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._row = np.zeros(ROW_SIZE, dtype=DTYPE)
+
+    def write(self, landmarks: List[Any] | None) -> None:
+        """Добавляет кадр: найденные точки или None, если поза не найдена."""
+        row = self._row
+        row[0] = time.monotonic() - self._started
+        row[1] = landmarks is not None
+        if landmarks is None:
+            row[2:] = 0.0
+        else:
+            row[2:] = landmarks_to_array(landmarks).ravel()
+        with self._lock:
+            if self._closed:
+                return
+            if self._file is None:
+                self._file = self._open()
+            self._file.write(row.tobytes())
+            self.frames += 1
+
+    def _open(self) -> BinaryIO:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        file = self.path.open("wb")
+        started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        file.write(_encode_header({"started_at": started_at, **self.metadata}))
+        return file
+
+    def close(self) -> None:
+        """Дописывает буфер и закрывает файл."""
+        with self._lock:
+            self._closed = True
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                logger.info(f"Сессия записана: {self.path} ({self.frames} кадров).")
+
+
+@dataclass
+class Recording:
+    """Запись сессии, отображенная в память."""
+
+    path: Path
+    metadata: Dict[str, Any]
+    # Массив (N, ROW_SIZE) поверх файла (np.memmap).
+    rows: NDArrayF32
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def t_s(self) -> NDArrayF32:
+        """Время кадров от начала сессии, (N,)."""
+        return self.rows[:, 0]
+
+    @property
+    def has_pose(self) -> NDArray[np.bool_]:
+        """Найдена ли поза в кадре, (N,)."""
+        has_pose: NDArray[np.bool_] = self.rows[:, 1] != 0
+        return has_pose
+
+    @property
+    def landmarks(self) -> NDArrayF32:
+        """Ключевые точки, (N, 33, 4)."""
+        return self.rows[:, len(COLUMNS) :].reshape(-1, NUM_LANDMARKS, LANDMARK_FIELDS)
+
+
+def open_recording(path: str | Path) -> Recording:
+    """
+    Открывает запись сессии без чтения кадров в память.
+
+    Raises:
+        RecordingFormatError: Если файл не является записью этого формата.
+    """
+    path = Path(path)
+    with path.open("rb") as file:
+        header = file.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE or not header.startswith(MAGIC):
+        raise RecordingFormatError(f"{path}: not a session recording.")
+    metadata = json.loads(header[len(MAGIC) :])
+    if metadata.get("version") != FORMAT_VERSION or metadata["row_size"] != ROW_SIZE:
+        raise RecordingFormatError(
+            f"{path}: unsupported recording version {metadata.get('version')}."
+        )
+    frames = (path.stat().st_size - HEADER_SIZE) // (ROW_SIZE * DTYPE.itemsize)
+    if frames == 0:
+        # Отобразить в память файл без данных нельзя.
+        rows: NDArrayF32 = np.zeros((0, ROW_SIZE), dtype=DTYPE)
+    else:
+        rows = np.memmap(
+            path, dtype=DTYPE, mode="r", offset=HEADER_SIZE, shape=(frames, ROW_SIZE)
+        )
+    return Recording(path=path, metadata=metadata, rows=rows)
@@ -0,0 +1,95 @@
+"""
+Воспроизведение записанных сессий (см. `app.recording`).
+
+Запись прогоняется либо покадрово через `PoseAnalyzer` - в точности как
+при живой сессии, для воспроизведения ошибок, - либо пакетной
+сегментацией (`segmentation.segment_landmarks`), которая читает из
+отображенного в память файла только нужные столбцы. Второй способ
+подходит для повторного анализа тысяч записей с новыми порогами
+`rules.py`.
+
+Запуск из командной строки (из директории backend/):
+    PYTHONPATH=src python -m app.replay recordings/ --fast
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, List
+
+from app.analysis.pose_analyzer import PoseAnalyzer
+from app.analysis.segmentation import segment_landmarks
+from app.recording import SUFFIX, Recording, RecordingFormatError, open_recording
+from app.schemas import ServerMessage
+
+logger = logging.getLogger(__name__)
+
+
+def replay(recording: Recording, analyzer: PoseAnalyzer | None = None) -> ServerMessage:
+    """
+    Прогоняет запись кадр за кадром через `PoseAnalyzer` и возвращает отчет.
+
+    Повторяет потоковый анализ в точности, включая отладочные данные
+    и сообщения FEEDBACK, поэтому подходит для воспроизведения ошибок.
+    """
+    if analyzer is None:
+        analyzer = PoseAnalyzer(load_model=False)
+    has_pose = recording.has_pose
+    landmarks = recording.landmarks
+    for index in range(len(recording)):
+        if has_pose[index]:
+            analyzer.process_landmarks(landmarks[index])
+        else:
+            analyzer.process_detected(None)
+    return analyzer.generate_report()
+
+
+def replay_fast(recording: Recording) -> ServerMessage:
+    """
+    Пакетный анализ записи векторизованной сегментацией.
+
+    Результат совпадает с `replay`, но без шага на каждый кадр.
+    """
+    return segment_landmarks(recording.landmarks).generate_report()
+
+
+def iter_recordings(paths: List[str]) -> Iterator[Path]:
+    """Файлы записей из списка файлов и директорий."""
+    for item in map(Path, paths):
+        if item.is_dir():
+            yield from sorted(item.rglob(f"*{SUFFIX}"))
+        else:
+            yield item
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Повторный анализ записей сессий")
+    parser.add_argument("paths", nargs="+", help="Файлы .kcrec или директории")
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Пакетная сегментация вместо покадрового PoseAnalyzer",
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    count = 0
+    for path in iter_recordings(args.paths):
+        try:
+            recording = open_recording(path)
+        except (OSError, RecordingFormatError) as e:
+            logger.warning(f"Запись пропущена: {e}")
+            continue
+        report = replay_fast(recording) if args.fast else replay(recording)
+        line = {"file": str(path), "frames": len(recording), **report.payload}
+        sys.stdout.write(json.dumps(line) + "\n")
+        count += 1
+    elapsed = time.perf_counter() - started
+    sys.stderr.write(f"{count} записей за {elapsed:.2f} с\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,20 +4,80 @@ Pydantic-схемы для валидации данных, передаваем
 Определяет структуру сообщений, которыми обмениваются клиент и сервер.
 """
 
-from typing import Any, Dict, Literal
+from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field
+import orjson
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ClientMessage(BaseModel):
     """Схема для сообщений, приходящих от клиента."""
 
-    type: Literal["POSE_DATA", "START_SESSION", "END_SESSION"]
+    type: Literal["POSE_DATA", "START_SESSION", "RESUME_SESSION", "END_SESSION"]
     payload: Dict[str, Any] = Field(default_factory=dict)
 
 
+def parse_client_message(text: str | bytes) -> ClientMessage:
+    """
+    Разбирает текстовое сообщение клиента.
+
+    POSE_DATA приходит на каждый кадр, поэтому для него проверяется только
+    конверт (тип и словарь payload), и payload передается дальше как есть:
+    строка кадра в base64 не проходит через валидацию pydantic. Остальные
+    (управляющие) сообщения валидируются схемой полностью.
+
+    Raises:
+        orjson.JSONDecodeError: Если текст не является JSON.
+        ValidationError: Если сообщение не соответствует схеме.
+    """
+    data = orjson.loads(text)
+    if type(data) is dict and data.get("type") == "POSE_DATA":
+        payload = data.get("payload")
+        if type(payload) is dict:
+            return ClientMessage.model_construct(type="POSE_DATA", payload=payload)
+    return ClientMessage.model_validate(data)
+
+
 class ServerMessage(BaseModel):
     """Схема для сообщений, отправляемых сервером клиенту."""
 
-    type: Literal["FEEDBACK", "REPORT", "ERROR", "INFO"]
+    type: Literal["FEEDBACK", "REPORT", "ERROR", "INFO", "RATE_CONTROL"]
     payload: Dict[str, Any]
+
+
+class SessionOptions(BaseModel):
+    """
+    Параметры сессии, которые клиент может передать в START_SESSION.
+
+    Все поля необязательны: клиенты, не отправляющие START_SESSION,
+    работают с параметрами по умолчанию.
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    # Режим детектора: "VIDEO" включает трекинг позы между кадрами.
+    # None - режим по умолчанию из настроек сервера.
+    running_mode: Optional[Literal["IMAGE", "VIDEO"]] = None
+    # Формат кадров: "binary" разрешает отправку кадров бинарными
+    # сообщениями (см. app.protocol), "json" - только base64 в POSE_DATA.
+    frame_format: Literal["json", "binary"] = "json"
+    # Формат FEEDBACK: "full" - все поля в каждом сообщении, "compact" -
+    # только изменившиеся поля (см. app.encoding).
+    encoding: Literal["full", "compact"] = "full"
+    # Необязательные поля FEEDBACK, которые нужны клиенту (для "compact").
+    subscribe: List[Literal["landmarks", "debug_data"]] = Field(default_factory=list)
+    # Представление точек в "compact": float32 или квантованный int16.
+    landmarks_format: Literal["float32", "int16"] = "float32"
+    # Присылать ли подсказки RATE_CONTROL (частота кадров и качество JPEG).
+    rate_control: bool = False
+
+
+class ResumeRequest(BaseModel):
+    """
+    Запрос RESUME_SESSION: продолжить сессию, прерванную обрывом
+    соединения, по токену из ответа на START_SESSION.
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    resume_token: str = Field(min_length=1, max_length=64)
@@ -0,0 +1,275 @@
+"""
+Содержит класс AnalysisSession, объединяющий состояние одной
+WebSocket-сессии: анализатор позы, согласованные параметры,
+выданный пулом экземпляр модели и снимки для возобновления.
+"""
+
+import asyncio
+import logging
+import secrets
+import time
+import uuid
+from typing import Mapping, Tuple
+
+from app.admission import FrameFloodError, RejectionWindow, TokenBucket
+from app.analysis.motion_gate import MotionGate
+from app.analysis.pose_analyzer import PoseAnalyzer
+from app.analysis.pose_processor import PoseProcessor, RunningMode
+from app.analysis.preprocess import FramePreprocessor
+from app.config import Settings
+from app.encoding import make_encoder
+from app.inference.pool import LandmarkerPool
+from app.logs import SessionLogger
+from app.rate_control import RateController
+from app.recording import SessionRecorder
+from app.schemas import ServerMessage, SessionOptions
+from app.session_store import SessionSnapshot, SessionStore
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisSession:
+    """
+    Состояние одной сессии анализа.
+
+    Экземпляр модели берется из пула выбранного режима только при первом
+    кадре-изображении: сессии, присылающие готовые ключевые точки, модель
+    не занимают. Экземпляр возвращается в пул вызовом `close()`.
+
+    Снимок состояния сохраняется в хранилище под токеном `resume_token`
+    при смене фазы приседания (`checkpoint`) и при закрытии соединения.
+    Сессия сохраняет снимки, пока владеет токеном: после возобновления
+    токена другим соединением ее снимки отклоняются хранилищем.
+
+    Кадр-изображение анализируется в потоке инференса, пока event loop
+    принимает следующие сообщения. Все, что меняет анализатор или
+    экземпляр модели сессии (анализ кадра, точки клиента, START_SESSION,
+    RESUME_SESSION), выполняется под `lock` по очереди.
+    """
+
+    def __init__(
+        self,
+        pools: Mapping[RunningMode, LandmarkerPool],
+        settings: Settings,
+        store: SessionStore,
+    ) -> None:
+        self._pools = pools
+        self._settings = settings
+        self._store = store
+        self.id = uuid.uuid4().hex[:8]
+        # Токен знает только клиент сессии: по нему сессия возобновляется.
+        self.resume_token = secrets.token_urlsafe(16)
+        # Поколение владения токеном (см. SessionStore.save).
+        self._generation = 0
+        # Счетчик и фаза на момент последнего сохраненного снимка.
+        self._saved_phase: Tuple[int, str] | None = None
+        # Клиент завершил сессию (END_SESSION): снимки больше не нужны.
+        self._finished = False
+        self.log = SessionLogger.from_settings(self.id, settings)
+        self.lock = asyncio.Lock()
+        self._processor: PoseProcessor | None = None
+        self.running_mode: RunningMode = settings.default_running_mode
+        self.options = SessionOptions(running_mode=self.running_mode)
+        self.analyzer = PoseAnalyzer(
+            load_model=False,
+            motion_gate=MotionGate(
+                settings.motion_gate_threshold, settings.motion_gate_max_skip
+            ),
+            preprocessor=FramePreprocessor(
+                settings.decode_min_long_side,
+                settings.roi_padding,
+                roi_enabled=settings.roi_crop,
+            ),
+            recorder=(
+                SessionRecorder(
+                    settings.recording_dir, {"running_mode": self.running_mode}
+                )
+                if settings.recording_dir is not None
+                else None
+            ),
+        )
+        self.rate_controller: RateController | None = None
+        self.frame_limiter = TokenBucket.for_frames(settings)
+        self.rejected_frames = RejectionWindow()
+
+    @property
+    def has_processor(self) -> bool:
+        """Выдан ли сессии экземпляр модели."""
+        return self._processor is not None
+
+    async def ensure_processor(self) -> None:
+        """
+        Берет экземпляр модели из пула, если сессия еще его не получила или
+        ее экземпляр перестал работать (завершился процесс-воркер).
+
+        Raises:
+            LandmarkerPoolExhaustedError: Если в пуле нет свободного экземпляра.
+        """
+        if self._processor is not None and not self._processor.alive:
+            self._release()
+        if self._processor is None:
+            self._processor = await self._pools[self.running_mode].acquire()
+            self._processor.reset()
+            self.analyzer.processor = self._processor
+
+    async def configure(self, options: SessionOptions) -> None:
+        """
+        Применяет параметры из START_SESSION.
+
+        При смене режима детектора текущий экземпляр модели возвращается
+        в пул; следующий кадр-изображение получит экземпляр нового режима.
+        """
+        running_mode = options.running_mode or self.running_mode
+        if running_mode != self.running_mode:
+            self._release()
+            self.running_mode = running_mode
+            logger.info(
+                f"Режим детектора сессии изменен на {running_mode}.",
+                extra={"session": self.id},
+            )
+        self.options = options.model_copy(update={"running_mode": running_mode})
+        if self.analyzer.recorder is not None:
+            self.analyzer.recorder.metadata["running_mode"] = running_mode
+        self.analyzer.encoder = make_encoder(self.options)
+        if options.rate_control and self.rate_controller is None:
+            self.rate_controller = RateController.from_settings(self._settings)
+        elif not options.rate_control:
+            self.rate_controller = None
+
+    def admit_frame(self) -> bool:
+        """Укладывается ли очередной кадр в лимит частоты соединения."""
+        return self.frame_limiter is None or self.frame_limiter.take()
+
+    def reject_frame(self) -> bool:
+        """
+        Учитывает кадр, отклоненный лимитом частоты.
+
+        Returns:
+            True, если об отклонении нужно сообщить клиенту (первый кадр окна).
+
+        Raises:
+            FrameFloodError: Если за окно отклонено больше
+                frame_rate_max_rejected кадров.
+        """
+        notify = self.rejected_frames.record()
+        limit = self._settings.frame_rate_max_rejected
+        if limit and self.rejected_frames.count > limit:
+            raise FrameFloodError
+        return notify
+
+    def rate_hint(self, load: float) -> ServerMessage | None:
+        """
+        Обновляет подсказку частоты кадров по результату последнего кадра.
+
+        Args:
+            load: Загрузка исполнителя инференса от 0 до 1.
+
+        Returns:
+            Сообщение RATE_CONTROL, если подсказка изменилась, иначе None.
+        """
+        if self.rate_controller is None:
+            return None
+        hint = self.rate_controller.update(
+            self.analyzer.state,
+            self.analyzer.debug_data.get("knee_angle"),
+            load,
+            time.monotonic(),
+        )
+        if hint is None:
+            return None
+        return ServerMessage(
+            type="RATE_CONTROL",
+            payload={"fps": hint.fps, "jpeg_quality": hint.jpeg_quality},
+        )
+
+    async def resume(self, token: str) -> bool:
+        """
+        Возобновляет сессию из снимка: параметры и состояние конечного
+        автомата. Сессия забирает токен следующим поколением и продолжает
+        сохранять снимки под ним; прежнее соединение больше не может их
+        перезаписать. Снимок, уже сохраненный под прежним токеном этой
+        сессии, удаляется.
+
+        Returns:
+            False, если снимка нет, он устарел, не читается или токен
+            забрало другое соединение.
+        """
+        loaded = await self._store.load(token)
+        if loaded is None:
+            return False
+        data, generation = loaded
+        try:
+            snapshot = SessionSnapshot.loads(data)
+        except ValueError:
+            logger.warning("Снимок сессии не читается.", extra={"session": self.id})
+            return False
+        if not await self._store.claim(token, generation):
+            return False
+        await self._store.delete(self.resume_token, self._generation)
+        self._generation = generation + 1
+        await self.configure(snapshot.options)
+        snapshot.restore(self.analyzer)
+        self.resume_token = token
+        self._saved_phase = (snapshot.rep_counter, snapshot.state)
+        logger.info(
+            "Сессия возобновлена.",
+            extra={"session": self.id, "reps": snapshot.rep_counter},
+        )
+        return True
+
+    async def checkpoint(self, force: bool = False) -> None:
+        """
+        Сохраняет снимок, если с прошлого сохранения сменились фаза или
+        счетчик повторений (или всегда при `force`). Ошибка хранилища не
+        прерывает сессию. Если токен забрало возобновившее сессию
+        соединение, снимки больше не сохраняются.
+        """
+        async with self.lock:
+            phase = (self.analyzer.rep_counter, self.analyzer.state)
+            if self._finished or (phase == self._saved_phase and not force):
+                return
+            snapshot = SessionSnapshot.capture(self.analyzer, self.options)
+        try:
+            saved = await self._store.save(
+                self.resume_token, snapshot.dumps(), self._generation
+            )
+        except Exception:
+            logger.exception(
+                "Не удалось сохранить снимок сессии.", extra={"session": self.id}
+            )
+            return
+        if not saved:
+            logger.info(
+                "Сессия возобновлена другим соединением, снимок не сохранен.",
+                extra={"session": self.id},
+            )
+            self._finished = True
+            return
+        self._saved_phase = phase
+
+    async def discard_snapshot(self) -> None:
+        """Удаляет снимок завершенной сессии: возобновлять ее нечего."""
+        self._finished = True
+        await self._store.delete(self.resume_token, self._generation)
+
+    def _release(self) -> None:
+        if self._processor is not None:
+            self._pools[self.running_mode].release(self._processor)
+            self._processor = None
+            self.analyzer.processor = None
+
+    def close(self, **summary: object) -> None:
+        """
+        Возвращает экземпляр модели в пул, закрывает запись сессии и пишет
+        итоговую запись в лог.
+
+        Args:
+            summary: Дополнительные поля итоговой записи.
+        """
+        self._release()
+        if self.analyzer.recorder is not None:
+            self.analyzer.recorder.close()
+        gate = self.analyzer.motion_gate
+        if gate is not None and gate.frames:
+            summary["inference_skipped"] = gate.skipped
+        self.log.summary(reps=self.analyzer.rep_counter, **summary)
@@ -0,0 +1,216 @@
+"""
+Снимки состояния сессий для возобновления после обрыва соединения.
+
+Снимок (`SessionSnapshot`) - счетчик повторений, фаза приседания,
+минимальный угол в колене текущего повторения, замечания, статистика и
+согласованные параметры сессии; в JSON это несколько сотен байт. Сессия
+сохраняет снимок при смене фазы и при закрытии соединения, а клиент,
+переподключившись, присылает RESUME_SESSION с токеном из ответа на
+START_SESSION и продолжает подход с того же места без повтора кадров.
+
+Хранилище подключаемое (настройка session_store): по умолчанию
+`MemorySessionStore` - LRU с временем жизни в памяти процесса. Чтобы
+сессии возобновлялись на любом узле, достаточно указать путь к своей
+реализации `SessionStore` с общим хранилищем (например, Redis): она
+получает и возвращает уже сериализованные байты.
+
+Рядом со снимком хранилище держит поколение - номер владения токеном.
+Возобновившая сессия забирает токен (`claim`): поколение увеличивается,
+только если его еще никто не увеличил, поэтому из нескольких соединений,
+возобновляющих один токен, сессию получает одно. Снимки соединения, которое
+еще не заметило обрыв (полуоткрытый TCP), больше не перезаписывают ее
+снимок: сохранение со старым поколением отклоняется.
+"""
+
+import importlib
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, List, Literal, Tuple
+
+from app.analysis.pose_analyzer import PoseAnalyzer
+from app.config import Settings
+from app.schemas import SessionOptions
+from pydantic import BaseModel
+
+SNAPSHOT_VERSION = 1
+
+
+class SessionSnapshot(BaseModel):
+    """Сериализуемое состояние сессии анализа."""
+
+    version: int = SNAPSHOT_VERSION
+    rep_counter: int
+    state: Literal["UP", "DOWN"]
+    min_knee_angle: float
+    feedback: List[str]
+    stats: Dict[str, int]
+    options: SessionOptions
+
+    @classmethod
+    def capture(
+        cls, analyzer: PoseAnalyzer, options: SessionOptions
+    ) -> "SessionSnapshot":
+        """Снимок текущего состояния анализатора и параметров сессии."""
+        return cls(
+            rep_counter=analyzer.rep_counter,
+            state=analyzer.state,  # type: ignore[arg-type]
+            min_knee_angle=analyzer.min_knee_angle,
+            feedback=list(analyzer.feedback),
+            stats=dict(analyzer.stats),
+            options=options,
+        )
+
+    def restore(self, analyzer: PoseAnalyzer) -> None:
+        """Переносит состояние конечного автомата в анализатор."""
+        analyzer.rep_counter = self.rep_counter
+        analyzer.state = self.state
+        analyzer.min_knee_angle = self.min_knee_angle
+        analyzer.feedback = list(self.feedback)
+        analyzer.stats.clear()
+        analyzer.stats.update(self.stats)
+
+    def dumps(self) -> bytes:
+        # Версия пишется всегда, в том числе равная значению по умолчанию.
+        return self.model_dump_json().encode()
+
+    @classmethod
+    def loads(cls, data: bytes) -> "SessionSnapshot":
+        """
+        Raises:
+            ValueError: Если данные повреждены, в них нет версии или она
+                отличается от SNAPSHOT_VERSION.
+        """
+        snapshot = cls.model_validate_json(data)
+        if "version" not in snapshot.model_fields_set:
+            raise ValueError("Snapshot has no version.")
+        if snapshot.version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {snapshot.version}.")
+        return snapshot
+
+
+class SessionStore(ABC):
+    """
+    Хранилище снимков сессий по токену возобновления.
+
+    Реализации хранят байты снимка как есть вместе с поколением и сами
+    следят за временем жизни записей. Для подключения через настройку
+    session_store реализация должна иметь метод класса
+    `from_settings(settings)`.
+    """
+
+    @abstractmethod
+    async def save(self, token: str, data: bytes, generation: int) -> bool:
+        """
+        Сохраняет снимок, если `generation` не меньше поколения записи
+        (сравнение и запись должны быть атомарными).
+
+        Returns:
+            False, если запись принадлежит более новому поколению и
+            снимок не сохранен.
+        """
+
+    @abstractmethod
+    async def load(self, token: str) -> Tuple[bytes, int] | None:
+        """
+        Байты снимка и его поколение или None, если снимка нет или он
+        устарел.
+        """
+
+    @abstractmethod
+    async def claim(self, token: str, expected_generation: int) -> bool:
+        """
+        Увеличивает поколение записи на единицу, если оно равно
+        `expected_generation` (атомарное сравнение с записью).
+
+        Returns:
+            False, если записи нет, она устарела или ее поколение уже другое.
+        """
+
+    @abstractmethod
+    async def delete(self, token: str, generation: int) -> None:
+        """Удаляет снимок, если запись не принадлежит более новому поколению."""
+
+    async def close(self) -> None:
+        """Освобождает ресурсы хранилища при остановке приложения."""
+        # По умолчанию освобождать нечего: метод необязателен для реализаций.
+        return None
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Снимки в памяти процесса: не больше `max_entries` записей (вытесняются
+    давно не обновлявшиеся), каждая живет `ttl_s` секунд с последнего
+    сохранения.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_s: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._clock = clock
+        # Токен -> (срок годности, поколение, байты снимка); в конце -
+        # свежие записи.
+        self._entries: OrderedDict[str, Tuple[float, int, bytes]] = OrderedDict()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "MemorySessionStore":
+        return cls(settings.session_store_max_entries, settings.session_store_ttl_s)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _is_stale(self, token: str, generation: int) -> bool:
+        entry = self._entries.get(token)
+        return entry is not None and generation < entry[1]
+
+    async def save(self, token: str, data: bytes, generation: int) -> bool:
+        if self._is_stale(token, generation):
+            return False
+        self._entries[token] = (self._clock() + self.ttl_s, generation, data)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return True
+
+    async def load(self, token: str) -> Tuple[bytes, int] | None:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        expires_at, generation, data = entry
+        if expires_at < self._clock():
+            del self._entries[token]
+            return None
+        return data, generation
+
+    async def claim(self, token: str, expected_generation: int) -> bool:
+        # Без await между проверкой и записью: в event loop это атомарно.
+        entry = self._entries.get(token)
+        if entry is None or entry[0] < self._clock():
+            return False
+        expires_at, generation, data = entry
+        if generation != expected_generation:
+            return False
+        self._entries[token] = (expires_at, generation + 1, data)
+        return True
+
+    async def delete(self, token: str, generation: int) -> None:
+        if not self._is_stale(token, generation):
+            self._entries.pop(token, None)
+
+
+def create_session_store(settings: Settings) -> SessionStore:
+    """
+    Создает хранилище по настройке session_store: "memory" или путь
+    "пакет.модуль:Класс" к реализации SessionStore.
+    """
+    if settings.session_store == "memory":
+        return MemorySessionStore.from_settings(settings)
+    module_name, _, class_name = settings.session_store.partition(":")
+    store_class = getattr(importlib.import_module(module_name), class_name)
+    store: SessionStore = store_class.from_settings(settings)
+    return store
@@ -0,0 +1,39 @@
+"""Общие фикстуры тестов."""
+
+import time
+from typing import Iterator
+from unittest.mock import MagicMock, patch
+
+import pytest
+from app.main import app
+from starlette.testclient import TestClient
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
+    """
+    Фикстура, создающая тестовый клиент для FastAPI-приложения.
+
+    Пул PoseLandmarker прогревается при старте приложения, поэтому загрузка
+    модели MediaPipe подменяется моком, а клиент выдается после окончания
+    прогрева. Тесты присылают одно и то же
+    изображение с разными подмененными точками, поэтому фильтр почти
+    одинаковых кадров отключен.
+    """
+    monkeypatch.setenv("KINETICOACH_MOTION_GATE_THRESHOLD", "0")
+    with patch(
+        "mediapipe.tasks.python.vision.PoseLandmarker.create_from_options",
+        return_value=MagicMock(),
+    ):
+        with TestClient(app) as client:
+            wait_ready(client)
+            yield client
+
+
+def wait_ready(client: TestClient, timeout: float = 30.0) -> None:
+    """Ждет окончания фонового прогрева моделей (как проверка готовности)."""
+    deadline = time.monotonic() + timeout
+    while client.get("/ready").status_code != 200:
+        if time.monotonic() > deadline:
+            raise TimeoutError("Приложение не стало готовым.")
+        time.sleep(0.01)
@@ -0,0 +1,155 @@
+"""Тесты для допуска сессий и ограничения частоты кадров."""
+
+import base64
+
+import pytest
+from app.admission import (
+    CLOSE_IDLE,
+    CLOSE_OVERLOADED,
+    CLOSE_POLICY,
+    RejectionWindow,
+    TokenBucket,
+)
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from .test_load import configure
+from .test_logs import FakeClock
+from .test_pose_analyzer import LANDMARKS_UP
+from .test_websocket_integration import pack_mock_landmarks
+
+LANDMARKS_MESSAGE = {
+    "type": "POSE_DATA",
+    "payload": {
+        "landmarks": base64.b64encode(pack_mock_landmarks(LANDMARKS_UP)).decode()
+    },
+}
+
+
+def test_token_bucket_burst_and_refill() -> None:
+    """Тестирует пачку до burst событий и восполнение со скоростью rate."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=3, clock=clock)
+
+    assert [bucket.take() for _ in range(4)] == [True, True, True, False]
+    clock.now = 0.5
+    assert [bucket.take() for _ in range(2)] == [True, False]
+    # Простой не накапливает больше burst токенов.
+    clock.now = 100.0
+    assert [bucket.take() for _ in range(4)] == [True, True, True, False]
+
+
+def test_session_cap_rejects_with_close_code(client: TestClient) -> None:
+    """Тестирует закрытие соединения сверх предела сессий кодом 1013."""
+    configure(client, max_sessions=1)
+
+    with client.websocket_connect("/ws/analysis") as first:
+        with client.websocket_connect("/ws/analysis") as second:
+            with pytest.raises(WebSocketDisconnect) as rejected:
+                second.receive_json()
+        first.send_json(LANDMARKS_MESSAGE)
+        assert first.receive_json()["type"] == "FEEDBACK"
+
+    assert rejected.value.code == CLOSE_OVERLOADED
+    assert rejected.value.reason == "Server is at capacity."
+
+
+def test_frames_over_rate_limit_are_rejected(client: TestClient) -> None:
+    """Тестирует отклонение кадров сверх лимита частоты соединения."""
+    configure(client, frame_rate_limit_fps=0.001, frame_rate_burst=2)
+
+    with client.websocket_connect("/ws/analysis") as websocket:
+        answers = []
+        for _ in range(3):
+            websocket.send_json(LANDMARKS_MESSAGE)
+            answers.append(websocket.receive_json())
+
+    assert [answer["type"] for answer in answers] == ["FEEDBACK", "FEEDBACK", "ERROR"]
+    assert answers[2]["payload"]["message"] == "Frame rate limit exceeded."
+
+
+def test_rejection_window_reports_first_of_window() -> None:
+    """Тестирует, что об отклонениях сообщается раз за окно."""
+    clock = FakeClock()
+    window = RejectionWindow(window_s=1.0, clock=clock)
+
+    assert [window.record() for _ in range(3)] == [True, False, False]
+    assert window.count == 3
+    clock.now = 1.0
+    assert window.record()
+    assert window.count == 1
+
+
+def test_rate_limit_error_sent_once_then_connection_closed(
+    client: TestClient,
+) -> None:
+    """
+    Тестирует, что на поток кадров сверх лимита приходит одна ошибка, а
+    после frame_rate_max_rejected отклонений соединение закрывается с 1008.
+    """
+    configure(
+        client,
+        frame_rate_limit_fps=0.001,
+        frame_rate_burst=1,
+        frame_rate_max_rejected=3,
+    )
+
+    with client.websocket_connect("/ws/analysis") as websocket:
+        for _ in range(3):
+            websocket.send_json(LANDMARKS_MESSAGE)
+        # Управляющее сообщение получает ответ сразу за единственной ошибкой.
+        websocket.send_json({"type": "START_SESSION", "payload": {}})
+        answers = [websocket.receive_json() for _ in range(3)]
+        for _ in range(2):
+            websocket.send_json(LANDMARKS_MESSAGE)
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+
+    assert [answer["type"] for answer in answers[:2]] == ["FEEDBACK", "ERROR"]
+    assert answers[2]["type"] != "ERROR"
+    assert closed.value.code == CLOSE_POLICY
+
+
+def test_message_size_counts_utf8_bytes(client: TestClient) -> None:
+    """Тестирует, что размер текста считается в байтах UTF-8, а не в символах."""
+    configure(client, max_frame_bytes=1024)
+
+    with client.websocket_connect("/ws/analysis") as websocket:
+        # 600 символов, но 1200 байтов.
+        websocket.send_text("я" * 600)
+        response = websocket.receive_json()
+
+    assert response["payload"] == {"message": "Message is too large."}
+
+
+def test_large_message_rejected_before_decode(client: TestClient) -> None:
+    """Тестирует отклонение слишком большого сообщения без его разбора."""
+    configure(client, max_frame_bytes=1024)
+
+    with client.websocket_connect("/ws/analysis") as websocket:
+        websocket.send_text("x" * 2048)
+        response = websocket.receive_json()
+        websocket.send_json(LANDMARKS_MESSAGE)
+        feedback = websocket.receive_json()
+
+    assert response == {
+        "type": "ERROR",
+        "payload": {"message": "Message is too large."},
+    }
+    assert feedback["type"] == "FEEDBACK"
+
+
+def test_idle_session_closed_and_landmarker_released(client: TestClient) -> None:
+    """Тестирует закрытие сессии по простою и возврат экземпляра в пул."""
+    configure(client, session_idle_timeout_s=0.2)
+    pool = client.app.state.landmarker_pools["IMAGE"]  # type: ignore[attr-defined]
+
+    with client.websocket_connect("/ws/analysis") as websocket:
+        websocket.send_json({"type": "POSE_DATA", "payload": {"frame": "AAAA"}})
+        websocket.receive_json()
+        assert pool.in_use == 1
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+
+    assert closed.value.code == CLOSE_IDLE
+    assert pool.in_use == 0
@@ -0,0 +1,110 @@
+"""Тесты для исполнителя инференса с пакетной обработкой."""
+
+import asyncio
+import threading
+
+import pytest
+from app.inference.batching import BatchingInferenceExecutor
+from app.inference.executor import InferenceQueueFullError
+
+
+@pytest.mark.asyncio
+async def test_frames_of_many_sessions_share_batch() -> None:
+    """Тест: кадры, пришедшие в пределах окна ожидания, идут одним пакетом."""
+    executor = BatchingInferenceExecutor(
+        max_workers=1, queue_limit=0, max_batch_size=8, max_wait_ms=50
+    )
+
+    results = await asyncio.gather(*(executor.run(pow, n, 2) for n in range(5)))
+
+    assert results == [0, 1, 4, 9, 16]
+    assert executor.stats.batches == 1
+    assert executor.stats.frames == 5
+    await executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_batch_size_is_limited() -> None:
+    """Тест: пакет не превышает `max_batch_size` кадров."""
+    executor = BatchingInferenceExecutor(
+        max_workers=1, queue_limit=8, max_batch_size=2, max_wait_ms=50
+    )
+
+    await asyncio.gather(*(executor.run(abs, -n) for n in range(5)))
+
+    report = executor.report()
+    assert report["batches"] == 3
+    assert report["batch_size_max"] == 2
+    await executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_single_frame_waits_no_longer_than_deadline() -> None:
+    """Тест: одиночный кадр отправляется по истечении окна ожидания."""
+    executor = BatchingInferenceExecutor(
+        max_workers=1, queue_limit=0, max_batch_size=8, max_wait_ms=10
+    )
+
+    result = await asyncio.wait_for(executor.run(str, 7), timeout=1)
+
+    assert result == "7"
+    assert executor.report()["queue_delay_ms_p50"] >= 10
+    await executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_error_in_one_frame_does_not_affect_batch() -> None:
+    """Тест: исключение одного кадра возвращается только его сессии."""
+    executor = BatchingInferenceExecutor(
+        max_workers=1, queue_limit=0, max_batch_size=8, max_wait_ms=50
+    )
+
+    ok, failed = await asyncio.gather(
+        executor.run(int, "1"), executor.run(int, "x"), return_exceptions=True
+    )
+
+    assert ok == 1
+    assert isinstance(failed, ValueError)
+    await executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_rejects_when_queue_is_full() -> None:
+    """Тест: кадры сверх емкости пакетов и очереди отклоняются сразу."""
+    executor = BatchingInferenceExecutor(
+        max_workers=1, queue_limit=1, max_batch_size=1, max_wait_ms=0
+    )
+    release = threading.Event()
+
+    running = asyncio.create_task(executor.run(release.wait))
+    queued = asyncio.create_task(executor.run(release.wait))
+    await asyncio.sleep(0.05)
+
+    assert executor.in_flight == 1
+    with pytest.raises(InferenceQueueFullError):
+        await executor.run(release.wait)
+
+    release.set()
+    await asyncio.gather(running, queued)
+    assert executor.load == 0
+    await executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_frames_fail_when_pool_rejects_batch() -> None:
+    """Тест: если пул потоков не принял пакет, кадры получают ошибку."""
+    executor = BatchingInferenceExecutor(
+        max_workers=1, queue_limit=0, max_batch_size=8, max_wait_ms=10
+    )
+    executor._pool.shutdown()
+
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            executor.run(pow, 1, 2), executor.run(pow, 2, 2), return_exceptions=True
+        ),
+        timeout=1,
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert executor.in_flight == 0
+    await executor.shutdown()
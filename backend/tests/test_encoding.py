@@ -0,0 +1,87 @@
+"""Тесты для кодирования сообщений FEEDBACK."""
+
+import base64
+from typing import List
+
+import numpy as np
+from app.encoding import CompactFeedbackEncoder, FeedbackEncoder, FrameResult
+from app.protocol import LANDMARKS_QUANT_SCALE
+
+from .test_pose_analyzer import LANDMARKS_UP, MockLandmark
+
+
+def make_result(
+    rep_count: int = 0,
+    state: str = "UP",
+    feedback: List[str] | None = None,
+    landmarks: List[MockLandmark] | None = LANDMARKS_UP,
+) -> FrameResult:
+    """Создает результат анализа кадра с типовыми значениями."""
+    return FrameResult(
+        rep_count=rep_count,
+        has_landmarks=True,
+        feedback=feedback or [],
+        state=state,
+        debug_data={"knee_angle": 178.0},
+        landmarks=landmarks,
+    )
+
+
+def test_full_encoder_keeps_legacy_payload() -> None:
+    """Тест: полный формат содержит все поля и точки списком объектов."""
+    message = FeedbackEncoder().encode(make_result())
+
+    assert message.type == "FEEDBACK"
+    assert set(message.payload) == {
+        "rep_count",
+        "has_landmarks",
+        "feedback",
+        "state",
+        "debug_data",
+        "landmarks",
+    }
+    assert len(message.payload["landmarks"]) == 33
+    assert message.payload["landmarks"][11] == {
+        "x": 0.6,
+        "y": 1.0,
+        "z": 0.0,
+        "visibility": 1.0,
+    }
+
+
+def test_compact_encoder_omits_unchanged_fields() -> None:
+    """Тест: компактный формат отправляет только изменившиеся поля."""
+    encoder = CompactFeedbackEncoder(subscribe=[], landmarks_format="float32")
+
+    first = encoder.encode(make_result())
+    second = encoder.encode(make_result())
+    third = encoder.encode(make_result(rep_count=1, feedback=["GOOD_REP"]))
+
+    assert first.payload == {"rep_count": 0, "state": "UP", "has_landmarks": True}
+    assert second.payload == {}
+    assert third.payload == {"rep_count": 1, "feedback": ["GOOD_REP"]}
+
+
+def test_compact_encoder_sends_subscribed_fields_only() -> None:
+    """Тест: точки и отладочные данные отправляются только по подписке."""
+    encoder = CompactFeedbackEncoder(
+        subscribe=["landmarks", "debug_data"], landmarks_format="float32"
+    )
+
+    payload = encoder.encode(make_result()).payload
+
+    assert payload["debug_data"] == {"knee_angle": 178.0}
+    landmarks = np.frombuffer(base64.b64decode(payload["landmarks"]), dtype="<f4")
+    np.testing.assert_allclose(landmarks.reshape(33, 4)[11], [0.6, 1.0, 0.0, 1.0])
+
+
+def test_compact_encoder_int16_landmarks() -> None:
+    """Тест: квантованные точки восстанавливаются с шагом квантования."""
+    encoder = CompactFeedbackEncoder(subscribe=["landmarks"], landmarks_format="int16")
+
+    payload = encoder.encode(make_result()).payload
+
+    raw = base64.b64decode(payload["landmarks"])
+    assert len(raw) == 33 * 4 * 2
+    landmarks = np.frombuffer(raw, dtype="<i2").reshape(33, 4) / LANDMARKS_QUANT_SCALE
+    np.testing.assert_allclose(landmarks[23], [0.5, 2.0, 0.0, 1.0], atol=1e-4)
@@ -0,0 +1,91 @@
+"""Тесты для исполнителя инференса."""
+
+import asyncio
+import threading
+
+import pytest
+from app.inference.executor import InferenceExecutor, InferenceQueueFullError
+
+
+@pytest.mark.asyncio
+async def test_run_executes_outside_event_loop_thread() -> None:
+    """Тест: задача выполняется в потоке пула, а не в потоке event loop."""
+    executor = InferenceExecutor(max_workers=1, max_concurrency=1, queue_limit=0)
+    loop_thread = threading.get_ident()
+
+    worker_thread = await executor.run(threading.get_ident)
+
+    assert worker_thread != loop_thread
+    await executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result_and_passes_arguments() -> None:
+    """Тест: аргументы передаются в функцию, результат возвращается."""
+    executor = InferenceExecutor(max_workers=2, max_concurrency=2, queue_limit=0)
+
+    result = await executor.run(pow, 2, 10)
+
+    assert result == 1024
+    await executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_rejects_when_queue_is_full() -> None:
+    """Тест: задачи сверх лимита слотов и очереди отклоняются сразу."""
+    executor = InferenceExecutor(max_workers=1, max_concurrency=1, queue_limit=1)
+    release = threading.Event()
+
+    running = asyncio.create_task(executor.run(release.wait))
+    queued = asyncio.create_task(executor.run(release.wait))
+    await asyncio.sleep(0.05)
+
+    assert executor.in_flight == 1
+    assert executor.queue_depth == 1
+    with pytest.raises(InferenceQueueFullError):
+        await executor.run(release.wait)
+
+    release.set()
+    await asyncio.gather(running, queued)
+    assert executor.in_flight == 0
+    assert executor.queue_depth == 0
+    await executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_limits_concurrency() -> None:
+    """Тест: одновременно выполняется не больше `max_concurrency` задач."""
+    executor = InferenceExecutor(max_workers=4, max_concurrency=2, queue_limit=10)
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def task() -> None:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        threading.Event().wait(0.02)
+        with lock:
+            active -= 1
+
+    await asyncio.gather(*(executor.run(task) for _ in range(6)))
+
+    assert peak <= 2
+    await executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_shutdown_does_not_block_event_loop() -> None:
+    """Тест: ожидание текущей задачи при остановке не блокирует event loop."""
+    executor = InferenceExecutor(max_workers=1, max_concurrency=1, queue_limit=0)
+    release = threading.Event()
+    running = asyncio.create_task(executor.run(release.wait))
+    await asyncio.sleep(0.05)
+
+    stopping = asyncio.create_task(executor.shutdown())
+    await asyncio.sleep(0.05)
+    # Loop продолжает работать, пока пул ждет задачу.
+    assert not stopping.done()
+    release.set()
+    await asyncio.gather(running, stopping)
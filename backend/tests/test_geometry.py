@@ -0,0 +1,121 @@
+"""Тесты для векторизованной геометрии позы."""
+
+import math
+from typing import Any, Tuple
+
+import numpy as np
+import pytest
+from app.analysis import geometry
+from app.analysis.math_utils import calculate_angle
+
+from .test_math_utils import MockLandmark
+
+Point = Tuple[float, float]
+Points = Tuple[Point, Point, Point]
+
+# Случаи из test_math_utils.py: (p1, p2, p3) и ожидаемый угол.
+CASES: list[tuple[Points, float]] = [
+    (((0, 1), (0, 0), (1, 0)), 90.0),
+    (((-1, 0), (0, 0), (1, 0)), 180.0),
+    (((0, 1), (0, 0), (1, 1)), 45.0),
+    (((0, 0), (0, 0), (0, 0)), 0.0),
+]
+
+
+def frozen_calculate_angle(*coords: Any) -> float:
+    """Прежняя реализация calculate_angle на np.dot и np.linalg.norm."""
+    ax, ay, bx, by, cx, cy = coords
+    v1 = np.array([ax - bx, ay - by])
+    v2 = np.array([cx - bx, cy - by])
+    dot_product = np.dot(v1, v2)
+    norm_product = np.linalg.norm(v1) * np.linalg.norm(v2)
+    if norm_product == 0:
+        return 0.0
+    cosine_angle = np.clip(dot_product / norm_product, -1.0, 1.0)
+    return math.degrees(math.acos(cosine_angle))
+
+
+def make_frame(p1: Point, p2: Point, p3: Point) -> np.ndarray:
+    """Кадр (33, 4), в котором левое колено образовано точками p1, p2, p3."""
+    frame = np.zeros((33, 4), dtype=np.float32)
+    hip, knee, ankle = geometry.JOINTS["left_knee"]
+    frame[[hip, knee, ankle], :2] = [p1, p2, p3]
+    return frame
+
+
+@pytest.mark.parametrize(("points", "expected"), CASES)
+def test_scalar_angle_matches_calculate_angle(points: Points, expected: float) -> None:
+    """Тестирует скалярную версию на случаях calculate_angle."""
+    (ax, ay), (bx, by), (cx, cy) = points
+
+    result = geometry.angle(ax, ay, bx, by, cx, cy)
+
+    assert result == pytest.approx(expected)
+    assert result == calculate_angle(*(MockLandmark(x, y) for x, y in points))
+
+
+@pytest.mark.parametrize(("points", "expected"), CASES)
+def test_joint_angles_matches_calculate_angle(points: Points, expected: float) -> None:
+    """Тестирует векторизованную версию на случаях calculate_angle."""
+    angles = geometry.joint_angles(make_frame(*points))
+
+    assert angles.shape == (len(geometry.JOINTS),)
+    assert angles[list(geometry.JOINTS).index("left_knee")] == pytest.approx(expected)
+
+
+def test_batch_matches_per_frame_calculate_angle() -> None:
+    """
+    Тестирует, что углы всех суставов для пакета кадров совпадают
+    с покадровым вызовом calculate_angle.
+    """
+    rng = np.random.default_rng(0)
+    landmarks = rng.random((200, 33, 4), dtype=np.float32)
+
+    angles = geometry.joint_angles(landmarks)
+
+    assert angles.shape == (200, len(geometry.JOINTS))
+    expected = [
+        [
+            calculate_angle(*(MockLandmark(*map(float, frame[i, :2])) for i in joint))
+            for joint in geometry.JOINTS.values()
+        ]
+        for frame in landmarks
+    ]
+    np.testing.assert_allclose(angles, expected, rtol=1e-12, atol=1e-12)
+
+
+def test_frame_metrics() -> None:
+    """Тестирует наклон корпуса, расстояния и видимость ключевых точек."""
+    frame = np.zeros((33, 4), dtype=np.float32)
+    frame[:, 3] = 1.0
+    frame[geometry.LEFT_SHOULDER] = [0.6, 0.2, 0.0, 0.9]
+    frame[geometry.RIGHT_SHOULDER] = [0.4, 0.2, 0.0, 1.0]
+    frame[geometry.LEFT_HIP] = [0.6, 0.5, 0.0, 1.0]
+    frame[geometry.RIGHT_HIP] = [0.7, 0.5, 0.0, 1.0]
+    frame[geometry.LEFT_KNEE] = [0.7, 0.7, 0.0, 1.0]
+    frame[geometry.LEFT_FOOT_INDEX] = [0.5, 0.9, 0.0, 1.0]
+
+    metrics = geometry.frame_metrics(frame[np.newaxis])
+
+    assert metrics["left_torso"] == pytest.approx([0.0])
+    assert metrics["right_torso"] == pytest.approx([45.0])
+    assert metrics["shoulder_width"] == pytest.approx([0.2])
+    assert metrics["left_knee_foot_diff"] == pytest.approx([0.2])
+    assert metrics["key_visibility"] == pytest.approx([0.9])
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_scalar_angle_equals_frozen_formula(dtype: type) -> None:
+    """
+    Тестирует побитовое совпадение скалярной версии с прежней формулой
+    на случайных точках, включая почти развернутые и почти нулевые углы.
+    """
+    rng = np.random.default_rng(12)
+    points: np.ndarray = rng.random((20_000, 6)).astype(dtype)
+    # Почти коллинеарные точки: косинус близок к -1 и 1.
+    points[:2_000, 4:] = 2 * points[:2_000, 2:4] - points[:2_000, :2]
+    points[2_000:4_000, 4:] = points[2_000:4_000, :2] * (1 + 1e-6)
+
+    for row in points:
+        coords = list(row) if dtype is np.float32 else row.tolist()
+        assert geometry.angle(*coords) == frozen_calculate_angle(*coords)
@@ -0,0 +1,154 @@
+"""Тесты для пула экземпляров PoseProcessor."""
+
+import asyncio
+from typing import List
+from unittest.mock import MagicMock
+
+import pytest
+from app.inference.pool import LandmarkerPool, LandmarkerPoolExhaustedError
+
+
+def make_pool(
+    created: List[MagicMock],
+    max_size: int = 2,
+    warm_size: int = 1,
+    idle_timeout: float = 60.0,
+    acquire_timeout: float = 0.05,
+) -> LandmarkerPool:
+    """Создает пул, фабрика которого возвращает моки и запоминает их."""
+
+    def factory() -> MagicMock:
+        processor = MagicMock()
+        created.append(processor)
+        return processor
+
+    return LandmarkerPool(
+        factory=factory,
+        max_size=max_size,
+        warm_size=warm_size,
+        idle_timeout=idle_timeout,
+        acquire_timeout=acquire_timeout,
+    )
+
+
+@pytest.mark.asyncio
+async def test_start_creates_and_warms_instances() -> None:
+    """Тест: при старте создается `warm_size` прогретых экземпляров."""
+    created: List[MagicMock] = []
+    pool = make_pool(created, max_size=4, warm_size=3)
+
+    await pool.start()
+
+    assert len(created) == 3
+    assert pool.size == 3
+    assert pool.idle_count == 3
+    for processor in created:
+        processor.warmup.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_acquire_reuses_released_instance() -> None:
+    """Тест: возвращенный экземпляр выдается повторно без создания нового."""
+    created: List[MagicMock] = []
+    pool = make_pool(created)
+    await pool.start()
+
+    first = await pool.acquire()
+    pool.release(first)
+    second = await pool.acquire()
+
+    assert second is first
+    assert len(created) == 1
+
+
+@pytest.mark.asyncio
+async def test_acquire_grows_up_to_max_size_then_fails() -> None:
+    """Тест: пул растет до `max_size`, а затем отказывает по таймауту."""
+    created: List[MagicMock] = []
+    pool = make_pool(created, max_size=2, warm_size=1)
+    await pool.start()
+
+    await pool.acquire()
+    await pool.acquire()
+
+    assert pool.size == 2
+    assert pool.in_use == 2
+    with pytest.raises(LandmarkerPoolExhaustedError):
+        await pool.acquire()
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_release() -> None:
+    """Тест: ожидающая сессия получает экземпляр, как только он освободится."""
+    created: List[MagicMock] = []
+    pool = make_pool(created, max_size=1, warm_size=1, acquire_timeout=1.0)
+    await pool.start()
+    processor = await pool.acquire()
+
+    waiter = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0.01)
+    pool.release(processor)
+
+    assert await waiter is processor
+
+
+@pytest.mark.asyncio
+async def test_checkout_releases_on_error() -> None:
+    """Тест: экземпляр возвращается в пул, даже если сессия упала."""
+    created: List[MagicMock] = []
+    pool = make_pool(created)
+    await pool.start()
+
+    with pytest.raises(RuntimeError):
+        async with pool.checkout():
+            raise RuntimeError("disconnect")
+
+    assert pool.in_use == 0
+    assert pool.idle_count == 1
+
+
+@pytest.mark.asyncio
+async def test_evict_idle_keeps_warm_instances() -> None:
+    """Тест: вытесняются только лишние простаивающие экземпляры."""
+    created: List[MagicMock] = []
+    pool = make_pool(created, max_size=3, warm_size=1, idle_timeout=0.01)
+    await pool.start()
+    processors = [await pool.acquire() for _ in range(3)]
+    for processor in processors:
+        pool.release(processor)
+    await asyncio.sleep(0.02)
+
+    evicted = pool.evict_idle()
+
+    assert evicted == 2
+    assert pool.size == 1
+    assert sum(p.close.call_count for p in created) == 2
+
+
+@pytest.mark.asyncio
+async def test_start_failure_closes_created_instances() -> None:
+    """Тест: при ошибке прогрева созданные экземпляры закрываются."""
+    created: List[MagicMock] = []
+
+    def factory() -> MagicMock:
+        processor = MagicMock()
+        if len(created) == 2:
+            processor.warmup.side_effect = RuntimeError("no model")
+        created.append(processor)
+        return processor
+
+    pool = LandmarkerPool(
+        factory=factory,
+        max_size=4,
+        warm_size=3,
+        idle_timeout=60.0,
+        acquire_timeout=0.05,
+    )
+
+    with pytest.raises(RuntimeError, match="no model"):
+        await pool.start()
+
+    assert len(created) == 3
+    assert all(p.close.call_count == 1 for p in created)
+    assert pool.size == 0
+    assert pool.idle_count == 0
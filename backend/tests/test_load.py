@@ -0,0 +1,145 @@
+"""Тесты для оценки загрузки узла и эндпоинта /ready."""
+
+from typing import Any
+
+import pytest
+from app.load import LatencyWindow, LoadThresholds, NodeLoad
+from starlette.testclient import TestClient
+
+from .test_logs import FakeClock
+
+THRESHOLDS = LoadThresholds(
+    max_sessions=10, max_queue_depth=8, min_free_landmarkers=1, max_latency_p95_ms=500
+)
+
+
+def node_load(**fields: Any) -> NodeLoad:
+    defaults: dict[str, Any] = {
+        "sessions": 0,
+        "queue_depth": 0,
+        "landmarkers_free": {"IMAGE": 8, "VIDEO": 8},
+        "landmarkers_max": {"IMAGE": 8, "VIDEO": 8},
+        "latency_p95_ms": None,
+    }
+    return NodeLoad(**(defaults | fields))
+
+
+def configure(client: TestClient, **fields: Any) -> None:
+    """Меняет настройки запущенного приложения (пороги читаются в /ready)."""
+    state = client.app.state  # type: ignore[attr-defined]
+    state.settings = state.settings.model_copy(update=fields)
+
+
+def test_latency_window_keeps_recent_answers() -> None:
+    """Тестирует, что p95 считается только по ответам за последние секунды."""
+    clock = FakeClock()
+    window = LatencyWindow(10.0, clock=clock)
+    assert window.p95_ms() is None
+
+    for _ in range(100):
+        window.record(2.0)
+    clock.now = 20.0
+    for ms in range(1, 101):
+        window.record(ms / 1000)
+
+    assert window.p95_ms() == pytest.approx(95.05)
+    clock.now = 40.0
+    assert window.p95_ms() is None
+
+
+@pytest.mark.parametrize(
+    ("fields", "reason"),
+    [
+        ({"sessions": 10}, "sessions"),
+        ({"queue_depth": 8}, "queue_depth"),
+        ({"landmarkers_free": {"IMAGE": 0, "VIDEO": 8}}, "landmarkers_free"),
+        ({"latency_p95_ms": 750.0}, "latency_p95_ms"),
+    ],
+)
+def test_overloaded_by_each_threshold(fields: dict[str, Any], reason: str) -> None:
+    """Тестирует, что каждый порог по отдельности делает узел неготовым."""
+    load = node_load(**fields)
+
+    assert load.overloaded(THRESHOLDS, "IMAGE") == [reason]
+    assert load.report(THRESHOLDS, "IMAGE")["status"] == "overloaded"
+    assert load.score(THRESHOLDS, "IMAGE") >= 1.0
+
+
+def test_zero_disables_threshold() -> None:
+    """Тестирует отключение порогов нулем."""
+    disabled = LoadThresholds(0, 0, 0, 0)
+    load = node_load(
+        sessions=1000,
+        queue_depth=1000,
+        landmarkers_free={"IMAGE": 0, "VIDEO": 0},
+        latency_p95_ms=10_000.0,
+    )
+
+    assert load.overloaded(disabled, "IMAGE") == []
+    # Без порогов загрузка определяется заполненностью пула.
+    assert load.score(disabled, "IMAGE") == 1.0
+
+
+def test_score_is_busiest_resource() -> None:
+    """Тестирует, что загрузка - наибольшая доля использованного ресурса."""
+    load = node_load(
+        sessions=2,
+        queue_depth=2,
+        landmarkers_free={"IMAGE": 6, "VIDEO": 8},
+        latency_p95_ms=100.0,
+    )
+
+    assert load.score(THRESHOLDS, "IMAGE") == 0.25
+    assert load.report(THRESHOLDS, "IMAGE")["status"] == "ready"
+
+
+def test_ready_reports_load(client: TestClient) -> None:
+    """Тестирует состав ответа /ready на готовом узле без сессий."""
+    response = client.get("/ready")
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["status"] == "ready"
+    assert report["overloaded"] == []
+    assert report["sessions"] == 0
+    assert report["inference_queue_depth"] == 0
+    assert report["landmarkers_free"] == {"IMAGE": 8, "VIDEO": 8}
+    assert report["frame_latency_p95_ms"] is None
+    assert report["load"] == 0.0
+
+
+def test_ready_503_when_sessions_exceed_threshold(client: TestClient) -> None:
+    """Тестирует, что /ready отвечает 503, пока сессий не меньше порога."""
+    configure(client, ready_max_sessions=1)
+
+    with client.websocket_connect("/ws/analysis"):
+        response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "overloaded"
+    assert response.json()["overloaded"] == ["sessions"]
+
+    assert client.get("/ready").status_code == 200
+
+
+def test_ready_503_on_slow_answers(client: TestClient) -> None:
+    """Тестирует порог p95 задержки ответов на кадры."""
+    configure(client, ready_max_latency_p95_ms=100.0)
+    window = client.app.state.frame_latency  # type: ignore[attr-defined]
+    for _ in range(20):
+        window.record(0.2)
+
+    response = client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.json()["overloaded"] == ["latency_p95_ms"]
+    assert response.json()["frame_latency_p95_ms"] == 200.0
+
+
+def test_ready_503_when_pool_has_no_free_landmarkers(client: TestClient) -> None:
+    """Тестирует порог свободных экземпляров модели в пуле."""
+    configure(client, ready_min_free_landmarkers=9)
+
+    response = client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.json()["overloaded"] == ["landmarkers_free"]
@@ -0,0 +1,153 @@
+"""Тесты для структурированного логирования."""
+
+import base64
+import io
+import json
+import logging
+
+import pytest
+from app.config import Settings
+from app.logs import SessionLogger, TextFormatter, configure_logging
+from app.schemas import ServerMessage
+from starlette.testclient import TestClient
+
+from .test_pose_analyzer import LANDMARKS_DOWN_GOOD, LANDMARKS_UP
+from .test_websocket_integration import pack_mock_landmarks
+
+FEEDBACK = ServerMessage(type="FEEDBACK", payload={"seq": 1})
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def records(caplog: pytest.LogCaptureFixture, message: str) -> list[logging.LogRecord]:
+    return [record for record in caplog.records if record.getMessage() == message]
+
+
+def test_configure_logging_json_through_queue() -> None:
+    """Тестирует запись через очередь в формате JSON с полями из extra."""
+    stream = io.StringIO()
+    root = logging.getLogger()
+    level = root.level
+    handlers = list(root.handlers)
+    previous = configure_logging(Settings(log_format="json"), stream)
+    # Повторная настройка заменяет обработчик, а не добавляет второй.
+    listener = configure_logging(Settings(log_format="json"), stream)
+    previous.stop()
+    try:
+        assert len(root.handlers) == len(handlers) + 1
+        logging.getLogger("app.test").info("Привет.", extra={"session": "abc"})
+    finally:
+        listener.stop()
+        root.setLevel(level)
+
+    assert root.handlers == handlers
+
+    (line,) = stream.getvalue().splitlines()
+    entry = json.loads(line)
+    assert entry["message"] == "Привет."
+    assert entry["level"] == "INFO"
+    assert entry["session"] == "abc"
+
+
+def test_text_formatter_appends_fields() -> None:
+    """Тестирует вывод полей из extra парами key=value."""
+    record = logging.LogRecord("app", logging.INFO, "", 0, "Кадр.", None, None)
+    record.session = "abc"
+    record.latency_ms = 1.5
+
+    assert (
+        TextFormatter()
+        .format(record)
+        .endswith("INFO app: Кадр. session=abc latency_ms=1.5")
+    )
+
+
+def test_frame_logs_rate_limited(caplog: pytest.LogCaptureFixture) -> None:
+    """Тестирует, что запись о кадре пишется не чаще раза в интервал."""
+    clock = FakeClock()
+    session_log = SessionLogger("abc", 5.0, 100, clock=clock)
+
+    with caplog.at_level(logging.INFO):
+        for _ in range(30):
+            session_log.frame_answered(0.01, FEEDBACK)
+            clock.now += 0.1
+        clock.now = 5.0
+        session_log.frame_answered(0.01, FEEDBACK)
+
+    assert len(records(caplog, "Кадр сессии обработан.")) == 2
+
+
+def test_frame_logs_disabled(caplog: pytest.LogCaptureFixture) -> None:
+    """Тестирует отключение записей о кадрах нулевым интервалом."""
+    session_log = SessionLogger("abc", 0.0, 100)
+
+    with caplog.at_level(logging.INFO):
+        session_log.frame_answered(0.01, FEEDBACK)
+
+    assert not records(caplog, "Кадр сессии обработан.")
+
+
+def test_summary_percentiles(caplog: pytest.LogCaptureFixture) -> None:
+    """Тестирует итоговую запись: счетчики кадров и перцентили задержки."""
+    session_log = SessionLogger("abc", 0.0, 1000)
+    for ms in range(1, 101):
+        session_log.frame_received()
+        session_log.frame_answered(ms / 1000, FEEDBACK)
+    session_log.frame_answered(0.5, ServerMessage(type="ERROR", payload={}))
+
+    with caplog.at_level(logging.INFO):
+        session_log.summary(reps=3)
+
+    (record,) = records(caplog, "Сессия завершена.")
+    fields = vars(record)
+    assert fields["frames_received"] == 100
+    assert fields["frames_answered"] == 100
+    assert fields["frame_errors"] == 1
+    assert fields["reps"] == 3
+    assert fields["latency_p50_ms"] == pytest.approx(51.0)
+    assert fields["latency_max_ms"] == 500.0
+
+
+def test_latency_sample_is_bounded() -> None:
+    """Тестирует постоянный объем выборки задержек в длинной сессии."""
+    session_log = SessionLogger("abc", 0.0, 64)
+    for ms in range(10_000):
+        session_log.frame_answered(ms / 1000, FEEDBACK)
+
+    percentiles = session_log.latency_percentiles()
+
+    assert len(session_log._latencies_ms) == 64
+    assert percentiles["latency_max_ms"] == 9999.0
+    # Выборка равномерна по всей сессии, а не только по ее началу.
+    assert percentiles["latency_p50_ms"] > 1000
+
+
+def test_session_logs_summary_not_every_frame(
+    client: TestClient, caplog: pytest.LogCaptureFixture
+) -> None:
+    """
+    Тестирует, что сессия не пишет запись на каждое сообщение, а при
+    отключении пишет одну итоговую запись.
+    """
+    with caplog.at_level(logging.INFO):
+        with client.websocket_connect("/ws/analysis") as websocket:
+            for landmarks in [LANDMARKS_UP, LANDMARKS_DOWN_GOOD, LANDMARKS_UP]:
+                packed = base64.b64encode(pack_mock_landmarks(landmarks)).decode()
+                websocket.send_json(
+                    {"type": "POSE_DATA", "payload": {"landmarks": packed}}
+                )
+                websocket.receive_json()
+
+    # Запись о первом кадре сессии и ни одной о следующих.
+    assert len(records(caplog, "Кадр сессии обработан.")) == 1
+    (summary,) = records(caplog, "Сессия завершена.")
+    assert vars(summary)["frames_received"] == 3
+    assert vars(summary)["frames_answered"] == 3
+    assert vars(summary)["reps"] == 1
+    assert "latency_p95_ms" in vars(summary)
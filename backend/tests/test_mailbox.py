@@ -0,0 +1,58 @@
+"""Тесты для почтового ящика кадров сессии."""
+
+import asyncio
+
+import pytest
+from app.mailbox import FrameMailbox, PendingFrame
+from app.schemas import ServerMessage
+
+
+async def noop() -> ServerMessage:
+    """Заглушка обработки кадра."""
+    return ServerMessage(type="FEEDBACK", payload={})
+
+
+@pytest.mark.asyncio
+async def test_get_returns_latest_frame_and_counts_drops() -> None:
+    """Тест: необработанный кадр вытесняется более новым."""
+    mailbox = FrameMailbox()
+
+    for seq in range(3):
+        mailbox.put(PendingFrame(noop, seq=seq))
+    frame = await mailbox.get()
+
+    assert frame is not None
+    assert frame.seq == 2
+    assert mailbox.received == 3
+    assert mailbox.dropped == 2
+
+
+@pytest.mark.asyncio
+async def test_get_waits_for_frame() -> None:
+    """Тест: задача анализа ждет, пока появится кадр."""
+    mailbox = FrameMailbox()
+
+    getter = asyncio.create_task(mailbox.get())
+    await asyncio.sleep(0.01)
+    assert not getter.done()
+
+    mailbox.put(PendingFrame(noop, seq=7))
+    frame = await getter
+
+    assert frame is not None
+    assert frame.seq == 7
+    assert mailbox.dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_close_wakes_waiter_and_drops_pending_frame() -> None:
+    """Тест: закрытие будит задачу анализа и отбрасывает ожидающий кадр."""
+    mailbox = FrameMailbox()
+    mailbox.put(PendingFrame(noop, seq=1))
+
+    mailbox.close()
+    mailbox.put(PendingFrame(noop, seq=2))
+
+    assert await mailbox.get() is None
+    assert mailbox.dropped == 1
+    assert mailbox.received == 1
@@ -0,0 +1,175 @@
+"""Тесты для метрик Prometheus."""
+
+import base64
+import gc
+import threading
+import time
+import timeit
+
+import pytest
+from app import metrics
+from app.metrics import Counter, Gauge, Histogram, Registry
+from starlette.testclient import TestClient
+
+from .test_pose_analyzer import LANDMARKS_DOWN_GOOD, LANDMARKS_UP
+from .test_websocket_integration import pack_mock_landmarks
+
+
+def sample(text: str, line_prefix: str) -> float:
+    """Значение метрики из текстового формата по началу строки."""
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{line_prefix} not found")
+
+
+def test_render_text_format() -> None:
+    """Тестирует текстовый формат: HELP/TYPE, метки и корзины гистограммы."""
+    registry = Registry()
+    counter = Counter("c_total", "Счетчик.", ["kind"], registry=registry)
+    gauge = Gauge("g", "Измеритель.", registry=registry).labels()
+    histogram = Histogram(
+        "h_seconds", "Гистограмма.", registry=registry, buckets=[1, 2]
+    )
+
+    counter.labels('a"b').inc(2)
+    gauge.set_function(lambda: 7)
+    for value in (0.5, 1, 1.5, 3):
+        histogram.labels().observe(value)
+
+    assert registry.render().splitlines() == [
+        "# HELP c_total Счетчик.",
+        "# TYPE c_total counter",
+        'c_total{kind="a\\"b"} 2.0',
+        "# HELP g Измеритель.",
+        "# TYPE g gauge",
+        "g 7.0",
+        "# HELP h_seconds Гистограмма.",
+        "# TYPE h_seconds histogram",
+        'h_seconds_bucket{le="1.0"} 2',
+        'h_seconds_bucket{le="2.0"} 3',
+        'h_seconds_bucket{le="+Inf"} 4',
+        "h_seconds_sum 6.0",
+        "h_seconds_count 4",
+    ]
+
+
+def test_labels_count_checked() -> None:
+    """Тестирует ошибку при неверном числе меток."""
+    counter = Counter("c_total", "Счетчик.", ["kind"], registry=Registry())
+
+    with pytest.raises(ValueError):
+        counter.labels()
+
+
+def test_updates_from_threads_are_not_lost() -> None:
+    """Тестирует, что одновременные обновления из потоков не теряются."""
+    counter = Counter("c_total", "Счетчик.", registry=Registry()).labels()
+    histogram = Histogram("h", "Гистограмма.", registry=Registry()).labels()
+
+    def work() -> None:
+        for _ in range(10_000):
+            counter.inc()
+            histogram.observe(0.001)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value == 40_000
+    assert histogram.count == 40_000
+
+
+def test_per_frame_overhead_is_a_few_microseconds() -> None:
+    """
+    Тестирует накладные расходы метрик на кадр-изображение: четыре стадии
+    с замером времени и два счетчика.
+    """
+    clock = time.perf_counter
+
+    def frame() -> None:
+        metrics.IMAGE_FRAMES_RECEIVED.inc()
+        for stage in (
+            metrics.DECODE_SECONDS,
+            metrics.INFERENCE_SECONDS,
+            metrics.ANALYSIS_SECONDS,
+            metrics.SERIALIZATION_SECONDS,
+        ):
+            started = clock()
+            stage.observe(clock() - started)
+        metrics.FRAMES_ANSWERED.inc()
+
+    per_frame_s = min(timeit.repeat(frame, number=2_000, repeat=5)) / 2_000
+
+    # Запас на медленные машины CI; обычно около 2 мкс.
+    assert per_frame_s < 10e-6
+
+
+def test_metrics_endpoint(client: TestClient) -> None:
+    """Тестирует /metrics: кадры сессии, стадии и заполненность пула."""
+    before = client.get("/metrics").text
+
+    with client.websocket_connect("/ws/analysis") as websocket:
+        for landmarks in [LANDMARKS_UP, LANDMARKS_DOWN_GOOD, LANDMARKS_UP]:
+            packed = base64.b64encode(pack_mock_landmarks(landmarks)).decode()
+            websocket.send_json({"type": "POSE_DATA", "payload": {"landmarks": packed}})
+            websocket.receive_json()
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    after = response.text
+    for name in [
+        'kineticoach_frames_received_total{kind="landmarks"}',
+        "kineticoach_frames_answered_total",
+        'kineticoach_frame_stage_seconds_count{stage="analysis"}',
+        'kineticoach_frame_stage_seconds_count{stage="serialization"}',
+        "kineticoach_sessions_total",
+    ]:
+        expected = 1 if name == "kineticoach_sessions_total" else 3
+        assert sample(after, name) - sample(before, name) == expected
+    assert sample(after, "kineticoach_sessions_active") == 0
+    assert (
+        sample(after, 'kineticoach_landmarker_pool_in_use{running_mode="IMAGE"}') == 0
+    )
+    assert (
+        sample(after, 'kineticoach_landmarker_pool_max_size{running_mode="IMAGE"}') > 0
+    )
+
+
+def test_shards_of_finished_threads_are_merged() -> None:
+    """
+    Тестирует, что ячейки завершившихся потоков вливаются в общую и
+    их число не растет с каждым новым потоком.
+    """
+    counter = Counter("c_total", "Счетчик.", registry=Registry()).labels()
+    histogram = Histogram("h", "Гистограмма.", registry=Registry()).labels()
+
+    def work() -> None:
+        counter.inc()
+        histogram.observe(0.001)
+
+    for _ in range(50):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+        del thread
+    gc.collect()
+
+    assert counter.value == 50
+    assert histogram.count == 50
+    assert len(counter._shards) <= 1
+    assert len(histogram._shards) <= 1
+
+
+def test_family_requires_child_factory() -> None:
+    """Тестирует, что семейство без _new_child нельзя создать."""
+
+    class Incomplete(metrics._Family[metrics.CounterChild]):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete("c_total", "Счетчик.", registry=Registry())  # type: ignore[abstract]
@@ -0,0 +1,138 @@
+"""Тесты для фильтра почти одинаковых кадров."""
+
+from typing import List
+from unittest.mock import MagicMock
+
+import numpy as np
+from app.analysis.motion_gate import MotionGate
+from app.analysis.pose_analyzer import PoseAnalyzer
+from app.schemas import ServerMessage
+
+from .test_pose_analyzer import (
+    LANDMARKS_DOWN_BEND_FORWARD,
+    LANDMARKS_DOWN_GOOD,
+    LANDMARKS_DOWN_SHALLOW,
+    LANDMARKS_UP,
+    LANDMARKS_UP_BEND_BACK,
+    MockLandmark,
+)
+
+# Позы "записанной" сессии; None - человек вышел из кадра.
+POSES: List[List[MockLandmark] | None] = [
+    LANDMARKS_UP,
+    LANDMARKS_DOWN_SHALLOW,
+    LANDMARKS_DOWN_GOOD,
+    LANDMARKS_DOWN_BEND_FORWARD,
+    LANDMARKS_UP_BEND_BACK,
+    None,
+]
+UP, SHALLOW, GOOD, FORWARD, BEND_BACK, EMPTY = range(len(POSES))
+# Стойки между подходами, два повторения, уход из кадра и снова стойка.
+RECORDED_SEQUENCE = (
+    [UP] * 20
+    + [SHALLOW] * 2
+    + [GOOD] * 5
+    + [SHALLOW] * 2
+    + [UP] * 15
+    + [EMPTY] * 5
+    + [UP] * 5
+    + [FORWARD] * 4
+    + [BEND_BACK] * 3
+    + [UP] * 10
+)
+STRIPE_HEIGHT = 20
+
+
+def render_frame(pose: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Рисует кадр позы: светлая полоса на строках позы и шум сенсора камеры,
+    из-за которого даже кадры неподвижной сцены не совпадают побайтно.
+    """
+    frame = np.full((len(POSES) * STRIPE_HEIGHT, 160, 3), 50, dtype=np.int16)
+    frame[pose * STRIPE_HEIGHT : (pose + 1) * STRIPE_HEIGHT] = 200
+    frame += rng.integers(-2, 3, size=frame.shape, dtype=np.int16)
+    return frame.astype(np.uint8)
+
+
+def detect_pose(frame: np.ndarray, timestamp_ms: int | None = None) -> object:
+    """Имитирует модель: определяет позу по положению светлой полосы."""
+    row = int(frame.mean(axis=(1, 2)).argmax())
+    return POSES[row // STRIPE_HEIGHT]
+
+
+def replay(motion_gate: MotionGate | None) -> tuple[List[ServerMessage], MagicMock]:
+    """Прогоняет записанную последовательность кадров через анализатор."""
+    processor = MagicMock()
+    processor.get_landmarks.side_effect = detect_pose
+    analyzer = PoseAnalyzer(processor, motion_gate=motion_gate)
+    rng = np.random.default_rng(0)
+    results = [
+        analyzer._process_decoded(render_frame(pose, rng)) for pose in RECORDED_SEQUENCE
+    ]
+    results.append(analyzer.generate_report())
+    return results, processor
+
+
+def test_rep_counting_unchanged_with_motion_gate() -> None:
+    """
+    Тестирует, что фильтр не меняет результат анализа: ответы на каждый
+    кадр и итоговый отчет совпадают с обработкой без фильтра, а модель
+    вызывается реже.
+    """
+    gate = MotionGate(threshold=2.0, max_skip=30)
+
+    expected, baseline_processor = replay(None)
+    actual, gated_processor = replay(gate)
+
+    assert actual == expected
+    assert expected[-1].payload["total_reps"] == 2
+    assert gate.skipped > 0
+    assert gated_processor.get_landmarks.call_count == gate.frames - gate.skipped
+    assert (
+        gated_processor.get_landmarks.call_count
+        < baseline_processor.get_landmarks.call_count
+    )
+
+
+def test_changed_frame_not_skipped() -> None:
+    """Тестирует, что заметное изменение кадра запускает инференс."""
+    gate = MotionGate(threshold=2.0, max_skip=30)
+    rng = np.random.default_rng(0)
+
+    assert gate.should_skip(render_frame(UP, rng)) is False
+    assert gate.should_skip(render_frame(UP, rng)) is True
+    assert gate.should_skip(render_frame(GOOD, rng)) is False
+    assert gate.skip_rate == 1 / 3
+
+
+def test_slow_drift_compared_with_reference() -> None:
+    """
+    Тестирует сравнение с опорным кадром: медленное изменение, незаметное
+    между соседними кадрами, в итоге запускает инференс.
+    """
+    gate = MotionGate(threshold=2.0, max_skip=100)
+    frame = np.full((64, 64, 3), 100, dtype=np.uint8)
+
+    # Соседние кадры отличаются на 1, но от опорного - уже на 2 к третьему.
+    decisions = [gate.should_skip(frame + step) for step in range(5)]
+
+    assert decisions == [False, True, False, True, False]
+
+
+def test_max_skip_forces_inference() -> None:
+    """Тестирует принудительный инференс после max_skip пропусков подряд."""
+    gate = MotionGate(threshold=2.0, max_skip=2)
+    frame = np.zeros((64, 64, 3), dtype=np.uint8)
+
+    decisions = [gate.should_skip(frame) for _ in range(5)]
+
+    assert decisions == [False, True, True, False, True]
+
+
+def test_zero_threshold_disables_gate() -> None:
+    """Тестирует, что нулевой порог отключает фильтр."""
+    gate = MotionGate(threshold=0, max_skip=30)
+    frame = np.zeros((64, 64, 3), dtype=np.uint8)
+
+    assert not any(gate.should_skip(frame) for _ in range(3))
+    assert gate.skip_rate == 0.0
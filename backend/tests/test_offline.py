@@ -0,0 +1,169 @@
+"""Тесты для офлайн-анализа видео."""
+
+import json
+from pathlib import Path
+from typing import Any, Iterator, List
+from unittest.mock import MagicMock, patch
+
+import cv2
+import numpy as np
+import pytest
+from app.analysis.pose_processor import RunningMode
+from app.offline import VideoOpenError, analyze_video, format_event
+from starlette.testclient import TestClient
+
+from .test_pose_analyzer import LANDMARKS_DOWN_GOOD, LANDMARKS_UP, MockLandmark
+
+DARK, BRIGHT = 20, 220
+# Темный кадр - стойка, светлый - присед: два повторения и стойка.
+SEQUENCE = [DARK] * 6 + [BRIGHT] * 4 + [DARK] * 6 + [BRIGHT] * 4 + [DARK] * 6
+
+
+def detect_by_brightness(frame: np.ndarray, *args: Any) -> List[MockLandmark]:
+    """Имитирует модель: поза определяется яркостью кадра."""
+    return LANDMARKS_DOWN_GOOD if frame.mean() > 128 else LANDMARKS_UP
+
+
+@pytest.fixture
+def squat_video(tmp_path: Path) -> str:
+    """Записывает короткое видео с двумя приседаниями."""
+    path = str(tmp_path / "squats.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter.fourcc(*"MJPG"), 10, (64, 48))
+    for value in SEQUENCE:
+        writer.write(np.full((48, 64, 3), value, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+@pytest.fixture(autouse=True)
+def patched_model() -> Iterator[None]:
+    """Подменяет загрузку модели и инференс MediaPipe."""
+    with (
+        patch(
+            "mediapipe.tasks.python.vision.PoseLandmarker.create_from_options",
+            return_value=MagicMock(),
+        ),
+        patch(
+            "app.analysis.pose_processor.PoseProcessor.get_landmarks",
+            side_effect=detect_by_brightness,
+        ),
+    ):
+        yield
+
+
+@pytest.mark.parametrize(("running_mode", "workers"), [("IMAGE", 3), ("VIDEO", 3)])
+def test_analyze_video_streams_reps_and_report(
+    squat_video: str, running_mode: RunningMode, workers: int
+) -> None:
+    """
+    Тестирует конвейер: INFO, событие на каждое повторение в порядке кадров
+    и итоговый отчет.
+    """
+    events = list(
+        analyze_video(squat_video, running_mode=running_mode, workers=workers)
+    )
+
+    assert [event["type"] for event in events] == ["INFO", "REP", "REP", "REPORT"]
+    assert events[0]["payload"]["frames"] == len(SEQUENCE)
+    assert events[0]["payload"]["workers"] == (1 if running_mode == "VIDEO" else 3)
+    first, second = events[1]["payload"], events[2]["payload"]
+    assert (first["rep"], first["frame"], first["time_s"]) == (1, 10, 1.0)
+    assert (second["rep"], second["frame"]) == (2, 20)
+    assert first["feedback"] == ["GOOD_REP"]
+    report = events[-1]["payload"]
+    assert report["total_reps"] == 2
+    assert report["good_reps"] == 2
+    assert report["video_s"] == pytest.approx(len(SEQUENCE) / 10)
+
+
+def test_analyze_video_stride(squat_video: str) -> None:
+    """Тестирует анализ каждого второго кадра."""
+    events = list(analyze_video(squat_video, stride=2))
+
+    assert events[-1]["payload"]["total_reps"] == 2
+    assert [e["payload"]["frame"] for e in events if e["type"] == "REP"] == [10, 20]
+
+
+def test_analyze_video_rejects_non_video(tmp_path: Path) -> None:
+    """Тестирует ошибку для файла, который не является видео."""
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"not a video")
+
+    with pytest.raises(VideoOpenError):
+        analyze_video(str(path))
+
+
+def test_format_event() -> None:
+    """Тестирует сериализацию событий в NDJSON и SSE."""
+    event = {"type": "REP", "payload": {"rep": 1}}
+
+    assert format_event(event, "ndjson") == '{"type": "REP", "payload": {"rep": 1}}\n'
+    assert format_event(event, "sse") == 'event: REP\ndata: {"rep": 1}\n\n'
+
+
+def test_upload_endpoint_streams_sse(client: TestClient, squat_video: str) -> None:
+    """Тестирует HTTP-эндпоинт: результаты приходят потоком SSE."""
+    body = Path(squat_video).read_bytes()
+
+    response = client.post("/analysis/video?format=sse", content=body)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    blocks = [block for block in response.text.split("\n\n") if block]
+    types = [block.splitlines()[0].removeprefix("event: ") for block in blocks]
+    assert types == ["INFO", "REP", "REP", "REPORT"]
+    report = json.loads(blocks[-1].splitlines()[1].removeprefix("data: "))
+    assert report["total_reps"] == 2
+
+
+def test_upload_endpoint_rejects_invalid_video(client: TestClient) -> None:
+    """Тестирует ответ 400 на файл, который не является видео."""
+    response = client.post("/analysis/video", content=b"not a video")
+
+    assert response.status_code == 400
+
+
+def test_upload_takes_landmarkers_from_pool(
+    client: TestClient, squat_video: str
+) -> None:
+    """
+    Тестирует, что загрузка анализируется экземплярами общего пула и
+    возвращает их в пул вместе с местом загрузки.
+    """
+    state = client.app.state  # type: ignore[attr-defined]
+    pool = state.landmarker_pools["IMAGE"]
+    acquire = pool.acquire
+    acquired: List[Any] = []
+
+    async def spy_acquire() -> Any:
+        acquired.append(await acquire())
+        return acquired[-1]
+
+    with patch.object(pool, "acquire", spy_acquire):
+        response = client.post(
+            "/analysis/video", content=Path(squat_video).read_bytes()
+        )
+
+    assert response.status_code == 200
+    assert json.loads(response.text.splitlines()[-1])["payload"]["total_reps"] == 2
+    assert acquired
+    assert pool.size <= pool.max_size
+    assert pool.in_use == 0
+    assert state.uploads.active == 0
+
+
+def test_upload_rejected_when_uploads_saturated(
+    client: TestClient, squat_video: str
+) -> None:
+    """Тестирует ответ 503, когда узел уже анализирует предельное число видео."""
+    uploads = client.app.state.uploads  # type: ignore[attr-defined]
+    releases = [uploads.try_acquire() for _ in range(uploads.limit)]
+
+    response = client.post("/analysis/video", content=Path(squat_video).read_bytes())
+    for release in releases:
+        release()
+    retried = client.post("/analysis/video", content=Path(squat_video).read_bytes())
+
+    assert response.status_code == 503
+    assert retried.status_code == 200
+    assert uploads.active == 0
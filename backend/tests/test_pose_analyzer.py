@@ -252,3 +252,75 @@ def test_invalid_b64_frame(patched_analyzer: Tuple[PoseAnalyzer, MagicMock]) ->
     result = analyzer.process_frame({"frame": "this-is-not-base64"})
     assert result.type == "ERROR"
     assert "message" in result.payload
+
+
+def test_process_image_binary_buffer(
+    patched_analyzer: Tuple[PoseAnalyzer, MagicMock],
+) -> None:
+    """
+    Тестирует обработку кадра из бинарного сообщения: байты JPEG без base64
+    и метка времени клиента передаются в PoseProcessor.
+    """
+    analyzer, mock_processor = patched_analyzer
+    mock_processor.get_landmarks.return_value = LANDMARKS_UP
+    jpeg_bytes = base64.b64decode(VALID_B64_FRAME)
+
+    result = analyzer.process_image(memoryview(jpeg_bytes), timestamp_ms=123)
+
+    assert result.type == "FEEDBACK"
+    assert result.payload["has_landmarks"] is True
+    frame, timestamp_ms = mock_processor.get_landmarks.call_args.args
+    assert frame.shape == (100, 100, 3)
+    assert timestamp_ms == 123
+
+
+def test_process_image_invalid_bytes(
+    patched_analyzer: Tuple[PoseAnalyzer, MagicMock],
+) -> None:
+    """Тестирует отправку байтов, которые не являются изображением."""
+    analyzer, _ = patched_analyzer
+    result = analyzer.process_image(b"not-an-image")
+    assert result.type == "ERROR"
+
+
+def test_process_landmarks_counts_rep_without_inference(
+    patched_analyzer: Tuple[PoseAnalyzer, MagicMock],
+) -> None:
+    """
+    Тестирует обработку точек, рассчитанных на клиенте: повторение
+    засчитывается, а PoseProcessor не вызывается.
+    """
+    analyzer, mock_processor = patched_analyzer
+
+    def to_array(landmarks: list[MockLandmark]) -> np.ndarray:
+        return np.array(
+            [[lm.x, lm.y, lm.z, lm.visibility] for lm in landmarks], dtype=np.float32
+        )
+
+    analyzer.process_landmarks(to_array(LANDMARKS_DOWN_GOOD))
+    result = analyzer.process_landmarks(to_array(LANDMARKS_UP))
+
+    assert result.payload["rep_count"] == 1
+    assert result.payload["feedback"] == ["GOOD_REP"]
+    assert result.payload["landmarks"] == []
+    mock_processor.get_landmarks.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "frame", [VALID_B64_FRAME, "data:image/jpeg;base64," + VALID_B64_FRAME]
+)
+def test_decode_frame_with_and_without_data_url(frame: str) -> None:
+    """Тестирует декодирование base64 с префиксом data URL и без него."""
+    analyzer = PoseAnalyzer(load_model=False)
+
+    decoded = analyzer._decode_frame(frame)
+
+    assert decoded is not None
+    assert decoded.shape == (100, 100, 3)
+
+
+def test_decode_frame_invalid_base64() -> None:
+    """Тестирует кадр, который не является base64 (не ASCII)."""
+    analyzer = PoseAnalyzer(load_model=False)
+
+    assert analyzer._decode_frame("кадр") is None
@@ -96,3 +96,96 @@ def test_get_landmarks_low_visibility(mock_mediapipe: MagicMock) -> None:
     # Assert: Проверяем, что точки все равно вернулись
     assert result is not None
     assert result[0].visibility == pytest.approx(0.2)
+
+
+def test_video_mode_uses_detect_for_video(mock_mediapipe: MagicMock) -> None:
+    """
+    Тест: в режиме VIDEO используется трекинг (detect_for_video)
+    с переданной меткой времени.
+    """
+    mock_landmarks = [[MockLandmark(visibility=0.9)]]
+    mock_mediapipe.detect_for_video.return_value = MockDetectionResult(
+        landmarks=mock_landmarks
+    )
+
+    processor = PoseProcessor(running_mode="VIDEO")
+    blank_frame = np.zeros((100, 100, 3), dtype=np.uint8)
+
+    result = processor.get_landmarks(blank_frame, timestamp_ms=40)
+
+    assert result is not None
+    mock_mediapipe.detect.assert_not_called()
+    assert mock_mediapipe.detect_for_video.call_args.args[1] == 40
+
+
+def test_video_mode_timestamps_strictly_increase(mock_mediapipe: MagicMock) -> None:
+    """
+    Тест: метки времени в режиме VIDEO строго возрастают, даже если
+    клиент прислал повторяющиеся или убывающие метки.
+    """
+    mock_mediapipe.detect_for_video.return_value = MockDetectionResult(landmarks=None)
+
+    processor = PoseProcessor(running_mode="VIDEO")
+    blank_frame = np.zeros((100, 100, 3), dtype=np.uint8)
+
+    for timestamp_ms in (100, 100, 50, None, 200):
+        processor.get_landmarks(blank_frame, timestamp_ms=timestamp_ms)
+
+    timestamps = [c.args[1] for c in mock_mediapipe.detect_for_video.call_args_list]
+    assert all(b > a for a, b in zip(timestamps, timestamps[1:], strict=False))
+
+
+def test_video_timestamps_rebased_per_session(mock_mediapipe: MagicMock) -> None:
+    """
+    Тест: метки новой сессии отсчитываются от ее первого кадра, а не
+    зажимаются к последней метке предыдущей сессии с другими часами.
+    """
+    mock_mediapipe.detect_for_video.return_value = MockDetectionResult(landmarks=None)
+    processor = PoseProcessor(running_mode="VIDEO")
+    blank_frame = np.zeros((100, 100, 3), dtype=np.uint8)
+
+    # Прошлая сессия: метки в эпохе Unix.
+    for timestamp_ms in (1_700_000_000_000, 1_700_000_000_033):
+        processor.get_landmarks(blank_frame, timestamp_ms=timestamp_ms)
+    processor.reset()
+    # Новая сессия: монотонные часы другого клиента.
+    for timestamp_ms in (5_000, 5_033, 5_100):
+        processor.get_landmarks(blank_frame, timestamp_ms=timestamp_ms)
+
+    timestamps = [c.args[1] for c in mock_mediapipe.detect_for_video.call_args_list]
+    assert timestamps == [
+        1_700_000_000_000,
+        1_700_000_000_033,
+        1_700_000_000_034,
+        1_700_000_000_067,
+        1_700_000_000_134,
+    ]
+
+
+def test_reset_recreates_tracker_that_followed_pose() -> None:
+    """
+    Тест: трекер, сопровождавший позу прошлой сессии, пересоздается
+    перед первым кадром новой; без позы экземпляр переиспользуется.
+    """
+    landmarkers = [MagicMock(), MagicMock()]
+    landmarkers[0].detect_for_video.return_value = MockDetectionResult(
+        landmarks=[[MockLandmark()]]
+    )
+    landmarkers[1].detect_for_video.return_value = MockDetectionResult(landmarks=None)
+    blank_frame = np.zeros((100, 100, 3), dtype=np.uint8)
+
+    with patch(
+        "mediapipe.tasks.python.vision.PoseLandmarker.create_from_options",
+        side_effect=landmarkers,
+    ) as create:
+        processor = PoseProcessor(running_mode="VIDEO")
+        processor.get_landmarks(blank_frame, timestamp_ms=0)
+        processor.reset()
+        processor.get_landmarks(blank_frame, timestamp_ms=0)
+        # Новый трекер позу не нашел: следующая сессия обойдется без него.
+        processor.reset()
+        processor.get_landmarks(blank_frame, timestamp_ms=0)
+
+    assert create.call_count == 2
+    landmarkers[0].close.assert_called_once()
+    assert landmarkers[1].detect_for_video.call_count == 2
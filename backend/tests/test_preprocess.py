@@ -0,0 +1,150 @@
+"""Тесты для подготовки кадра: уменьшенное декодирование и обрезка по позе."""
+
+from typing import List
+from unittest.mock import MagicMock
+
+import cv2
+import numpy as np
+import pytest
+from app.analysis.pose_analyzer import PackedLandmark, PoseAnalyzer
+from app.analysis.preprocess import FramePreprocessor, Roi
+
+
+def encode_jpeg(width: int, height: int) -> bytes:
+    """Кодирует серый кадр заданного размера в JPEG."""
+    frame = np.full((height, width, 3), 128, dtype=np.uint8)
+    _, buffer = cv2.imencode(".jpg", frame)
+    return buffer.tobytes()
+
+
+def make_pose(
+    x_range: tuple[float, float], y_range: tuple[float, float]
+) -> List[PackedLandmark]:
+    """Создает 33 видимые точки, равномерно заполняющие прямоугольник."""
+    xs = np.linspace(*x_range, 33)
+    ys = np.linspace(*y_range, 33)
+    return [
+        PackedLandmark(float(x), float(y), 0.1, 1.0)
+        for x, y in zip(xs, ys, strict=True)
+    ]
+
+
+POSE = make_pose((0.375, 0.625), (0.25, 0.75))
+
+
+def test_reduced_decode_after_first_frame() -> None:
+    """
+    Тестирует уменьшенное декодирование: первый кадр декодируется целиком,
+    следующие - сразу в половинном размере.
+    """
+    preprocessor = FramePreprocessor(min_long_side=512, roi_padding=0.25)
+    jpeg = encode_jpeg(1280, 720)
+
+    first = preprocessor.decode(jpeg)
+    second = preprocessor.decode(memoryview(jpeg))
+
+    assert first is not None and first.shape == (720, 1280, 3)
+    assert second is not None and second.shape == (360, 640, 3)
+    assert preprocessor.scale == 2
+
+
+@pytest.mark.parametrize(
+    ("width", "height", "min_long_side", "scale"),
+    [
+        (640, 480, 512, 1),
+        (1920, 1080, 512, 2),
+        (1920, 1080, 256, 4),
+        (1920, 1080, 0, 1),
+    ],
+)
+def test_reduction_factor(
+    width: int, height: int, min_long_side: int, scale: int
+) -> None:
+    """Тестирует выбор коэффициента уменьшения по размеру кадра."""
+    preprocessor = FramePreprocessor(min_long_side=min_long_side, roi_padding=0.25)
+
+    preprocessor.decode(encode_jpeg(width, height))
+
+    assert preprocessor.scale == scale
+
+
+def test_crop_around_previous_pose() -> None:
+    """Тестирует обрезку кадра по области предыдущей позы с отступом."""
+    preprocessor = FramePreprocessor(min_long_side=0, roi_padding=0.25)
+    frame = np.zeros((100, 200, 3), dtype=np.uint8)
+
+    assert preprocessor.crop(frame)[1] is None
+    preprocessor.update(np.array(POSE, dtype=np.float32))
+    crop, roi = preprocessor.crop(frame)
+
+    # Отступ 0.25 от большей стороны позы (0.5) - 0.125 с каждой стороны.
+    assert roi == Roi(50, 12, 150, 88, 200, 100)
+    assert crop.shape == (76, 100, 3)
+    assert np.shares_memory(crop, frame)
+
+
+def test_no_crop_when_pose_fills_frame() -> None:
+    """Тестирует, что обрезка не применяется, если поза занимает весь кадр."""
+    preprocessor = FramePreprocessor(min_long_side=0, roi_padding=0.25)
+    preprocessor.update(np.array(make_pose((0.0, 1.0), (0.0, 1.0)), np.float32))
+
+    _, roi = preprocessor.crop(np.zeros((100, 200, 3), dtype=np.uint8))
+
+    assert roi is None
+
+
+def test_to_full_frame_mapping() -> None:
+    """Тестирует перевод точек из координат области в координаты кадра."""
+    roi = Roi(50, 5, 150, 95, 200, 100)
+    landmarks = np.array([[0.0, 0.0, 0.2, 0.9], [1.0, 1.0, 0.0, 0.5]], np.float32)
+
+    result = FramePreprocessor.to_full_frame(landmarks, roi)
+
+    np.testing.assert_allclose(
+        result, [[0.25, 0.05, 0.1, 0.9], [0.75, 0.95, 0.0, 0.5]], rtol=1e-6
+    )
+
+
+def make_analyzer() -> tuple[PoseAnalyzer, MagicMock]:
+    processor = MagicMock()
+    processor.running_mode = "IMAGE"
+    preprocessor = FramePreprocessor(min_long_side=0, roi_padding=0.25)
+    analyzer = PoseAnalyzer(processor, preprocessor=preprocessor)
+    return analyzer, processor
+
+
+def test_analyzer_maps_cropped_landmarks_back() -> None:
+    """
+    Тестирует обработку кадра по области: модель получает обрезанный кадр,
+    а точки в ответе возвращаются в координатах полного кадра.
+    """
+    analyzer, processor = make_analyzer()
+    processor.get_landmarks.return_value = POSE
+    frame = np.zeros((100, 200, 3), dtype=np.uint8)
+
+    analyzer._process_decoded(frame)
+    result = analyzer._process_decoded(frame)
+
+    assert processor.get_landmarks.call_args.args[0].shape == (76, 100, 3)
+    first, last = result.payload["landmarks"][0], result.payload["landmarks"][-1]
+    assert first["x"] == pytest.approx(0.25 + 0.375 * 0.5)
+    assert first["y"] == pytest.approx(0.12 + 0.25 * 0.76)
+    assert last["x"] == pytest.approx(0.25 + 0.625 * 0.5)
+    assert last["y"] == pytest.approx(0.12 + 0.75 * 0.76)
+
+
+def test_analyzer_falls_back_to_full_frame() -> None:
+    """
+    Тестирует повторный поиск на полном кадре, если в области предыдущей
+    позы человек не найден.
+    """
+    analyzer, processor = make_analyzer()
+    processor.get_landmarks.side_effect = [POSE, None, POSE]
+    frame = np.zeros((100, 200, 3), dtype=np.uint8)
+
+    analyzer._process_decoded(frame)
+    result = analyzer._process_decoded(frame)
+
+    shapes = [call.args[0].shape for call in processor.get_landmarks.call_args_list]
+    assert shapes == [(100, 200, 3), (76, 100, 3), (100, 200, 3)]
+    assert result.payload["has_landmarks"] is True
@@ -0,0 +1,214 @@
+"""Тесты для инференса в процессах-воркерах."""
+
+import functools
+import os
+from typing import Iterator, List
+
+import numpy as np
+import pytest
+from app.analysis.pose_analyzer import PackedLandmark, PoseAnalyzer
+from app.analysis.pose_processor import NDArrayU8, PoseProcessor, RunningMode
+from app.inference.pool import LandmarkerPool
+from app.inference.processes import (
+    FrameRing,
+    InferenceProcessPool,
+    InferenceWorkerError,
+)
+
+FRAME_MAX_BYTES = 64 * 64 * 3
+
+
+class FakeProcessor(PoseProcessor):
+    """
+    Модель-заглушка для воркера: точки кодируют параметры полученного
+    кадра, чтобы проверить передачу через разделяемую память.
+    """
+
+    def __init__(self, running_mode: RunningMode = "IMAGE") -> None:
+        self.running_mode = running_mode
+
+    def get_landmarks(
+        self, frame: NDArrayU8, timestamp_ms: int | None = None
+    ) -> List[PackedLandmark] | None:
+        if not frame.any():
+            return None
+        if frame[0, 0, 0] == 13:
+            raise RuntimeError("bad frame")
+        x = float(frame.mean()) / 255
+        y = frame.shape[0] / 1000
+        z = float(timestamp_ms or 0) / 1000
+        visibility = 1.0 if self.running_mode == "VIDEO" else 0.5
+        return [PackedLandmark(x, y, z, visibility)] * 33
+
+    def warmup(self) -> None:
+        self.get_landmarks(np.zeros((8, 8, 3), np.uint8))
+
+    def close(self) -> None:
+        pass
+
+
+def make_frame(value: int, height: int = 32, width: int = 32) -> NDArrayU8:
+    return np.full((height, width, 3), value, np.uint8)
+
+
+@pytest.fixture(scope="module")
+def processes() -> Iterator[InferenceProcessPool]:
+    """Два процесса-воркера с моделью-заглушкой."""
+    pool = InferenceProcessPool(
+        processes=2,
+        ring_slots=2,
+        frame_max_bytes=FRAME_MAX_BYTES,
+        factory=FakeProcessor,
+    )
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+def test_frame_ring_shares_memory() -> None:
+    """Тестирует, что кадр и точки слота видны через другое подключение."""
+    ring = FrameRing.create(slots=2, frame_max_bytes=FRAME_MAX_BYTES)
+    try:
+        ring.frame(1, (4, 4, 3))[...] = 7
+        ring.landmarks(1)[:] = 0.25
+        # Подключение под тем же именем, как в процессе-воркере.
+        other = FrameRing.attach(ring.name, 2, FRAME_MAX_BYTES)
+        assert other.frame(1, (4, 4, 3)).sum() == 7 * 48
+        assert np.all(other.landmarks(1) == 0.25)
+        assert not other.frame(0, (4, 4, 3)).any()
+        other.close()
+    finally:
+        ring.close(unlink=True)
+
+
+def test_remote_processor_returns_landmarks(processes: InferenceProcessPool) -> None:
+    """Тестирует передачу кадра в воркер и возврат точек массивом."""
+    image = processes.create_processor("IMAGE")
+    video = processes.create_processor("VIDEO")
+    try:
+        image.warmup()
+        landmarks = image.get_landmarks(make_frame(51))
+        tracked = video.get_landmarks(make_frame(102), timestamp_ms=1500)
+        # Пустой кадр: поза не найдена.
+        missing = image.get_landmarks(make_frame(0))
+    finally:
+        image.close()
+        video.close()
+
+    assert landmarks is not None and len(landmarks) == 33
+    assert landmarks[0].x == pytest.approx(0.2)
+    assert landmarks[0].y == pytest.approx(0.032)
+    assert landmarks[0].visibility == 0.5
+    assert tracked is not None
+    assert (tracked[0].x, tracked[0].z, tracked[0].visibility) == pytest.approx(
+        (0.4, 1.5, 1.0)
+    )
+    assert missing is None
+
+
+def test_processors_spread_across_workers(processes: InferenceProcessPool) -> None:
+    """Тестирует распределение экземпляров по наименее занятым воркерам."""
+    created = [processes.create_processor("IMAGE") for _ in range(4)]
+    try:
+        assert [worker.landmarkers for worker in processes.workers] == [2, 2]
+    finally:
+        for processor in created:
+            processor.close()
+
+    assert [worker.landmarkers for worker in processes.workers] == [0, 0]
+
+
+def test_large_frame_downscaled_to_slot(processes: InferenceProcessPool) -> None:
+    """Тестирует уменьшение кадра, не помещающегося в слот буфера."""
+    processor = processes.create_processor("IMAGE")
+    try:
+        landmarks = processor.get_landmarks(make_frame(51, 128, 128))
+    finally:
+        processor.close()
+
+    assert landmarks is not None
+    assert landmarks[0].y == pytest.approx(0.064)
+    assert landmarks[0].x == pytest.approx(0.2)
+
+
+def test_worker_error_propagates(processes: InferenceProcessPool) -> None:
+    """Тестирует ошибку модели в воркере: исключение у вызывающего, воркер жив."""
+    processor = processes.create_processor("IMAGE")
+    try:
+        with pytest.raises(InferenceWorkerError, match="bad frame"):
+            processor.get_landmarks(make_frame(13))
+        assert processor.get_landmarks(make_frame(51)) is not None
+    finally:
+        processor.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_getaffinity"), reason="Только Linux")
+def test_workers_pinned_to_cores(processes: InferenceProcessPool) -> None:
+    """Тестирует закрепление воркеров за ядрами."""
+    # Ответ на команду означает, что воркер уже закрепился за ядром.
+    for processor in [processes.create_processor("IMAGE") for _ in range(2)]:
+        processor.close()
+    for worker in processes.workers:
+        assert worker.core is not None
+        assert os.sched_getaffinity(worker.process.pid or 0) == {worker.core}
+
+
+def test_analyzer_with_remote_processor(processes: InferenceProcessPool) -> None:
+    """Тестирует анализ кадра с экземпляром модели из воркера."""
+    processor = processes.create_processor("IMAGE")
+    analyzer = PoseAnalyzer(processor, load_model=False)
+    try:
+        message = analyzer._process_decoded(make_frame(51))
+    finally:
+        processor.close()
+
+    assert message.type == "FEEDBACK"
+    assert message.payload["landmarks"][0]["x"] == pytest.approx(0.2)
+
+
+@pytest.mark.asyncio
+async def test_dead_worker_restarted_and_its_landmarkers_evicted() -> None:
+    """
+    Тестирует аварийное завершение воркера: кадр завершается ошибкой, а не
+    зависает, экземпляры воркера удаляются из пула, а новый экземпляр
+    создается в перезапущенном воркере.
+    """
+    processes = InferenceProcessPool(
+        processes=1,
+        ring_slots=2,
+        frame_max_bytes=FRAME_MAX_BYTES,
+        factory=FakeProcessor,
+    )
+    processes.start()
+    pool = LandmarkerPool(
+        factory=functools.partial(processes.create_processor, "IMAGE"),
+        max_size=2,
+        warm_size=2,
+        idle_timeout=60.0,
+        acquire_timeout=1.0,
+    )
+    try:
+        await pool.start()
+        busy = await pool.acquire()
+        dead = processes.workers[0]
+        dead.process.kill()
+        dead.process.join()
+
+        with pytest.raises(InferenceWorkerError):
+            busy.get_landmarks(make_frame(51))
+        assert not busy.alive
+        pool.release(busy)
+        assert pool.evict_dead() == 1
+        assert pool.size == 0
+
+        fresh = await pool.acquire()
+        try:
+            assert fresh.get_landmarks(make_frame(51)) is not None
+        finally:
+            pool.release(fresh)
+        assert processes.workers[0] is not dead
+        assert processes.workers[0].alive
+        assert pool.size == 1
+    finally:
+        pool.close()
+        processes.shutdown()
@@ -0,0 +1,76 @@
+"""Тесты для бинарного протокола WebSocket."""
+
+import numpy as np
+import pytest
+from app.protocol import (
+    HEADER_SIZE,
+    LANDMARKS_NBYTES,
+    BinaryFrameError,
+    LandmarksFormatError,
+    MessageKind,
+    pack_binary_frame,
+    pack_landmarks,
+    parse_binary_frame,
+    unpack_landmarks,
+)
+
+
+def test_parse_binary_frame_roundtrip() -> None:
+    """Тест: заголовок и полезная нагрузка разбираются без потерь."""
+    data = pack_binary_frame(MessageKind.IMAGE, 42, 1_700_000_000_123, b"\xff\xd8jpeg")
+
+    frame = parse_binary_frame(data)
+
+    assert frame.kind is MessageKind.IMAGE
+    assert frame.seq == 42
+    assert frame.timestamp_ms == 1_700_000_000_123
+    assert bytes(frame.payload) == b"\xff\xd8jpeg"
+
+
+def test_parse_binary_frame_payload_is_zero_copy() -> None:
+    """Тест: полезная нагрузка - представление поверх исходного буфера."""
+    data = pack_binary_frame(MessageKind.IMAGE, 1, 0, b"abc")
+
+    frame = parse_binary_frame(data)
+
+    assert frame.payload.obj is data
+    assert len(frame.payload) == len(data) - HEADER_SIZE
+
+
+def test_parse_binary_frame_too_short() -> None:
+    """Тест: сообщение без полезной нагрузки отклоняется."""
+    with pytest.raises(BinaryFrameError):
+        parse_binary_frame(pack_binary_frame(MessageKind.IMAGE, 1, 0, b""))
+
+
+def test_parse_binary_frame_unknown_kind() -> None:
+    """Тест: сообщение неизвестного типа отклоняется."""
+    data = bytes([0xEE]) + bytes(HEADER_SIZE - 1) + b"payload"
+
+    with pytest.raises(BinaryFrameError):
+        parse_binary_frame(data)
+
+
+def test_unpack_landmarks_roundtrip() -> None:
+    """Тест: упакованные точки восстанавливаются в массив (33, 4)."""
+    landmarks = np.linspace(0, 1, 33 * 4, dtype=np.float32).reshape(33, 4)
+
+    unpacked = unpack_landmarks(pack_landmarks(landmarks))
+
+    assert unpacked.shape == (33, 4)
+    np.testing.assert_array_equal(unpacked, landmarks)
+
+
+def test_unpack_landmarks_wrong_length() -> None:
+    """Тест: буфер неверной длины отклоняется."""
+    with pytest.raises(LandmarksFormatError):
+        unpack_landmarks(bytes(LANDMARKS_NBYTES - 4))
+
+
+def test_unpack_landmarks_non_finite() -> None:
+    """Тест: буфер с NaN отклоняется."""
+    landmarks = np.zeros((33, 4), dtype=np.float32)
+    landmarks[5, 1] = np.nan
+
+    with pytest.raises(LandmarksFormatError):
+        unpack_landmarks(pack_landmarks(landmarks))
@@ -0,0 +1,90 @@
+"""Тесты для адаптивного управления частотой кадров."""
+
+from app.analysis import rules
+from app.config import Settings
+from app.rate_control import RateController, RateHint
+
+STANDING_ANGLE = 175.0
+
+
+def make_controller() -> RateController:
+    return RateController.from_settings(Settings())
+
+
+def test_idle_user_gets_low_frame_rate() -> None:
+    """Тестирует, что неподвижно стоящему пользователю нужны редкие кадры."""
+    controller = make_controller()
+
+    hint = controller.update("UP", STANDING_ANGLE, load=0.0, now=0.0)
+
+    assert hint == RateHint(fps=4, jpeg_quality=0.7)
+
+
+def test_unchanged_hint_not_repeated() -> None:
+    """Тестирует, что неизменившаяся подсказка не отправляется повторно."""
+    controller = make_controller()
+    controller.update("UP", STANDING_ANGLE, load=0.0, now=0.0)
+
+    assert controller.update("UP", STANDING_ANGLE, load=0.0, now=0.1) is None
+
+
+def test_down_phase_gets_full_frame_rate() -> None:
+    """Тестирует полную частоту кадров в нижней фазе приседания."""
+    controller = make_controller()
+
+    hint = controller.update("DOWN", 90.0, load=0.0, now=0.0)
+
+    assert hint is not None
+    assert hint.fps == 15
+
+
+def test_knee_bending_gets_full_frame_rate() -> None:
+    """
+    Тестирует, что начало опускания (колени согнуты сильнее порога
+    перехода) переключает клиента на полную частоту до смены фазы.
+    """
+    controller = make_controller()
+    controller.update("UP", STANDING_ANGLE, load=0.0, now=0.0)
+
+    hint = controller.update("UP", rules.REP_TRANSITION_ANGLE, load=0.0, now=0.1)
+
+    assert hint is not None
+    assert hint.fps == 15
+
+
+def test_fast_knee_motion_gets_full_frame_rate() -> None:
+    """Тестирует реакцию на высокую угловую скорость колена в фазе UP."""
+    controller = make_controller()
+    controller.update("UP", STANDING_ANGLE, load=0.0, now=0.0)
+
+    # 10 градусов за 0.1 с: сглаженная скорость 50 град/с выше порога.
+    hint = controller.update("UP", STANDING_ANGLE - 10, load=0.0, now=0.1)
+
+    assert hint is not None
+    assert hint.fps == 15
+
+
+def test_high_load_lowers_rate_and_quality() -> None:
+    """Тестирует снижение частоты и качества JPEG при загрузке узла."""
+    controller = make_controller()
+
+    hint = controller.update("DOWN", 90.0, load=1.0, now=0.0)
+
+    assert hint == RateHint(fps=8, jpeg_quality=0.5)
+
+
+def test_rate_never_below_minimum() -> None:
+    """Тестирует нижнюю границу частоты при высокой загрузке."""
+    controller = RateController(
+        active_fps=15,
+        idle_fps=2,
+        min_fps=2,
+        motion_threshold_dps=25.0,
+        jpeg_quality=0.7,
+        jpeg_quality_low=0.5,
+    )
+
+    hint = controller.update("UP", STANDING_ANGLE, load=1.0, now=0.0)
+
+    assert hint is not None
+    assert hint.fps == 2
@@ -0,0 +1,122 @@
+"""Тесты для записи сессий и их воспроизведения."""
+
+import base64
+from pathlib import Path
+
+import numpy as np
+import pytest
+from app.analysis.pose_analyzer import PoseAnalyzer
+from app.encoding import landmarks_to_array
+from app.recording import (
+    HEADER_SIZE,
+    RecordingFormatError,
+    SessionRecorder,
+    open_recording,
+)
+from app.replay import replay, replay_fast
+from starlette.testclient import TestClient
+
+from .test_pose_analyzer import (
+    LANDMARKS_DOWN_BEND_FORWARD,
+    LANDMARKS_DOWN_GOOD,
+    LANDMARKS_UP,
+    LANDMARKS_UP_BEND_BACK,
+)
+from .test_websocket_integration import pack_mock_landmarks
+
+SEQUENCE = [
+    LANDMARKS_UP,
+    LANDMARKS_DOWN_GOOD,
+    None,
+    LANDMARKS_UP,
+    LANDMARKS_DOWN_BEND_FORWARD,
+    LANDMARKS_UP_BEND_BACK,
+]
+
+
+def test_recording_roundtrip(tmp_path: Path) -> None:
+    """Тестирует запись кадров и чтение через memmap."""
+    recorder = SessionRecorder(tmp_path, {"running_mode": "VIDEO"})
+    for landmarks in SEQUENCE:
+        recorder.write(landmarks)
+    recorder.close()
+    # Кадры после закрытия не дописываются.
+    recorder.write(LANDMARKS_UP)
+
+    recording = open_recording(recorder.path)
+
+    assert len(recording) == len(SEQUENCE)
+    assert isinstance(recording.rows, np.memmap)
+    assert recording.metadata["running_mode"] == "VIDEO"
+    assert recording.has_pose.tolist() == [lm is not None for lm in SEQUENCE]
+    assert np.all(np.diff(recording.t_s) >= 0)
+    np.testing.assert_array_equal(
+        recording.landmarks[1], landmarks_to_array(LANDMARKS_DOWN_GOOD)
+    )
+    assert not recording.landmarks[2].any()
+
+
+def test_truncated_recording_reads_whole_rows(tmp_path: Path) -> None:
+    """Тестирует чтение записи, оборванной посреди строки."""
+    recorder = SessionRecorder(tmp_path)
+    for landmarks in SEQUENCE:
+        recorder.write(landmarks)
+    recorder.close()
+    with recorder.path.open("r+b") as file:
+        file.truncate(recorder.path.stat().st_size - 10)
+
+    assert len(open_recording(recorder.path)) == len(SEQUENCE) - 1
+
+
+def test_no_file_without_frames(tmp_path: Path) -> None:
+    """Тестирует, что сессия без кадров не оставляет файла."""
+    recorder = SessionRecorder(tmp_path / "recordings")
+    recorder.close()
+
+    assert not recorder.path.exists()
+
+
+def test_open_rejects_other_files(tmp_path: Path) -> None:
+    """Тестирует ошибку для файла другого формата."""
+    path = tmp_path / "other.kcrec"
+    path.write_bytes(b"\0" * HEADER_SIZE)
+
+    with pytest.raises(RecordingFormatError):
+        open_recording(path)
+
+
+def test_replay_matches_live_session(tmp_path: Path) -> None:
+    """
+    Тестирует, что покадровое и пакетное воспроизведение дают тот же отчет,
+    что и живая сессия.
+    """
+    recorder = SessionRecorder(tmp_path)
+    live = PoseAnalyzer(load_model=False, recorder=recorder)
+    for landmarks in SEQUENCE:
+        live.process_detected(landmarks)
+    recorder.close()
+    recording = open_recording(recorder.path)
+
+    report = live.generate_report()
+
+    assert report.payload["total_reps"] == 2
+    assert replay(recording) == report
+    assert replay_fast(recording) == report
+
+
+def test_session_recorded_to_directory(
+    client: TestClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Тестирует запись сессии, если задана KINETICOACH_RECORDING_DIR."""
+    monkeypatch.setattr(client.app.state.settings, "recording_dir", tmp_path)  # type: ignore[attr-defined]
+
+    with client.websocket_connect("/ws/analysis") as websocket:
+        for landmarks in [LANDMARKS_UP, LANDMARKS_DOWN_GOOD, LANDMARKS_UP]:
+            packed = base64.b64encode(pack_mock_landmarks(landmarks)).decode()
+            websocket.send_json({"type": "POSE_DATA", "payload": {"landmarks": packed}})
+            websocket.receive_json()
+
+    (path,) = tmp_path.glob("*.kcrec")
+    recording = open_recording(path)
+    assert len(recording) == 3
+    assert replay(recording).payload["good_reps"] == 1
@@ -0,0 +1,49 @@
+"""Тесты для разбора сообщений клиента."""
+
+import json
+
+import orjson
+import pytest
+from app.schemas import parse_client_message
+from pydantic import ValidationError
+
+
+def test_pose_data_payload_passed_through() -> None:
+    """Тестирует, что payload POSE_DATA передается дальше как есть."""
+    frame = "A" * 100_000
+    text = json.dumps({"type": "POSE_DATA", "payload": {"frame": frame, "seq": 3}})
+
+    message = parse_client_message(text)
+
+    assert message.type == "POSE_DATA"
+    assert message.payload == {"frame": frame, "seq": 3}
+
+
+def test_control_messages_fully_validated() -> None:
+    """Тестирует полную валидацию управляющих сообщений."""
+    message = parse_client_message(b'{"type": "START_SESSION"}')
+
+    assert message.type == "START_SESSION"
+    assert message.payload == {}
+    with pytest.raises(ValidationError):
+        parse_client_message('{"type": "UNKNOWN", "payload": {}}')
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"type": "POSE_DATA", "payload": "frame"}',
+        '{"type": "POSE_DATA", "payload": []}',
+        '["POSE_DATA"]',
+    ],
+)
+def test_invalid_pose_data_envelope(text: str) -> None:
+    """Тестирует, что неверный конверт POSE_DATA отклоняется схемой."""
+    with pytest.raises(ValidationError):
+        parse_client_message(text)
+
+
+def test_invalid_json() -> None:
+    """Тестирует ошибку для текста, который не является JSON."""
+    with pytest.raises(orjson.JSONDecodeError):
+        parse_client_message("{not json")
@@ -0,0 +1,160 @@
+"""Тесты для пакетной сегментации повторений."""
+
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from app.analysis import rules
+from app.analysis.pose_analyzer import PoseAnalyzer
+from app.analysis.segmentation import segment_landmarks, segment_reps
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from .test_pose_analyzer import (
+    LANDMARKS_DOWN_BEND_FORWARD,
+    LANDMARKS_DOWN_GOOD,
+    LANDMARKS_DOWN_KNEE_OVER_TOE,
+    LANDMARKS_DOWN_SHALLOW,
+    LANDMARKS_DOWN_TOO_DEEP,
+    LANDMARKS_UP,
+    LANDMARKS_UP_BEND_BACK,
+    MockLandmark,
+)
+
+Frame = Tuple[float, float, float, float, bool]
+
+
+def near(*values: float) -> st.SearchStrategy[float]:
+    """Сами пороги и значения рядом с ними, где чаще всего ошибаются сравнения."""
+    return st.sampled_from(values) | st.sampled_from(
+        [value + delta for value in values for delta in (-0.5, 0.5)]
+    )
+
+
+angles = st.floats(min_value=0.0, max_value=180.0) | near(
+    rules.REP_TRANSITION_ANGLE,
+    rules.SQUAT_DEPTH_GOOD_MIN,
+    rules.SQUAT_DEPTH_GOOD_MAX,
+    rules.BODY_BEND_FORWARD_THRESHOLD,
+    rules.BODY_BEND_BACKWARDS_THRESHOLD,
+)
+# Ряд кадров: угол в колене, угол в бедре, смещение колена, допуск, видимость.
+frames = st.lists(
+    st.tuples(
+        angles,
+        angles,
+        st.floats(min_value=-0.5, max_value=0.5),
+        st.sampled_from([0.0, 0.05, 0.1]),
+        st.sampled_from([True, True, True, False]),
+    ),
+    max_size=80,
+)
+
+
+def stream(trace: List[Frame]) -> Tuple[PoseAnalyzer, List[Dict[str, Any]]]:
+    """Прогоняет ряд через потоковый автомат и собирает повторения."""
+    analyzer = PoseAnalyzer(load_model=False)
+    reps = []
+    for index, (knee, hip, diff, threshold, visible) in enumerate(trace):
+        if not visible:
+            continue
+        reps_before = analyzer.rep_counter
+        analyzer._step(knee, hip, diff, threshold)
+        if analyzer.rep_counter > reps_before:
+            reps.append(
+                {
+                    "end": index,
+                    "min_knee_angle": analyzer.min_knee_angle,
+                    "feedback": list(analyzer.feedback),
+                }
+            )
+    return analyzer, reps
+
+
+@settings(max_examples=300, deadline=None)
+@given(frames)
+def test_matches_streaming_analyzer(trace: List[Frame]) -> None:
+    """
+    Тестирует, что пакетная сегментация на случайных рядах углов дает те же
+    повторения, ошибки, статистику и конечное состояние, что и PoseAnalyzer.
+    """
+    analyzer, expected = stream(trace)
+    columns: List[Tuple[Any, ...]] = list(zip(*trace, strict=True)) or [()] * 5
+    knee, hip, diff, threshold, visible = columns
+
+    result = segment_reps(knee, hip, diff, threshold, valid=visible)
+
+    assert [
+        {
+            "end": rep.end,
+            "min_knee_angle": rep.min_knee_angle,
+            "feedback": rep.feedback,
+        }
+        for rep in result.reps
+    ] == expected
+    assert result.state == analyzer.state
+    assert result.generate_report() == analyzer.generate_report()
+
+
+def test_rep_boundaries_and_invisible_frames() -> None:
+    """
+    Тестирует кадры начала и конца повторения: кадры с углом, равным порогу,
+    и невидимые кадры не меняют состояние.
+    """
+    t = rules.REP_TRANSITION_ANGLE
+    knee = [178, t, 150, 90, 200, t, 175, 160, 100]
+    visible = [True, True, True, True, False, True, True, True, True]
+    n = len(knee)
+
+    result = segment_reps(knee, [90] * n, [0] * n, [0.1] * n, valid=visible)
+
+    assert [(rep.start, rep.end) for rep in result.reps] == [(2, 6)]
+    assert result.reps[0].min_knee_angle == 90
+    assert result.reps[0].feedback == ["GOOD_REP"]
+    assert result.state == "DOWN"
+
+
+def test_segment_landmarks_matches_streaming_analyzer() -> None:
+    """Тестирует пакетный анализ ключевых точек на сценариях test_pose_analyzer."""
+    sequence = [
+        LANDMARKS_UP,
+        LANDMARKS_DOWN_GOOD,
+        LANDMARKS_UP,
+        LANDMARKS_DOWN_BEND_FORWARD,
+        LANDMARKS_DOWN_KNEE_OVER_TOE,
+        LANDMARKS_UP_BEND_BACK,
+        LANDMARKS_DOWN_SHALLOW,
+        LANDMARKS_UP,
+        LANDMARKS_DOWN_TOO_DEEP,
+        [MockLandmark(0, 0, visibility=0.1)] * 33,
+        LANDMARKS_UP,
+    ]
+    landmarks = np.array(
+        [[(lm.x, lm.y, lm.z, lm.visibility) for lm in frame] for frame in sequence],
+        dtype=np.float32,
+    )
+    analyzer = PoseAnalyzer(load_model=False)
+    for frame in landmarks:
+        analyzer.process_landmarks(frame)
+
+    result = segment_landmarks(landmarks)
+
+    assert len(result.reps) == 4
+    assert result.generate_report() == analyzer.generate_report()
+    assert result.reps[1].feedback == [
+        "BEND_FORWARD",
+        "KNEE_OVER_TOE",
+        "BEND_BACKWARDS",
+    ]
+
+
+def test_empty_series() -> None:
+    """Тестирует пустой ряд кадров."""
+    result = segment_reps([], [], [], [])
+
+    assert result.reps == []
+    assert result.state == "UP"
+    assert result.generate_report().payload == {
+        "total_reps": 0,
+        "good_reps": 0,
+        "errors": {},
+    }
@@ -0,0 +1,252 @@
+"""Тесты для снимков сессий и возобновления после обрыва соединения."""
+
+import asyncio
+import base64
+import json
+from typing import Any, Dict, List, Tuple
+
+import pytest
+from app.analysis.pose_analyzer import PoseAnalyzer
+from app.config import Settings
+from app.schemas import SessionOptions
+from app.session import AnalysisSession
+from app.session_store import (
+    SNAPSHOT_VERSION,
+    MemorySessionStore,
+    SessionSnapshot,
+    SessionStore,
+)
+from starlette.testclient import TestClient, WebSocketTestSession
+
+from .test_logs import FakeClock
+from .test_pose_analyzer import LANDMARKS_DOWN_GOOD, LANDMARKS_UP, MockLandmark
+from .test_websocket_integration import pack_mock_landmarks
+
+
+def send_rep(websocket: WebSocketTestSession) -> None:
+    """Одно правильное повторение точками: вверх, вниз, вверх."""
+    frames: List[List[MockLandmark]] = [LANDMARKS_UP, LANDMARKS_DOWN_GOOD, LANDMARKS_UP]
+    for landmarks in frames:
+        packed = base64.b64encode(pack_mock_landmarks(landmarks)).decode()
+        websocket.send_json({"type": "POSE_DATA", "payload": {"landmarks": packed}})
+        assert websocket.receive_json()["type"] == "FEEDBACK"
+
+
+def start_session(websocket: WebSocketTestSession) -> str:
+    websocket.send_json({"type": "START_SESSION", "payload": {}})
+    token: str = websocket.receive_json()["payload"]["resume_token"]
+    return token
+
+
+def resume_session(websocket: WebSocketTestSession, token: str) -> Dict[str, Any]:
+    websocket.send_json({"type": "RESUME_SESSION", "payload": {"resume_token": token}})
+    payload: Dict[str, Any] = websocket.receive_json()["payload"]
+    return payload
+
+
+def test_memory_store_evicts_and_expires() -> None:
+    """Тестирует вытеснение давних снимков и истечение срока жизни."""
+    clock = FakeClock()
+    store = MemorySessionStore(max_entries=2, ttl_s=10.0, clock=clock)
+
+    async def scenario() -> List[Tuple[bytes, int] | None]:
+        await store.save("a", b"1", 0)
+        await store.save("b", b"2", 0)
+        await store.save("a", b"3", 0)
+        # "b" обновлялся давнее всех и вытесняется.
+        await store.save("c", b"4", 0)
+        evicted = await store.load("b")
+        fresh = await store.load("a")
+        clock.now = 10.5
+        expired = await store.load("c")
+        return [evicted, fresh, expired]
+
+    assert asyncio.run(scenario()) == [None, (b"3", 0), None]
+    assert len(store) == 1
+
+
+def test_memory_store_rejects_stale_generation() -> None:
+    """Тестирует, что запись и удаление со старым поколением не выполняются."""
+    store = MemorySessionStore(max_entries=10, ttl_s=10.0)
+
+    async def scenario() -> List[Any]:
+        results: List[Any] = [
+            await store.save("a", b"1", 0),
+            await store.save("a", b"2", 1),
+            await store.save("a", b"3", 0),
+        ]
+        await store.delete("a", 0)
+        results.append(await store.load("a"))
+        await store.delete("a", 1)
+        results.append(await store.load("a"))
+        return results
+
+    assert asyncio.run(scenario()) == [True, True, False, (b"2", 1), None]
+
+
+def test_session_store_is_abstract() -> None:
+    """Тестирует, что хранилище без save, load и delete создать нельзя."""
+
+    class Incomplete(SessionStore):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()  # type: ignore[abstract]
+
+
+def test_snapshot_round_trip() -> None:
+    """Тестирует перенос состояния анализатора через сериализованный снимок."""
+    analyzer = PoseAnalyzer(load_model=False)
+    analyzer.rep_counter = 3
+    analyzer.state = "DOWN"
+    analyzer.min_knee_angle = 72.5
+    analyzer.feedback = ["GOOD_DEPTH"]
+    analyzer.stats["good_reps"] = 2
+    options = SessionOptions(running_mode="VIDEO")
+
+    data = SessionSnapshot.capture(analyzer, options).dumps()
+    restored = PoseAnalyzer(load_model=False)
+    snapshot = SessionSnapshot.loads(data)
+    snapshot.restore(restored)
+
+    assert snapshot.options == options
+    assert restored.rep_counter == 3
+    assert restored.state == "DOWN"
+    assert restored.min_knee_angle == 72.5
+    assert restored.feedback == ["GOOD_DEPTH"]
+    assert restored.stats == analyzer.stats
+    assert json.loads(data)["version"] == SNAPSHOT_VERSION
+
+
+@pytest.mark.parametrize("version", [None, SNAPSHOT_VERSION + 1])
+def test_snapshot_version_mismatch_rejected(version: int | None) -> None:
+    """Тестирует отказ читать снимок без версии или другой версии."""
+    analyzer = PoseAnalyzer(load_model=False)
+    fields = json.loads(SessionSnapshot.capture(analyzer, SessionOptions()).dumps())
+    if version is None:
+        del fields["version"]
+    else:
+        fields["version"] = version
+
+    with pytest.raises(ValueError):
+        SessionSnapshot.loads(json.dumps(fields).encode())
+
+
+@pytest.mark.asyncio
+async def test_stale_connection_cannot_overwrite_resumed_snapshot() -> None:
+    """
+    Тестирует, что соединение, не заметившее обрыв, после возобновления
+    сессии другим соединением не перезаписывает и не удаляет ее снимок.
+    """
+    store = MemorySessionStore(max_entries=10, ttl_s=60.0)
+    settings = Settings()
+    stale = AnalysisSession({}, settings, store)
+    stale.analyzer.rep_counter = 1
+    await stale.checkpoint(force=True)
+
+    resumed = AnalysisSession({}, settings, store)
+    assert await resumed.resume(stale.resume_token)
+    resumed.analyzer.rep_counter = 5
+    await resumed.checkpoint()
+    stale.analyzer.rep_counter = 2
+    await stale.checkpoint(force=True)
+    await stale.discard_snapshot()
+
+    loaded = await store.load(stale.resume_token)
+    assert loaded is not None
+    assert SessionSnapshot.loads(loaded[0]).rep_counter == 5
+
+
+@pytest.mark.asyncio
+async def test_concurrent_resumes_only_one_claims_token() -> None:
+    """
+    Тестирует, что из двух соединений, возобновляющих один токен
+    одновременно, сессию получает только одно.
+    """
+
+    class NetworkStore(MemorySessionStore):
+        """Хранилище, чтение из которого уступает event loop, как сетевое."""
+
+        async def load(self, token: str) -> Tuple[bytes, int] | None:
+            loaded = await super().load(token)
+            await asyncio.sleep(0)
+            return loaded
+
+    store = NetworkStore(max_entries=10, ttl_s=60.0)
+    settings = Settings()
+    previous = AnalysisSession({}, settings, store)
+    await previous.checkpoint(force=True)
+    first = AnalysisSession({}, settings, store)
+    second = AnalysisSession({}, settings, store)
+
+    resumed = await asyncio.gather(
+        first.resume(previous.resume_token), second.resume(previous.resume_token)
+    )
+
+    assert sorted(resumed) == [False, True]
+    loaded = await store.load(previous.resume_token)
+    assert loaded is not None and loaded[1] == 1
+
+
+@pytest.mark.asyncio
+async def test_resume_discards_snapshot_of_own_token() -> None:
+    """
+    Тестирует, что снимок, сохраненный под собственным токеном сессии до
+    возобновления другого токена, удаляется.
+    """
+    store = MemorySessionStore(max_entries=10, ttl_s=60.0)
+    settings = Settings()
+    previous = AnalysisSession({}, settings, store)
+    await previous.checkpoint(force=True)
+    session = AnalysisSession({}, settings, store)
+    await session.checkpoint(force=True)
+    own_token = session.resume_token
+
+    assert await session.resume(previous.resume_token)
+
+    assert await store.load(own_token) is None
+    assert len(store) == 1
+
+
+def test_resume_continues_rep_count(client: TestClient) -> None:
+    """Тестирует продолжение подсчета повторений после переподключения."""
+    with client.websocket_connect("/ws/analysis") as websocket:
+        token = start_session(websocket)
+        send_rep(websocket)
+
+    with client.websocket_connect("/ws/analysis") as websocket:
+        resumed = resume_session(websocket, token)
+        send_rep(websocket)
+        websocket.send_json({"type": "END_SESSION", "payload": {}})
+        report = websocket.receive_json()
+
+    assert resumed["resumed"] is True
+    assert resumed["resume_token"] == token
+    assert resumed["rep_count"] == 1
+    assert report["payload"]["total_reps"] == 2
+    assert report["payload"]["good_reps"] == 2
+
+
+def test_resume_unknown_token_starts_fresh(client: TestClient) -> None:
+    """Тестирует RESUME_SESSION с неизвестным токеном: новая сессия."""
+    with client.websocket_connect("/ws/analysis") as websocket:
+        resumed = resume_session(websocket, "unknown")
+
+    assert resumed["resumed"] is False
+    assert resumed["resume_token"] != "unknown"
+    assert resumed["rep_count"] == 0
+
+
+def test_end_session_discards_snapshot(client: TestClient) -> None:
+    """Тестирует, что завершенную сессию возобновить нельзя."""
+    store = client.app.state.session_store  # type: ignore[attr-defined]
+
+    with client.websocket_connect("/ws/analysis") as websocket:
+        token = start_session(websocket)
+        send_rep(websocket)
+        websocket.send_json({"type": "END_SESSION", "payload": {}})
+        websocket.receive_json()
+
+    assert asyncio.run(store.load(token)) is None
+    with client.websocket_connect("/ws/analysis") as websocket:
+        assert resume_session(websocket, token)["resumed"] is False
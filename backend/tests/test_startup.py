@@ -0,0 +1,75 @@
+"""Тесты для холодного старта: ленивые импорты и готовность узла."""
+
+import json
+import logging
+import subprocess
+import sys
+import time
+from unittest.mock import patch
+
+import pytest
+from app.main import app
+from starlette.testclient import TestClient
+
+
+def run_python(code: str) -> str:
+    """Выполняет код в новом процессе и возвращает последнюю строку вывода."""
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip().splitlines()[-1]
+
+
+def test_boot_and_health_do_not_import_cv_stack() -> None:
+    """Тестирует, что импорт приложения и /health не загружают OpenCV и MediaPipe."""
+    loaded = run_python(
+        "import json, sys\n"
+        "from app.main import app\n"
+        "from starlette.testclient import TestClient\n"
+        "assert TestClient(app).get('/health').status_code == 200\n"
+        "print(json.dumps([m for m in ('cv2', 'mediapipe') if m in sys.modules]))"
+    )
+
+    assert json.loads(loaded) == []
+
+
+def test_cv_stack_does_not_import_torch_or_jax() -> None:
+    """
+    Тестирует, что Tasks API MediaPipe не импортирует torch и jax: они
+    удаляются из runtime-образа (см. Dockerfile).
+    """
+    loaded = run_python(
+        "import json, sys\n"
+        "from app.analysis.pose_processor import preload\n"
+        "import app.offline\n"
+        "preload()\n"
+        "print(json.dumps([m for m in ('torch', 'jax') if m in sys.modules]))"
+    )
+
+    assert json.loads(loaded) == []
+
+
+def test_ready_after_models_loaded(client: TestClient) -> None:
+    """Тестирует /ready после прогрева пула и неизменный /health."""
+    assert client.get("/ready").json()["status"] == "ready"
+    assert client.get("/health").json() == {"status": "ok"}
+
+
+def test_not_ready_when_model_fails_to_load(caplog: pytest.LogCaptureFixture) -> None:
+    """Тестирует, что узел не становится готовым, если модель не загрузилась."""
+    with (
+        caplog.at_level(logging.ERROR),
+        patch(
+            "mediapipe.tasks.python.vision.PoseLandmarker.create_from_options",
+            side_effect=RuntimeError("no model"),
+        ),
+        TestClient(app) as client,
+    ):
+        deadline = time.monotonic() + 30
+        while "Не удалось загрузить" not in caplog.text:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        response = client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.json() == {"status": "starting"}
@@ -1,10 +1,13 @@
 """Интеграционные тесты для WebSocket-эндпоинта."""
 
-from typing import Iterator
+import base64
+import threading
+import time
+from typing import Any, List
 from unittest.mock import patch
 
-import pytest
-from app.main import app
+import numpy as np
+from app.protocol import MessageKind, pack_binary_frame, pack_landmarks
 from starlette.testclient import TestClient
 
 # Импортируем моки и тестовые данные из другого файла
@@ -12,14 +15,19 @@ from .test_pose_analyzer import (
     LANDMARKS_DOWN_GOOD,
     LANDMARKS_UP,
     VALID_B64_FRAME,
+    MockLandmark,
 )
 
+VALID_JPEG_BYTES = base64.b64decode(VALID_B64_FRAME)
 
-@pytest.fixture
-def client() -> Iterator[TestClient]:
-    """Фикстура, создающая тестовый клиент для FastAPI-приложения."""
-    with TestClient(app) as client:
-        yield client
+
+def pack_mock_landmarks(landmarks: List[MockLandmark]) -> bytes:
+    """Упаковывает тестовые точки так же, как это делает клиент."""
+    return pack_landmarks(
+        np.array(
+            [[lm.x, lm.y, lm.z, lm.visibility] for lm in landmarks], dtype=np.float32
+        )
+    )
 
 
 def test_good_rep_integration_scenario(client: TestClient) -> None:
@@ -67,3 +75,327 @@ def test_good_rep_integration_scenario(client: TestClient) -> None:
 
         # Проверяем, что get_landmarks был вызван нужное количество раз
         assert mock_get_landmarks.call_count == len(mock_landmarks_sequence)
+
+
+def test_landmarker_returned_to_pool_on_disconnect(client: TestClient) -> None:
+    """
+    Тестирует, что экземпляр PoseLandmarker возвращается в пул,
+    когда клиент разрывает соединение.
+    """
+    pool = client.app.state.landmarker_pools["IMAGE"]  # type: ignore[attr-defined]
+
+    with patch(
+        "app.analysis.pose_analyzer.PoseProcessor.get_landmarks", return_value=None
+    ):
+        with client.websocket_connect("/ws/analysis") as websocket:
+            websocket.send_json(
+                {"type": "POSE_DATA", "payload": {"frame": VALID_B64_FRAME}}
+            )
+            websocket.receive_json()
+            assert pool.in_use == 1
+
+    assert pool.in_use == 0
+    assert pool.size == pool.warm_size
+
+
+def test_start_session_switches_running_mode(client: TestClient) -> None:
+    """
+    Тестирует выбор режима VIDEO в START_SESSION: кадры сессии обрабатываются
+    экземпляром из пула VIDEO.
+    """
+    pools = client.app.state.landmarker_pools  # type: ignore[attr-defined]
+
+    with (
+        patch(
+            "app.analysis.pose_analyzer.PoseProcessor.get_landmarks",
+            return_value=None,
+        ),
+        client.websocket_connect("/ws/analysis") as websocket,
+    ):
+        websocket.send_json(
+            {"type": "START_SESSION", "payload": {"running_mode": "VIDEO"}}
+        )
+        response = websocket.receive_json()
+
+        assert response["type"] == "INFO"
+        assert response["payload"]["session"]["running_mode"] == "VIDEO"
+
+        websocket.send_json(
+            {"type": "POSE_DATA", "payload": {"frame": VALID_B64_FRAME}}
+        )
+        websocket.receive_json()
+
+        assert pools["VIDEO"].in_use == 1
+        assert pools["IMAGE"].in_use == 0
+
+    assert pools["VIDEO"].in_use == 0
+
+
+def test_start_session_waits_for_frame_in_inference(client: TestClient) -> None:
+    """
+    Тестирует смену режима в START_SESSION, пока кадр анализируется:
+    экземпляр модели возвращается в пул только после ответа на кадр.
+    """
+    pools = client.app.state.landmarker_pools  # type: ignore[attr-defined]
+    started = threading.Event()
+    gate = threading.Event()
+    in_use_during_inference: List[int] = []
+
+    def slow_get_landmarks(*args: Any) -> List[MockLandmark]:
+        started.set()
+        gate.wait(timeout=5)
+        in_use_during_inference.append(pools["IMAGE"].in_use)
+        return LANDMARKS_UP
+
+    with patch(
+        "app.analysis.pose_analyzer.PoseProcessor.get_landmarks",
+        side_effect=slow_get_landmarks,
+    ):
+        with client.websocket_connect("/ws/analysis") as websocket:
+            websocket.send_json(
+                {"type": "POSE_DATA", "payload": {"frame": VALID_B64_FRAME}}
+            )
+            assert started.wait(timeout=5)
+            websocket.send_json(
+                {"type": "START_SESSION", "payload": {"running_mode": "VIDEO"}}
+            )
+            # Время, за которое START_SESSION без ожидания кадра успел бы
+            # вернуть экземпляр в пул.
+            time.sleep(0.2)
+            gate.set()
+
+            answers = [websocket.receive_json() for _ in range(2)]
+            image_in_use = pools["IMAGE"].in_use
+
+    assert in_use_during_inference == [1]
+    assert [answer["type"] for answer in answers] == ["FEEDBACK", "INFO"]
+    assert answers[1]["payload"]["session"]["running_mode"] == "VIDEO"
+    assert image_in_use == 0
+
+
+def test_start_session_rejects_unknown_option(client: TestClient) -> None:
+    """Тестирует, что неизвестные параметры сессии отклоняются с ошибкой."""
+    with client.websocket_connect("/ws/analysis") as websocket:
+        websocket.send_json(
+            {"type": "START_SESSION", "payload": {"running_mode": "LIVE"}}
+        )
+        response = websocket.receive_json()
+
+        assert response["type"] == "ERROR"
+
+
+def test_binary_frames_after_negotiation(client: TestClient) -> None:
+    """
+    Тестирует бинарный протокол: после согласования frame_format="binary"
+    кадры отправляются бинарными сообщениями и анализируются так же,
+    как кадры в JSON.
+    """
+    mock_landmarks_sequence = [LANDMARKS_UP, LANDMARKS_DOWN_GOOD, LANDMARKS_UP]
+
+    with patch(
+        "app.analysis.pose_analyzer.PoseProcessor.get_landmarks",
+        side_effect=mock_landmarks_sequence,
+    ):
+        with client.websocket_connect("/ws/analysis") as websocket:
+            websocket.send_json(
+                {"type": "START_SESSION", "payload": {"frame_format": "binary"}}
+            )
+            assert (
+                websocket.receive_json()["payload"]["session"]["frame_format"]
+                == "binary"
+            )
+
+            for seq in range(len(mock_landmarks_sequence)):
+                websocket.send_bytes(
+                    pack_binary_frame(
+                        MessageKind.IMAGE, seq, 1000 + seq * 100, VALID_JPEG_BYTES
+                    )
+                )
+                response = websocket.receive_json()
+
+            assert response["type"] == "FEEDBACK"
+            assert response["payload"]["rep_count"] == 1
+            assert response["payload"]["feedback"] == ["GOOD_REP"]
+
+
+def test_binary_frame_without_negotiation(client: TestClient) -> None:
+    """Тестирует, что бинарные кадры без согласования отклоняются."""
+    with client.websocket_connect("/ws/analysis") as websocket:
+        websocket.send_bytes(
+            pack_binary_frame(MessageKind.IMAGE, 0, 0, VALID_JPEG_BYTES)
+        )
+        response = websocket.receive_json()
+
+        assert response["type"] == "ERROR"
+
+
+def test_landmarks_only_session_skips_inference(client: TestClient) -> None:
+    """
+    Тестирует режим без изображений: клиент присылает упакованные точки
+    (в JSON и бинарно), сервер считает повторение без декодирования и
+    инференса и не занимает экземпляр модели.
+    """
+    pools = client.app.state.landmarker_pools  # type: ignore[attr-defined]
+    sequence = [LANDMARKS_UP, LANDMARKS_DOWN_GOOD, LANDMARKS_UP]
+
+    with patch(
+        "app.analysis.pose_analyzer.PoseProcessor.get_landmarks"
+    ) as mock_get_landmarks:
+        with client.websocket_connect("/ws/analysis") as websocket:
+            websocket.send_json(
+                {"type": "START_SESSION", "payload": {"frame_format": "binary"}}
+            )
+            websocket.receive_json()
+
+            # Первые кадры - в JSON (base64), последний - бинарным сообщением.
+            for landmarks in sequence[:-1]:
+                packed = base64.b64encode(pack_mock_landmarks(landmarks)).decode()
+                websocket.send_json(
+                    {"type": "POSE_DATA", "payload": {"landmarks": packed}}
+                )
+                websocket.receive_json()
+            websocket.send_bytes(
+                pack_binary_frame(
+                    MessageKind.LANDMARKS, 2, 0, pack_mock_landmarks(sequence[-1])
+                )
+            )
+            response = websocket.receive_json()
+
+            assert response["type"] == "FEEDBACK"
+            assert response["payload"]["rep_count"] == 1
+            assert response["payload"]["feedback"] == ["GOOD_REP"]
+            assert pools["IMAGE"].in_use == 0
+
+    mock_get_landmarks.assert_not_called()
+
+
+def test_landmarks_wrong_length_rejected(client: TestClient) -> None:
+    """Тестирует, что буфер точек неверной длины отклоняется."""
+    with client.websocket_connect("/ws/analysis") as websocket:
+        packed = base64.b64encode(bytes(100)).decode()
+        websocket.send_json({"type": "POSE_DATA", "payload": {"landmarks": packed}})
+        response = websocket.receive_json()
+
+        assert response["type"] == "ERROR"
+
+
+def test_compact_encoding_after_negotiation(client: TestClient) -> None:
+    """
+    Тестирует компактный формат FEEDBACK: без подписки точки и отладочные
+    данные не отправляются, неизменившиеся поля опускаются.
+    """
+    with patch(
+        "app.analysis.pose_analyzer.PoseProcessor.get_landmarks",
+        return_value=LANDMARKS_UP,
+    ):
+        with client.websocket_connect("/ws/analysis") as websocket:
+            websocket.send_json(
+                {"type": "START_SESSION", "payload": {"encoding": "compact"}}
+            )
+            websocket.receive_json()
+
+            frame = {"type": "POSE_DATA", "payload": {"frame": VALID_B64_FRAME}}
+            websocket.send_json(frame)
+            first = websocket.receive_json()
+            websocket.send_json(frame)
+            second = websocket.receive_json()
+
+    assert first["payload"] == {"rep_count": 0, "state": "UP", "has_landmarks": True}
+    assert second == {"type": "FEEDBACK", "payload": {}}
+
+
+def test_stale_frames_dropped_while_inference_busy(client: TestClient) -> None:
+    """
+    Тестирует принцип "побеждает последний кадр": пока кадр обрабатывается,
+    из пришедших следом анализируется только самый свежий, а клиенту
+    сообщается число отброшенных кадров.
+    """
+    started = threading.Event()
+    gate = threading.Event()
+
+    def slow_get_landmarks(*args: Any) -> List[MockLandmark]:
+        started.set()
+        gate.wait(timeout=5)
+        return LANDMARKS_UP
+
+    with patch(
+        "app.analysis.pose_analyzer.PoseProcessor.get_landmarks",
+        side_effect=slow_get_landmarks,
+    ):
+        with client.websocket_connect("/ws/analysis") as websocket:
+            for seq in range(3):
+                websocket.send_json(
+                    {
+                        "type": "POSE_DATA",
+                        "payload": {"frame": VALID_B64_FRAME, "seq": seq, "ts": seq},
+                    }
+                )
+                # Первый кадр должен попасть в обработку до прихода остальных.
+                assert started.wait(timeout=5)
+            # Ответ на бинарное сообщение без согласования приходит сразу
+            # при приеме: значит, все кадры до него приняты.
+            websocket.send_bytes(b"")
+            assert websocket.receive_json()["type"] == "ERROR"
+            gate.set()
+
+            first = websocket.receive_json()["payload"]
+            second = websocket.receive_json()["payload"]
+
+    assert first["seq"] == 0
+    assert second["seq"] == 2
+    assert second["client_ts"] == 2
+    assert second["dropped"] == 1
+    assert second["lag_ms"] >= 0
+
+
+def test_rate_control_hints_after_negotiation(client: TestClient) -> None:
+    """
+    Тестирует подсказки RATE_CONTROL: после согласования клиент получает
+    подсказку вслед за FEEDBACK, а повторная неизменившаяся подсказка
+    не отправляется.
+    """
+    with patch(
+        "app.analysis.pose_analyzer.PoseProcessor.get_landmarks",
+        return_value=LANDMARKS_UP,
+    ):
+        with client.websocket_connect("/ws/analysis") as websocket:
+            websocket.send_json(
+                {"type": "START_SESSION", "payload": {"rate_control": True}}
+            )
+            websocket.receive_json()
+
+            frame = {"type": "POSE_DATA", "payload": {"frame": VALID_B64_FRAME}}
+            websocket.send_json(frame)
+            assert websocket.receive_json()["type"] == "FEEDBACK"
+            hint = websocket.receive_json()
+
+            websocket.send_json(frame)
+            assert websocket.receive_json()["type"] == "FEEDBACK"
+            websocket.send_json({"type": "END_SESSION", "payload": {}})
+            after = websocket.receive_json()
+
+    # Пользователь стоит в фазе UP, узел не загружен: редкие кадры.
+    assert hint == {
+        "type": "RATE_CONTROL",
+        "payload": {"fps": 4, "jpeg_quality": 0.7},
+    }
+    assert after["type"] == "REPORT"
+
+
+def test_inference_stats_endpoint(client: TestClient) -> None:
+    """Тестирует отчет исполнителя инференса после обработки кадра."""
+    with patch(
+        "app.analysis.pose_analyzer.PoseProcessor.get_landmarks",
+        return_value=LANDMARKS_UP,
+    ):
+        with client.websocket_connect("/ws/analysis") as websocket:
+            websocket.send_json(
+                {"type": "POSE_DATA", "payload": {"frame": VALID_B64_FRAME}}
+            )
+            websocket.receive_json()
+
+    report = client.get("/inference/stats").json()
+
+    assert report["frames"] == 1
+    assert report["batch_size_mean"] == 1
+    assert report["load"] == 0
@@ -0,0 +1,378 @@
+"""
+Нагрузочный клиент для WebSocket-эндпоинта (развитие test_websocket.py).
+
+Запускает N одновременных имитированных клиентов, каждый присылает кадры
+с заданной частотой: изображения JPEG (синтетический кадр или кадры
+записанного ролика) либо только ключевые точки (синтетическое приседание
+или запись сессии .kcrec), в JSON или бинарным протоколом. Клиенты
+подключаются постепенно (--ramp-up), работают --hold секунд и так же
+постепенно отключаются (--ramp-down).
+
+Собирается:
+- распределение задержки "кадр отправлен -> получен FEEDBACK" (p50/p95/p99)
+  и доля ответов дольше бюджета из docs/plan.md (2-3 с, --budget-ms);
+- отправленные, отвеченные и отброшенные сервером кадры (на каждый кадр
+  без ответа сервер ответил более свежим), ошибки ERROR и обрывы соединений;
+- пропускная способность сервера: ответов в секунду, раз в секунду -
+  по ходу теста;
+- кадры, для которых сервер пропустил инференс (фильтр почти одинаковых
+  кадров, motion gate), по /metrics сервера.
+
+Синтетические кадры - силуэт, который приседает по кругу из
+SYNTHETIC_FRAMES кадров: соседние кадры различаются, и фильтр почти
+одинаковых кадров не подменяет инференс. Если сервер все же пропускал
+инференс, в конце печатается предупреждение: оценка числа сессий на
+узел в таком прогоне завышена.
+
+Запуск (из директории backend/, сервер уже запущен):
+    PYTHONPATH=src python -m tools.load_test --clients 50 --fps 10 --hold 60
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import sys
+import time
+import urllib.request
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List
+
+import cv2
+import numpy as np
+import websockets
+from app.protocol import MessageKind, pack_binary_frame, pack_landmarks
+from app.recording import open_recording
+
+from benchmarks.bench_pipeline import squat_landmarks
+
+DEFAULT_URI = "ws://localhost:8000/ws/analysis"
+# Сколько ждать итоговый отчет после END_SESSION.
+REPORT_TIMEOUT_S = 10.0
+# Кадров в одном синтетическом приседании.
+SYNTHETIC_FRAMES = 30
+SKIPPED_METRIC = "kineticoach_inference_skipped_total"
+
+
+@dataclass
+class Payloads:
+    """Содержимое кадров, которое клиенты присылают по кругу."""
+
+    # "image" - JPEG, "landmarks" - упакованные точки (33, 4) float32.
+    kind: str
+    items: List[bytes]
+
+
+@dataclass
+class Metrics:
+    """Общие метрики всех клиентов."""
+
+    latencies_ms: List[float] = field(default_factory=list)
+    sent: int = 0
+    answered: int = 0
+    # Кадры, на которые сервер ответил ошибкой (например, "Server is busy").
+    frame_errors: int = 0
+    errors: Counter[str] = field(default_factory=Counter)
+    connect_failures: int = 0
+    disconnects: int = 0
+    active: int = 0
+    # Время получения ответов для расчета пропускной способности.
+    responses_at: Deque[float] = field(default_factory=deque)
+
+    def record_response(self, sent_at: float) -> None:
+        now = time.perf_counter()
+        self.latencies_ms.append((now - sent_at) * 1000.0)
+        self.answered += 1
+        self.responses_at.append(now)
+
+
+def load_payloads(args: argparse.Namespace) -> Payloads:
+    """Готовит кадры: JPEG из ролика или синтетические, либо точки."""
+    if args.mode == "landmarks":
+        if args.recording:
+            recording = open_recording(args.recording)
+            frames = recording.landmarks[recording.has_pose]
+        else:
+            frames = np.array(squat_landmarks(), dtype=np.float32)
+        if not len(frames):
+            raise SystemExit(f"В записи нет кадров с позой: {args.recording}")
+        return Payloads("landmarks", [pack_landmarks(frame) for frame in frames])
+    if args.video:
+        return Payloads("image", read_jpegs(args.video, args.max_frames))
+    return Payloads("image", synthetic_jpegs(args.width, args.height))
+
+
+def synthetic_jpegs(width: int, height: int) -> List[bytes]:
+    """
+    Кадры синтетического приседания: светлый силуэт на темном фоне
+    опускается и поднимается с постоянной скоростью за SYNTHETIC_FRAMES
+    кадров. Сдвиг между соседними кадрами больше порога фильтра почти
+    одинаковых кадров по умолчанию.
+    """
+    jpegs = []
+    half = SYNTHETIC_FRAMES / 2
+    for i in range(SYNTHETIC_FRAMES):
+        depth = 1 - abs(i - half) / half
+        frame = np.full((height, width, 3), 30, dtype=np.uint8)
+        top = int(height * (0.05 + 0.4 * depth))
+        bottom = top + height // 2
+        left, right = int(width * 0.35), int(width * 0.65)
+        cv2.rectangle(frame, (left, top), (right, bottom), (200,) * 3, -1)
+        jpegs.append(cv2.imencode(".jpg", frame)[1].tobytes())
+    return jpegs
+
+
+def metrics_url(uri: str) -> str:
+    """Адрес /metrics сервера по адресу WebSocket-эндпоинта."""
+    scheme, rest = uri.split("://", 1)
+    host = rest.split("/", 1)[0]
+    return f"{'https' if scheme == 'wss' else 'http'}://{host}/metrics"
+
+
+def read_inference_skipped(url: str) -> float | None:
+    """Счетчик кадров без инференса на сервере; None, если /metrics недоступен."""
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            text = response.read().decode()
+    except OSError:
+        return None
+    for line in text.splitlines():
+        if line.startswith(SKIPPED_METRIC):
+            return float(line.split()[-1])
+    return 0.0
+
+
+def read_jpegs(path: str, max_frames: int) -> List[bytes]:
+    """Сжимает в JPEG первые кадры ролика."""
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise SystemExit(f"Не удалось открыть видео: {path}")
+    jpegs: List[bytes] = []
+    while len(jpegs) < max_frames:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        jpegs.append(cv2.imencode(".jpg", frame)[1].tobytes())
+    capture.release()
+    if not jpegs:
+        raise SystemExit(f"В ролике нет кадров: {path}")
+    return jpegs
+
+
+def encode_frame(payloads: Payloads, seq: int, binary: bool) -> str | bytes:
+    """Собирает сообщение с кадром номер seq."""
+    data = payloads.items[seq % len(payloads.items)]
+    ts = int(time.time() * 1000)
+    if binary:
+        kind = (
+            MessageKind.LANDMARKS if payloads.kind == "landmarks" else MessageKind.IMAGE
+        )
+        return pack_binary_frame(kind, seq, ts, data)
+    key = "landmarks" if payloads.kind == "landmarks" else "frame"
+    payload = {key: base64.b64encode(data).decode(), "seq": seq, "ts": ts}
+    return json.dumps({"type": "POSE_DATA", "payload": payload})
+
+
+class Client:
+    """Один имитированный клиент: отправка кадров и прием ответов."""
+
+    def __init__(
+        self, payloads: Payloads, metrics: Metrics, args: argparse.Namespace
+    ) -> None:
+        self.payloads = payloads
+        self.metrics = metrics
+        self.args = args
+        # Кадры без ответа: seq -> время отправки.
+        self.pending: Dict[int, float] = {}
+        self.report = asyncio.Event()
+
+    async def run(self, start_delay: float, duration: float) -> None:
+        await asyncio.sleep(start_delay)
+        try:
+            async with websockets.connect(self.args.uri, max_size=None) as ws:
+                self.metrics.active += 1
+                try:
+                    await self._session(ws, duration)
+                finally:
+                    self.metrics.active -= 1
+        except websockets.ConnectionClosed:
+            self.metrics.disconnects += 1
+        except OSError:
+            self.metrics.connect_failures += 1
+
+    async def _session(self, ws: Any, duration: float) -> None:
+        options = {"frame_format": "binary" if self.args.binary else "json"}
+        await ws.send(json.dumps({"type": "START_SESSION", "payload": options}))
+        receiver = asyncio.create_task(self._receive(ws))
+        try:
+            await self._send_frames(ws, duration)
+            await ws.send(json.dumps({"type": "END_SESSION", "payload": {}}))
+            await asyncio.wait_for(self.report.wait(), REPORT_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            self.metrics.errors["no REPORT after END_SESSION"] += 1
+        finally:
+            receiver.cancel()
+
+    async def _send_frames(self, ws: Any, duration: float) -> None:
+        interval = 1.0 / self.args.fps
+        started = time.perf_counter()
+        seq = 0
+        while time.perf_counter() - started < duration:
+            self.pending[seq] = time.perf_counter()
+            await ws.send(encode_frame(self.payloads, seq, self.args.binary))
+            self.metrics.sent += 1
+            seq += 1
+            next_at = started + seq * interval
+            await asyncio.sleep(max(next_at - time.perf_counter(), 0.0))
+
+    async def _receive(self, ws: Any) -> None:
+        async for raw in ws:
+            message = json.loads(raw)
+            kind, payload = message["type"], message["payload"]
+            if kind == "FEEDBACK":
+                sent_at = self._resolve(payload)
+                if sent_at is not None:
+                    self.metrics.record_response(sent_at)
+            elif kind == "ERROR":
+                self.metrics.errors[payload.get("message", "?")] += 1
+                if self._resolve(payload) is not None:
+                    self.metrics.frame_errors += 1
+            elif kind == "REPORT":
+                self.report.set()
+
+    def _resolve(self, payload: Dict[str, Any]) -> float | None:
+        """
+        Снимает кадр, на который пришел ответ, и возвращает время его отправки.
+
+        Ответ на кадр-изображение содержит номер кадра; более старые кадры
+        без ответа сервер отбросил. Ответы на точки приходят по порядку.
+        """
+        seq = payload.get("seq", min(self.pending, default=None))
+        if seq is None or seq not in self.pending:
+            return None
+        for stale in [s for s in self.pending if s < seq]:
+            del self.pending[stale]
+        return self.pending.pop(seq)
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {}
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(max(samples)),
+    }
+
+
+async def progress(metrics: Metrics, stop: asyncio.Event) -> None:
+    """Раз в секунду печатает число клиентов, ответы в секунду и p95."""
+    seen = 0
+    while not stop.is_set():
+        await asyncio.sleep(1.0)
+        now = time.perf_counter()
+        while metrics.responses_at and now - metrics.responses_at[0] > 1.0:
+            metrics.responses_at.popleft()
+        recent = metrics.latencies_ms[seen:]
+        seen = len(metrics.latencies_ms)
+        p95 = f"{np.percentile(recent, 95):.0f}ms" if recent else "-"
+        print(
+            f"клиентов {metrics.active:>4}  ответов/с {len(metrics.responses_at):>6}"
+            f"  p95 {p95:>8}  ошибок {sum(metrics.errors.values()):>5}"
+        )
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    payloads = load_payloads(args)
+    metrics = Metrics()
+    tasks = []
+    for i in range(args.clients):
+        share = i / args.clients
+        start = share * args.ramp_up
+        # Клиенты отключаются в том же порядке, в каком подключались.
+        stop_at = args.ramp_up + args.hold + share * args.ramp_down
+        client = Client(payloads, metrics, args)
+        tasks.append(client.run(start, stop_at - start))
+    stop = asyncio.Event()
+    url = metrics_url(args.uri)
+    skipped_before = await asyncio.to_thread(read_inference_skipped, url)
+    reporter = asyncio.create_task(progress(metrics, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*tasks)
+    wall_s = time.perf_counter() - started
+    stop.set()
+    reporter.cancel()
+    skipped_after = await asyncio.to_thread(read_inference_skipped, url)
+    skipped = None
+    if skipped_before is not None and skipped_after is not None:
+        skipped = skipped_after - skipped_before
+
+    over_budget = sum(ms > args.budget_ms for ms in metrics.latencies_ms)
+    return {
+        "clients": args.clients,
+        "fps": args.fps,
+        "mode": payloads.kind,
+        "binary": args.binary,
+        "sent": metrics.sent,
+        "answered": metrics.answered,
+        "frame_errors": metrics.frame_errors,
+        "dropped": metrics.sent - metrics.answered - metrics.frame_errors,
+        "errors": dict(metrics.errors),
+        "connect_failures": metrics.connect_failures,
+        "disconnects": metrics.disconnects,
+        "throughput_fps": metrics.answered / wall_s,
+        "latency": percentiles(metrics.latencies_ms),
+        "over_budget_ratio": over_budget / max(metrics.answered, 1),
+        # Сервер общий: сюда попадают и кадры других клиентов.
+        "inference_skipped": skipped,
+    }
+
+
+def warn_if_gated(summary: Dict[str, Any]) -> None:
+    """Предупреждает, если часть кадров сервер обработал без инференса."""
+    skipped = summary["inference_skipped"]
+    if summary["mode"] != "image" or not skipped:
+        return
+    share = skipped / max(summary["answered"], 1)
+    print(
+        f"ВНИМАНИЕ: сервер пропустил инференс для {skipped:.0f} кадров"
+        f" ({share:.0%} ответов, motion gate). Пропускная способность и"
+        " число сессий на узел завышены; для оценки запустите сервер с"
+        " KINETICOACH_MOTION_GATE_THRESHOLD=0 или пришлите ролик с"
+        " движением (--video).",
+        file=sys.stderr,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--uri", default=DEFAULT_URI)
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--fps", type=float, default=10.0)
+    parser.add_argument("--ramp-up", type=float, default=10.0, help="Секунд")
+    parser.add_argument("--hold", type=float, default=30.0, help="Секунд")
+    parser.add_argument("--ramp-down", type=float, default=5.0, help="Секунд")
+    parser.add_argument("--mode", choices=["image", "landmarks"], default="image")
+    parser.add_argument("--binary", action="store_true", help="Бинарный протокол")
+    parser.add_argument("--video", help="Ролик, кадры которого отправляются в JPEG")
+    parser.add_argument("--max-frames", type=int, default=300)
+    parser.add_argument("--recording", help="Запись .kcrec для режима landmarks")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--budget-ms", type=float, default=2500.0)
+    parser.add_argument("--output", help="Сохранить итог в JSON")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(args))
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    warn_if_gated(summary)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
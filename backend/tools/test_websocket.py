@@ -1,5 +1,7 @@
 """
 Простой асинхронный клиент для тестирования WebSocket-эндпоинта.
+
+Для нагрузочного тестирования многими клиентами см. tools/load_test.py.
 """
 
 import asyncio
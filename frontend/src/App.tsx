@@ -4,8 +4,10 @@ import FeedbackDisplay from "./components/FeedbackDisplay";
 import DebugDisplay from "./components/DebugDisplay";
 import SkeletonCanvas from "./components/SkeletonCanvas";
 import ReportModal from "./components/ReportModal"; // Импортируем новый компонент
+import { MESSAGE_KIND_IMAGE, encodeFrame } from "./lib/protocol";
 
-const FRAME_INTERVAL_MS = 100;
+const DEFAULT_FPS = 10;
+const DEFAULT_JPEG_QUALITY = 0.7;
 
 // Определяем тип для одной точки
 interface Landmark {
@@ -44,6 +46,9 @@ function App() {
   const canvasRef = useRef<HTMLCanvasElement>(null);
   const wsRef = useRef<WebSocket | null>(null);
   const fileInputRef = useRef<HTMLInputElement>(null);
+  // Подсказки сервера (RATE_CONTROL): частота кадров и качество JPEG
+  const fpsRef = useRef(DEFAULT_FPS);
+  const jpegQualityRef = useRef(DEFAULT_JPEG_QUALITY);
 
   const [error, setError] = useState<string | null>(null);
   const [isConnected, setIsConnected] = useState(false);
@@ -87,7 +92,16 @@ function App() {
     const ws = new WebSocket(wsUrl);
     wsRef.current = ws;
 
+    ws.binaryType = "arraybuffer";
     ws.onopen = () => {
+      // Договариваемся о бинарной передаче кадров (без base64 и JSON)
+      // и о подсказках частоты кадров от сервера
+      ws.send(
+        JSON.stringify({
+          type: "START_SESSION",
+          payload: { frame_format: "binary", rate_control: true },
+        }),
+      );
       setIsConnected(true);
       setError(null); // Очищаем ошибку при успешном соединении
     };
@@ -99,6 +113,9 @@ function App() {
         setFeedbackData(message.payload);
       } else if (message.type === "REPORT") {
         setReportData(message.payload); // Сохраняем данные отчета
+      } else if (message.type === "RATE_CONTROL") {
+        fpsRef.current = message.payload.fps;
+        jpegQualityRef.current = message.payload.jpeg_quality;
       }
     };
 
@@ -112,21 +129,34 @@ function App() {
     const video = videoRef.current;
     const canvas = canvasRef.current;
     const ctx = canvas.getContext("2d");
+    let seq = 0;
+    let timeoutId: ReturnType<typeof setTimeout>;
 
-    const intervalId = setInterval(() => {
+    // Цепочка таймеров вместо setInterval: частота меняется по подсказкам сервера
+    const sendFrame = () => {
       if (ctx && wsRef.current?.readyState === WebSocket.OPEN && !video.paused && video.videoWidth > 0) {
         canvas.width = video.videoWidth;
         canvas.height = video.videoHeight;
         ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
-        const frameData = canvas.toDataURL("image/jpeg", 0.7);
-        wsRef.current.send(JSON.stringify({
-          type: "POSE_DATA",
-          payload: { frame: frameData },
-        }));
+        const timestampMs = Date.now();
+        canvas.toBlob(
+          async (blob) => {
+            if (!blob) return;
+            const jpeg = await blob.arrayBuffer();
+            const ws = wsRef.current;
+            if (ws?.readyState === WebSocket.OPEN) {
+              ws.send(encodeFrame(MESSAGE_KIND_IMAGE, seq++, timestampMs, jpeg));
+            }
+          },
+          "image/jpeg",
+          jpegQualityRef.current,
+        );
       }
-    }, FRAME_INTERVAL_MS);
+      timeoutId = setTimeout(sendFrame, 1000 / fpsRef.current);
+    };
+    timeoutId = setTimeout(sendFrame, 1000 / fpsRef.current);
 
-    return () => clearInterval(intervalId);
+    return () => clearTimeout(timeoutId);
   }, [isConnected]);
 
   const handleFileChange = (event: React.ChangeEvent<HTMLInputElement>) => {
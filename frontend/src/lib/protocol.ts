@@ -0,0 +1,25 @@
+// Бинарный протокол передачи кадров на бэкенд (см. backend/src/app/protocol.py).
+// Заголовок 16 байт (little-endian):
+//   [0]     тип сообщения
+//   [1..3]  зарезервировано
+//   [4..7]  порядковый номер кадра (uint32)
+//   [8..15] метка времени клиента в миллисекундах (uint64)
+// Далее идут байты JPEG/WebP без base64.
+
+export const MESSAGE_KIND_IMAGE = 1;
+export const HEADER_SIZE = 16;
+
+export function encodeFrame(
+  kind: number,
+  seq: number,
+  timestampMs: number,
+  payload: ArrayBuffer,
+): ArrayBuffer {
+  const buffer = new ArrayBuffer(HEADER_SIZE + payload.byteLength);
+  const view = new DataView(buffer);
+  view.setUint8(0, kind);
+  view.setUint32(4, seq >>> 0, true);
+  view.setBigUint64(8, BigInt(Math.floor(timestampMs)), true);
+  new Uint8Array(buffer, HEADER_SIZE).set(new Uint8Array(payload));
+  return buffer;
+}